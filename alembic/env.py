@@ -8,6 +8,8 @@ from src.database import Base
 from src.models.patient import Patient
 from src.models.appointment import Appointment
 from src.models.doctor import Doctor
+from src.models.audit import AuditEvent
+from src.models.idempotency import IdempotencyKey
 
 # Load environment variables from .env file
 load_dotenv()
@@ -0,0 +1,76 @@
+"""add patient search indexes and phone_normalized
+
+Revision ID: a41d7c2b9e53
+Revises: 8c3f1a9d2e6b
+Create Date: 2026-10-18 21:40:12.310584
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d7c2b9e53'
+down_revision: Union[str, None] = '8c3f1a9d2e6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def _backfill_phone_normalized() -> None:
+    patients = sa.table(
+        'saniya_patients',
+        sa.column('id', sa.Integer),
+        sa.column('phone', sa.String),
+        sa.column('phone_normalized', sa.String),
+    )
+    if context.is_offline_mode():
+        # No rows to read when writing a SQL script; let MySQL strip them.
+        op.execute(
+            patients.update().values(
+                phone_normalized=sa.func.regexp_replace(patients.c.phone, '[^0-9]', '')
+            )
+        )
+        return
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(patients.c.id, patients.c.phone)
+            .where(patients.c.id > last_id)
+            .order_by(patients.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            patients.update()
+            .where(patients.c.id == sa.bindparam('row_id'))
+            .values(phone_normalized=sa.bindparam('digits')),
+            [{'row_id': id_, 'digits': re.sub(r'\D', '', phone)} for id_, phone in rows],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('saniya_patients', sa.Column('phone_normalized', sa.String(length=15), nullable=True))
+    _backfill_phone_normalized()
+    with op.batch_alter_table('saniya_patients') as batch_op:
+        batch_op.alter_column('phone_normalized', existing_type=sa.String(length=15), nullable=False)
+    op.create_index(op.f('ix_saniya_patients_phone_normalized'), 'saniya_patients', ['phone_normalized'], unique=False)
+    op.create_index('ix_saniya_patients_lower_last_name_first_name', 'saniya_patients', [sa.func.lower(sa.column('last_name')), sa.func.lower(sa.column('first_name'))], unique=False)
+    op.create_index('ix_saniya_patients_lower_first_name_last_name', 'saniya_patients', [sa.func.lower(sa.column('first_name')), sa.func.lower(sa.column('last_name'))], unique=False)
+    op.create_index('ix_saniya_patients_lower_email', 'saniya_patients', [sa.func.lower(sa.column('email'))], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_saniya_patients_lower_email', table_name='saniya_patients')
+    op.drop_index('ix_saniya_patients_lower_first_name_last_name', table_name='saniya_patients')
+    op.drop_index('ix_saniya_patients_lower_last_name_first_name', table_name='saniya_patients')
+    op.drop_index(op.f('ix_saniya_patients_phone_normalized'), table_name='saniya_patients')
+    with op.batch_alter_table('saniya_patients') as batch_op:
+        batch_op.drop_column('phone_normalized')
@@ -0,0 +1,119 @@
+"""Benchmark hot-table index size and query time as history accumulates.
+
+Seeds a fixed upcoming schedule plus N past appointments (spread over the
+preceding days) in a throwaway SQLite database, then measures before and
+after ``archive_appointments``:
+
+- bytes used by the saniya_appointments indexes (SQLite dbstat)
+- list_appointments for an upcoming day and has_conflict for a new booking
+
+Without archiving both grow with N; after archiving the hot table holds only
+the live schedule, so they stay flat. A listing of a past day (served from the
+archive) is timed as well.
+
+Usage:
+    python -m benchmarks.bench_archive --history 0 100000 1000000
+"""
+
+import argparse
+import json
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import (
+    _insert_batched,
+    seed,
+    summarize,
+    temp_database,
+    time_calls,
+    tomorrow,
+)
+from src.models.appointment import Appointment
+from src.services.appointment_service import has_conflict, list_appointments
+from src.services.archive_service import archive_appointments
+
+DOCTORS = 20
+UPCOMING = 20_000
+
+
+def index_bytes(engine, table: str) -> int:
+    """Total size of the table's indexes, primary key b-tree excluded."""
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = :table)"
+            ),
+            {"table": table},
+        ).scalar_one()
+
+
+def seed_history(engine, history: int) -> None:
+    """``history`` past 30-minute appointments, newest first, round-robin
+    across doctors and ending the day before yesterday."""
+    end = tomorrow() - timedelta(days=3)
+    _insert_batched(
+        engine,
+        Appointment,
+        (
+            {
+                "patient_id": i % 1000 + 1,
+                "doctor_id": i % DOCTORS + 1,
+                "start_time": end - timedelta(minutes=30 * (i // DOCTORS + 1)),
+                "duration_minutes": 30,
+            }
+            for i in range(history)
+        ),
+    )
+
+
+def measure(engine, calls: int) -> dict:
+    origin = tomorrow()
+    past_day = origin - timedelta(days=4)
+    # New bookings go after the seeded schedule so none of them conflict.
+    free_from = origin + timedelta(minutes=30 * (UPCOMING // DOCTORS + 1))
+    with Session(engine) as db:
+        operations = {
+            "list_upcoming_day": lambda i: list_appointments(
+                db, origin + timedelta(days=i % 5), i % DOCTORS + 1
+            ),
+            "has_conflict": lambda i: has_conflict(
+                db, i % DOCTORS + 1, free_from + timedelta(hours=i), 30
+            ),
+            "list_past_day": lambda i: list_appointments(db, past_day, i % DOCTORS + 1),
+        }
+        result = {"hot_index_bytes": index_bytes(engine, Appointment.__tablename__)}
+        for name, operation in operations.items():
+            summary = summarize(time_calls(operation, calls))
+            result[f"{name}_p50_ms"] = summary["p50_ms"]
+            result[f"{name}_p99_ms"] = summary["p99_ms"]
+    return result
+
+
+def run(history: int, calls: int) -> dict:
+    with temp_database() as engine:
+        seed(engine, 1000, DOCTORS, UPCOMING, tomorrow())
+        seed_history(engine, history)
+        before = measure(engine, calls)
+        with Session(engine) as db:
+            moved = archive_appointments(db, tomorrow() - timedelta(days=1))
+        after = measure(engine, calls)
+    return {"history": history, "archived": moved, "before": before, "after": after}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--history", type=int, nargs="+", default=[0, 100_000, 1_000_000]
+    )
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    print(json.dumps([run(size, args.calls) for size in args.history], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare requests/sec and latency of the sync and async request paths.
+
+Starts uvicorn twice against the same throwaway SQLite database, once with
+USE_ASYNC_DB unset and once with it set, and drives a read-heavy mix of
+GET /doctors/{id} and GET /appointments from concurrent asyncio clients.
+
+Usage:
+    python -m benchmarks.bench_async_load --concurrency 64 --seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from benchmarks.harness import free_port, start_uvicorn
+
+
+def _seed(base_url: str) -> tuple[int, str]:
+    with httpx.Client(base_url=base_url) as client:
+        patient = client.post(
+            "/patients",
+            json={
+                "first_name": "Load",
+                "last_name": "Test",
+                "email": f"load{time.time_ns()}@example.com",
+                "phone": str(time.time_ns())[-15:],
+            },
+        ).json()
+        doctor = client.post(
+            "/doctors", json={"full_name": "Dr. Load", "specialization": "General"}
+        ).json()
+        day = datetime.now(timezone.utc) + timedelta(days=1)
+        for slot in range(20):
+            client.post(
+                "/appointments",
+                json={
+                    "patient_id": patient["id"],
+                    "doctor_id": doctor["id"],
+                    "start_time": (day + timedelta(minutes=30 * slot)).isoformat(),
+                    "duration_minutes": 30,
+                },
+            )
+    return doctor["id"], day.isoformat()
+
+
+async def _drive(base_url: str, doctor_id: int, day: str, args) -> dict:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + args.seconds
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+
+        async def worker(n: int) -> None:
+            while time.perf_counter() < deadline:
+                began = time.perf_counter()
+                if n % 2:
+                    await client.get(f"/doctors/{doctor_id}")
+                else:
+                    await client.get(
+                        "/appointments", params={"date": day, "doctor_id": doctor_id}
+                    )
+                latencies.append((time.perf_counter() - began) * 1000)
+
+        await asyncio.gather(*(worker(n) for n in range(args.concurrency)))
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / args.seconds, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+def run(use_async: bool, args) -> dict:
+    """Benchmark one mode against a fresh database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        port = free_port()
+        server = start_uvicorn(
+            {
+                "DATABASE_URL": database_url,
+                "USE_ASYNC_DB": str(use_async),
+                "AUTO_CREATE_SCHEMA": "1",
+            },
+            port,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            doctor_id, day = _seed(base_url)
+            result = asyncio.run(_drive(base_url, doctor_id, day, args))
+        finally:
+            server.terminate()
+            server.wait()
+    return {"mode": "async" if use_async else "sync", **result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps([run(False, args), run(True, args)], indent=2))
+
+
+if __name__ == "__main__":
+    main()
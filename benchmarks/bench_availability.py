@@ -0,0 +1,91 @@
+"""Benchmark a one-week availability search across many doctors.
+
+Seeds D doctors with a busy week each (8 x 30-minute bookings per day) in a
+throwaway SQLite database, warms the schedule index and times
+``search_availability`` over the whole week, including the response
+validation the endpoint performs.
+
+Usage:
+    python -m benchmarks.bench_availability --doctors 500 --repeat 20
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import temp_database, tomorrow
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.schemas.availability import DoctorAvailability
+from src.services.availability_service import search_availability
+from src.services.schedule_index import schedule_index
+
+
+def seed(session: Session, doctors: int, week_start: datetime) -> None:
+    """Insert ``doctors`` doctors with eight bookings per day for a week."""
+    session.add(Patient(first_name="B", last_name="M", email="b@m.io", phone="1"))
+    session.add_all(
+        Doctor(full_name=f"Dr. {i}", specialization="General") for i in range(doctors)
+    )
+    session.flush()
+    rows = [
+        {
+            "patient_id": 1,
+            "doctor_id": doctor_id,
+            "start_time": week_start
+            + timedelta(days=day, hours=9 + slot, minutes=15 * (doctor_id % 4)),
+            "duration_minutes": 30,
+        }
+        for doctor_id in range(1, doctors + 1)
+        for day in range(7)
+        for slot in range(8)
+    ]
+    session.execute(insert(Appointment), rows)
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    week_start = tomorrow()
+    with temp_database() as engine:
+        with Session(engine) as session:
+            seed(session, args.doctors, week_start)
+            schedule_index.warm(session)
+
+            adapter = TypeAdapter(list[DoctorAvailability])
+            timings = []
+            for _ in range(args.repeat):
+                began = time.perf_counter()
+                found = adapter.validate_python(
+                    search_availability(
+                        session, week_start, week_start + timedelta(days=7), 30
+                    )
+                )
+                timings.append((time.perf_counter() - began) * 1000)
+
+    print(
+        json.dumps(
+            {
+                "doctors": args.doctors,
+                "doctors_with_windows": len(found),
+                "median_ms": round(statistics.median(timings), 2),
+                "max_ms": round(max(timings), 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
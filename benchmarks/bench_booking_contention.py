@@ -0,0 +1,145 @@
+"""Stress concurrent bookings and count double bookings.
+
+Workers (threads or processes) race to book random 30-minute slots that
+start every 15 minutes, so neighbouring candidates overlap, for a small set
+of doctors in a throwaway SQLite database. Each attempt goes through
+``create_appointment`` in its own session. The report gives attempts and
+successful bookings per second and the number of overlapping pairs left in
+the table, which must be 0. ``--unlocked`` replaces lock_doctor_schedules
+with a no-op to show the race the lock closes.
+
+Usage:
+    python -m benchmarks.bench_booking_contention --workers 8 --doctors 1 4 32
+    python -m benchmarks.bench_booking_contention --mode process --unlocked
+"""
+
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.harness import seed, temp_database, tomorrow
+from src.config import get_settings
+from src.database import install_engine_hooks
+from src.models.appointment import Appointment
+from src.schemas.appointment import AppointmentCreate
+from src.services import appointment_service
+from src.services.booking_rules import as_utc
+
+SLOTS_PER_DOCTOR = 96  # one day of 15-minute starts
+
+
+def _session_factory(url: str, unlocked: bool):
+    if unlocked:
+        appointment_service.lock_doctor_schedules = lambda _db, _ids: None
+    engine = create_engine(url)
+    install_engine_hooks(engine, get_settings())
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def _book_many(url: str, worker: int, attempts: int, doctors: int, unlocked: bool):
+    """Run ``attempts`` random bookings; return (successes, conflicts, errors)."""
+    session_factory = _session_factory(url, unlocked)
+    rng = random.Random(worker)
+    origin = tomorrow()
+    counts = [0, 0, 0]
+    for _ in range(attempts):
+        appt = AppointmentCreate(
+            patient_id=1,
+            doctor_id=rng.randrange(doctors) + 1,
+            start_time=origin + timedelta(minutes=15 * rng.randrange(SLOTS_PER_DOCTOR)),
+            duration_minutes=30,
+        )
+        with session_factory() as db:
+            try:
+                appointment_service.create_appointment(db, appt)
+                counts[0] += 1
+            except HTTPException:
+                counts[1] += 1
+            except Exception:  # pylint: disable=broad-except
+                counts[2] += 1
+    return counts
+
+
+def overlapping_pairs(engine) -> int:
+    """Pairs of appointments of one doctor whose intervals intersect."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(
+                Appointment.doctor_id,
+                Appointment.start_time,
+                Appointment.duration_minutes,
+            ).order_by(Appointment.doctor_id, Appointment.start_time)
+        ).all()
+    pairs = 0
+    busy: dict[int, object] = {}
+    for doctor_id, start_time, duration in rows:
+        start = as_utc(start_time)
+        if doctor_id in busy and busy[doctor_id] > start:
+            pairs += 1
+        end = start + timedelta(minutes=duration)
+        busy[doctor_id] = max(busy.get(doctor_id, end), end)
+    return pairs
+
+
+def run(mode: str, workers: int, doctors: int, attempts: int, unlocked: bool) -> dict:
+    with temp_database() as engine:
+        seed(engine, 1, doctors, 0, tomorrow())
+        url = str(engine.url)
+        executor = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+        began = time.perf_counter()
+        with executor(workers) as pool:
+            results = list(
+                pool.map(
+                    _book_many,
+                    [url] * workers,
+                    range(workers),
+                    [attempts] * workers,
+                    [doctors] * workers,
+                    [unlocked] * workers,
+                )
+            )
+        elapsed = time.perf_counter() - began
+        booked, conflicts, errors = (sum(column) for column in zip(*results))
+        return {
+            "mode": mode,
+            "workers": workers,
+            "doctors": doctors,
+            "locked": not unlocked,
+            "attempts_per_second": round(workers * attempts / elapsed, 1),
+            "bookings_per_second": round(booked / elapsed, 1),
+            "booked": booked,
+            "conflicts": conflicts,
+            "errors": errors,
+            "double_bookings": overlapping_pairs(engine),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--doctors", type=int, nargs="+", default=[1, 4, 32])
+    parser.add_argument("--attempts", type=int, default=200, help="per worker")
+    parser.add_argument("--unlocked", action="store_true")
+    args = parser.parse_args()
+
+    print(
+        json.dumps(
+            [
+                run(args.mode, args.workers, doctors, args.attempts, args.unlocked)
+                for doctors in args.doctors
+            ],
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
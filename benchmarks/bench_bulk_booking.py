@@ -0,0 +1,83 @@
+"""Benchmark importing a weekly schedule through the bulk booking path.
+
+Books N slots spread over a set of doctors into a throwaway SQLite database,
+once with ``bulk_create_appointments`` and once with one ``create_appointment``
+call per slot (the per-request path clients used before), and reports the
+wall time of each.
+
+Usage:
+    python -m benchmarks.bench_bulk_booking --slots 10000 --doctors 50
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import seed, temp_database, tomorrow
+from src.schemas.appointment import AppointmentCreate
+from src.services.appointment_service import (
+    bulk_create_appointments,
+    create_appointment,
+)
+from src.services.schedule_index import schedule_index
+
+
+def make_slots(slots: int, doctors: int) -> list[AppointmentCreate]:
+    """Consecutive 30-minute slots per doctor starting tomorrow."""
+    origin = datetime.now(timezone.utc) + timedelta(days=1)
+    return [
+        AppointmentCreate(
+            patient_id=1,
+            doctor_id=i % doctors + 1,
+            start_time=origin + timedelta(minutes=30 * (i // doctors)),
+            duration_minutes=30,
+        )
+        for i in range(slots)
+    ]
+
+
+def run(mode: str, slots: list[AppointmentCreate], doctors: int) -> dict:
+    """Import ``slots`` into a fresh database with the given mode."""
+    schedule_index.clear()
+    with temp_database() as engine:
+        seed(engine, 1, doctors, 0, tomorrow())
+        with Session(engine) as session:
+            began = time.perf_counter()
+            if mode == "bulk":
+                booked = sum(
+                    r.status_code == 201
+                    for r in bulk_create_appointments(session, slots)
+                )
+            else:
+                for slot in slots:
+                    create_appointment(session, slot)
+                booked = len(slots)
+            elapsed = time.perf_counter() - began
+
+    return {
+        "mode": mode,
+        "slots": len(slots),
+        "booked": booked,
+        "seconds": round(elapsed, 3),
+        "slots_per_second": round(len(slots) / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slots", type=int, default=10_000)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument(
+        "--modes", nargs="+", default=["bulk", "single"], choices=["bulk", "single"]
+    )
+    args = parser.parse_args()
+
+    slots = make_slots(args.slots, args.doctors)
+    print(json.dumps([run(mode, slots, args.doctors) for mode in args.modes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
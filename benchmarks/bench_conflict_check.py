@@ -0,0 +1,81 @@
+"""Benchmark the appointment overlap check against a growing doctor history.
+
+Seeds one doctor with N past appointments in a throwaway SQLite database and
+times ``has_conflict`` for bookings in the future. With the bounded
+(doctor_id, start_time) range scan the latency should stay flat as N grows.
+
+Usage:
+    python -m benchmarks.bench_conflict_check --sizes 100 10000 100000 1000000
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import summarize, temp_database, time_calls
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.services.appointment_service import has_conflict
+
+
+def seed(session: Session, history: int) -> None:
+    """Insert one patient, one doctor and ``history`` past appointments."""
+    session.add(Patient(first_name="B", last_name="M", email="b@m.io", phone="1"))
+    session.add(Doctor(full_name="Dr. Bench", specialization="General"))
+    session.flush()
+
+    origin = datetime.now(timezone.utc) - timedelta(days=1)
+    batch = []
+    for i in range(history):
+        batch.append(
+            {
+                "patient_id": 1,
+                "doctor_id": 1,
+                "start_time": origin - timedelta(minutes=30 * i),
+                "duration_minutes": 30,
+            }
+        )
+        if len(batch) == 10_000:
+            session.execute(insert(Appointment), batch)
+            batch.clear()
+    if batch:
+        session.execute(insert(Appointment), batch)
+    session.commit()
+
+
+def run(history: int, probes: int) -> dict:
+    """Seed a fresh database and time ``probes`` conflict checks."""
+    with temp_database() as engine, Session(engine) as session:
+        seed(session, history)
+        start = datetime.now(timezone.utc) + timedelta(days=1)
+        timings = time_calls(
+            lambda i: has_conflict(session, 1, start + timedelta(hours=i), 30),
+            probes,
+        )
+
+    summary = summarize(timings)
+    return {
+        "history": history,
+        "probes": probes,
+        "median_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--probes", type=int, default=500)
+    args = parser.parse_args()
+
+    print(json.dumps([run(size, args.probes) for size in args.sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare engine/pool configurations on a mixed read/write workload.
+
+Each configuration gets a fresh SQLite database and an engine built with
+``engine_options``/``install_engine_hooks``; worker threads then run primary
+key lookups with an occasional appointment insert. "legacy" reproduces the
+old hardcoded engine (echo on, pre-ping on every checkout, SQLite defaults).
+
+Usage:
+    python -m benchmarks.bench_engine_profiles --threads 8 --seconds 5
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from src.config import PROFILES, Settings
+from src.database import Base, engine_options, install_engine_hooks, pool_metrics
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+
+
+def configurations(database_url: str) -> dict[str, Settings]:
+    """The profiles to compare, all pointed at ``database_url``."""
+    configs = {
+        name: Settings(database_url=database_url, profile=name, **values)
+        for name, values in PROFILES.items()
+    }
+    configs["legacy"] = dataclasses.replace(
+        configs["development"],
+        echo=True,
+        pre_ping="always",
+        sqlite_journal_mode="DELETE",
+        sqlite_synchronous="FULL",
+        sqlite_mmap_size=0,
+        sqlite_cache_size=-2000,
+    )
+    return configs
+
+
+def run(name: str, config: Settings, threads: int, seconds: float) -> dict:
+    """Drive one configuration and return its throughput."""
+    engine = create_engine(config.database_url, **engine_options(config))
+    install_engine_hooks(engine, config)
+    # echo=True logs to stderr; keep the formatting cost but not the output.
+    devnull = open(
+        os.devnull, "w", encoding="utf-8"
+    )  # pylint: disable=consider-using-with
+    for handler in logging.getLogger("sqlalchemy.engine.Engine").handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(devnull)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(Patient(first_name="B", last_name="M", email="b@m.io", phone="1"))
+        session.add(Doctor(full_name="Dr. Pool", specialization="General"))
+        session.commit()
+
+    origin = datetime.now(timezone.utc) + timedelta(days=1)
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(n: int) -> None:
+        i = 0
+        while time.perf_counter() < deadline:
+            with Session(engine) as session:
+                if i % 10 == 0:
+                    session.add(
+                        Appointment(
+                            patient_id=1,
+                            doctor_id=1,
+                            start_time=origin + timedelta(minutes=n * 10**6 + i),
+                            duration_minutes=15,
+                        )
+                    )
+                    session.commit()
+                else:
+                    session.scalar(select(Doctor).where(Doctor.id == 1))
+            i += 1
+        counts[n] = i
+
+    before = pool_metrics.snapshot()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    after = pool_metrics.snapshot(engine.pool)
+    engine.dispose()
+    devnull.close()
+
+    return {
+        "config": name,
+        "ops_per_second": round(sum(counts) / seconds, 1),
+        "pool_wait_ms_total": round(
+            (after["wait_seconds_total"] - before["wait_seconds_total"]) * 1000, 2
+        ),
+        "pool_timeouts": after["timeouts"] - before["timeouts"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, config in configurations("").items():
+            url = f"sqlite:///{os.path.join(tmp, name + '.db')}"
+            config = dataclasses.replace(config, database_url=url)
+            results.append(run(name, config, args.threads, args.seconds))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
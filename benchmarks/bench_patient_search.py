@@ -0,0 +1,58 @@
+"""Benchmark GET /patients/search queries at the service layer.
+
+Seeds N patients in a throwaway SQLite database and times each kind of
+query: a narrow and a broad last-name prefix (the broad one matches every
+patient), "first last", a first-name-only match, an email prefix, a phone
+prefix and a miss. Every tier is an index range scan in rank order, so
+latency should not grow with N.
+
+Usage:
+    python -m benchmarks.bench_patient_search --patients 100000 5000000
+"""
+
+import argparse
+import json
+
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import seed, summarize, temp_database, time_calls, tomorrow
+from src.services.patient_service import search_patients
+
+QUERIES = {
+    "last_name": "Last4242",
+    "broad_prefix": "last",
+    "first_last": "First4242 Last4242",
+    "first_name_only": "First4242",
+    "email": "patient4242@",
+    "phone": "5550000004242",
+    "miss": "Zed",
+}
+
+
+def run(patients: int, calls: int) -> dict:
+    with temp_database() as engine:
+        seed(engine, patients, 0, 0, tomorrow())
+        result = {"patients": patients}
+        with Session(engine) as db:
+            for name, q in QUERIES.items():
+                summary = summarize(
+                    time_calls(lambda i, q=q: search_patients(db, q), calls)
+                )
+                result[name] = {
+                    "p50_ms": summary["p50_ms"],
+                    "p99_ms": summary["p99_ms"],
+                }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps([run(n, args.calls) for n in args.patients], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark the memory of one day's schedule: ORM objects vs the snapshot.
+
+Seeds N appointments on one day (20 half-hour slots per doctor) in a
+throwaway SQLite database, then loads the day twice and reports the memory
+still held afterwards, as traced by tracemalloc, scaled to 100k
+appointments:
+
+- ``orm``: the day as ``Appointment`` instances in a Session (identity map
+  and instance state included), as ``list_appointments`` returns it
+- ``snapshot``: the same rows in a ScheduleSnapshot's typed columns
+
+Load times are reported untraced.
+
+Usage:
+    python -m benchmarks.bench_schedule_snapshot --appointments 100000 500000
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import seed, temp_database, tomorrow
+from src.models.appointment import Appointment
+from src.services.schedule_snapshot import ScheduleSnapshot
+
+SLOTS_PER_DOCTOR = 20
+
+
+def _load_orm(engine, day_start) -> tuple[Session, list]:
+    db = Session(engine)
+    statement = select(Appointment).where(
+        Appointment.start_time >= day_start,
+        Appointment.start_time < day_start + timedelta(days=1),
+    )
+    return db, list(db.scalars(statement))
+
+
+def _load_snapshot(engine, day_start) -> ScheduleSnapshot:
+    snapshot = ScheduleSnapshot()
+    with Session(engine) as db:
+        # Doctor 0 does not exist: builds the day, materializes no rows.
+        snapshot.rows(db, day_start.date(), doctor_id=0)
+    return snapshot
+
+
+def _held_bytes(load) -> tuple[int, object]:
+    """Bytes still allocated once ``load()`` returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = load()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held, result
+
+
+def _timed_seconds(load) -> float:
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    if isinstance(result, tuple):
+        result[0].close()
+    return round(elapsed, 3)
+
+
+def run(appointments: int) -> dict:
+    day_start = tomorrow()
+    doctors = max(1, appointments // SLOTS_PER_DOCTOR)
+    with temp_database() as engine:
+        seed(engine, 1000, doctors, appointments, day_start)
+        orm_bytes, (db, _rows) = _held_bytes(lambda: _load_orm(engine, day_start))
+        db.close()
+        snapshot_bytes, snapshot = _held_bytes(
+            lambda: _load_snapshot(engine, day_start)
+        )
+        scale = 100_000 / appointments
+        return {
+            "appointments": appointments,
+            "orm_mib_per_100k": round(orm_bytes * scale / 2**20, 2),
+            "snapshot_mib_per_100k": round(snapshot_bytes * scale / 2**20, 2),
+            "snapshot_column_bytes_per_row": snapshot.stats()["bytes"] // appointments,
+            "orm_load_seconds": _timed_seconds(lambda: _load_orm(engine, day_start)),
+            "snapshot_load_seconds": _timed_seconds(
+                lambda: _load_snapshot(engine, day_start)
+            ),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--appointments", type=int, nargs="+", default=[100_000])
+    args = parser.parse_args()
+
+    print(json.dumps([run(n) for n in args.appointments], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Compare ways of serializing a large day listing.
+
+Seeds one day with N appointments in a throwaway SQLite database and times
+building the JSON body of GET /appointments:
+
+- ``orm``: ORM objects validated into AppointmentRead and dumped, i.e. what
+  FastAPI does with ``response_model`` (the previous implementation)
+- ``columns``: AppointmentRead columns as row dicts, encoded by
+  ``dump_rows`` (orjson when installed)
+- ``columns-pydantic``: the same rows through Pydantic's untyped serializer,
+  the fallback used when orjson is missing
+
+and finally the full request through TestClient.
+
+Usage:
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 10
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.harness import seed, temp_database, tomorrow
+from src import serialization
+from src.models.appointment import Appointment
+from src.schemas.appointment import AppointmentRead
+from src.serialization import columns, dump_rows
+
+
+def _best_of(fn, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        size = len(fn())
+        timings.append((time.perf_counter() - began) * 1000)
+    return statistics.median(timings), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    day = tomorrow()
+    # 40 half-hour slots per doctor fit in one day.
+    doctors = max(1, -(-args.rows // 40))
+    adapter = TypeAdapter(list[AppointmentRead])
+    day_rows = select(*columns(AppointmentRead, Appointment)).where(
+        Appointment.start_time >= day
+    )
+    day_objects = select(Appointment).where(Appointment.start_time >= day)
+
+    with temp_database() as engine:
+        seed(engine, 1000, doctors, args.rows, day)
+
+        def orm() -> bytes:
+            with Session(engine) as db:
+                objects = db.scalars(day_objects).all()
+                return adapter.dump_json(
+                    adapter.validate_python(objects, from_attributes=True)
+                )
+
+        def rows() -> bytes:
+            with Session(engine) as db:
+                mappings = db.execute(day_rows).mappings()
+                return dump_rows([dict(row) for row in mappings])
+
+        def rows_pydantic() -> bytes:
+            orjson, serialization.orjson = serialization.orjson, None
+            try:
+                return rows()
+            finally:
+                serialization.orjson = orjson
+
+        # Imported here: src.main builds the app at import time.
+        from fastapi.testclient import (  # pylint: disable=import-outside-toplevel
+            TestClient,
+        )
+
+        from src.main import app, get_db  # pylint: disable=import-outside-toplevel
+
+        local_session = sessionmaker(bind=engine)
+
+        def override_get_db():
+            with local_session() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)
+
+        def http() -> bytes:
+            response = client.get("/appointments", params={"date": day.isoformat()})
+            return response.content
+
+        results = []
+        for name, fn in (
+            ("orm", orm),
+            ("columns", rows),
+            ("columns-pydantic", rows_pydantic),
+            ("http", http),
+        ):
+            median_ms, size = _best_of(fn, args.repeat)
+            results.append(
+                {"variant": name, "median_ms": round(median_ms, 2), "bytes": size}
+            )
+        app.dependency_overrides.pop(get_db, None)
+
+    print(
+        json.dumps(
+            {
+                "rows": args.rows,
+                "orjson": serialization.orjson is not None,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure application startup: import time and time to first request.
+
+- ``import``: cumulative time of ``import src.main`` as reported by
+  ``python -X importtime`` in a fresh interpreter
+- ``first_request``: from spawning uvicorn until ``GET /doctors`` answers,
+  against a throwaway SQLite database migrated beforehand
+
+Usage:
+    python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import free_port, start_uvicorn, summarize, temp_database
+
+
+def import_ms(module: str = "src.main") -> float:
+    """Cumulative import time of ``module`` in a fresh interpreter."""
+    completed = subprocess.run(  # nosec B603 - fixed argv, local benchmark only
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(completed.stderr.splitlines()):
+        # "import time: self [us] | cumulative | imported package"
+        _, cumulative, name = line.rsplit("|", 2)
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def first_request_ms(database_url: str) -> float:
+    """Milliseconds from spawning uvicorn until GET /doctors answers 200."""
+    began = time.perf_counter()
+    server = start_uvicorn(
+        {"DATABASE_URL": database_url}, free_port(), ready_path="/doctors?limit=1"
+    )
+    elapsed = (time.perf_counter() - began) * 1000
+    server.terminate()
+    server.wait()
+    return elapsed
+
+
+def run(runs: int) -> dict:
+    """Summaries of ``runs`` import and first-request measurements."""
+    # temp_database creates the schema, as `alembic upgrade head` would.
+    with temp_database() as engine:
+        first_request = [first_request_ms(str(engine.url)) for _ in range(runs)]
+    return {
+        "import": summarize([import_ms() for _ in range(runs)]),
+        "first_request": summarize(first_request),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark utilization reports over a year of appointments.
+
+Seeds N back-to-back 30-minute appointments over 60 doctors (1M rows is
+about a year per doctor) in a throwaway SQLite database and times:
+
+- ``doctor``: one doctor's year, per week
+- ``departments``: every specialization's year, per week
+- both again without NumPy (``*_no_numpy``), and served from the cache
+
+Cold timings clear utilization_cache before every call.
+
+Usage:
+    python -m benchmarks.bench_utilization --appointments 100000 1000000
+"""
+
+import argparse
+import json
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from benchmarks.harness import seed, summarize, temp_database, time_calls, tomorrow
+from src.cache import utilization_cache
+from src.services import utilization_service
+
+DOCTORS = 60
+
+
+def _timed(fn, calls: int, cold: bool) -> dict:
+    def call(i: int):
+        if cold:
+            utilization_cache.clear()
+        return fn(i)
+
+    summary = summarize(time_calls(call, calls))
+    return {"p50_ms": summary["p50_ms"], "p99_ms": summary["p99_ms"]}
+
+
+def run(appointments: int, calls: int) -> dict:
+    origin = tomorrow()
+    start, end = origin.date(), (origin + timedelta(days=364)).date()
+    with temp_database() as engine:
+        seed(engine, 1000, DOCTORS, appointments, origin)
+        result = {"appointments": appointments}
+        with Session(engine) as db:
+            operations = {
+                "doctor": lambda i: utilization_service.doctor_utilization(
+                    db, 1, start, end, "week"
+                ),
+                "departments": lambda i: utilization_service.department_utilization(
+                    db, start, end, "week"
+                ),
+            }
+            numpy = utilization_service.numpy
+            for name, operation in operations.items():
+                result[name] = _timed(operation, calls, cold=True)
+                result[f"{name}_cached"] = _timed(operation, calls, cold=False)
+                utilization_service.numpy = None
+                result[f"{name}_no_numpy"] = _timed(operation, calls, cold=True)
+                utilization_service.numpy = numpy
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--appointments", type=int, nargs="+", default=[100_000, 1_000_000]
+    )
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps([run(n, args.calls) for n in args.appointments], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Measure throughput scaling with the number of worker processes.
+
+Serves the app through ``src.runner`` with 1, 2, 4, ... workers (up to the
+CPU count) against one throwaway SQLite database and drives cached reads,
+GET /doctors/{id} and GET /appointments, from several client processes so
+the load generator does not saturate first. Reports requests/sec per worker
+count and the scaling efficiency relative to one worker (1.0 = linear).
+Client and server share the machine, so efficiency falls short of 1.0 once
+the clients need a core of their own.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 1 2 4 --clients 4 --seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from benchmarks.bench_async_load import _seed
+from benchmarks.harness import free_port, start_uvicorn
+
+
+async def _drive(base_url: str, doctor_id: int, day: str, seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    done = 0
+    async with httpx.AsyncClient(base_url=base_url) as client:
+
+        async def worker(n: int) -> None:
+            nonlocal done
+            while time.perf_counter() < deadline:
+                if n % 2:
+                    await client.get(f"/doctors/{doctor_id}")
+                else:
+                    await client.get(
+                        "/appointments", params={"date": day, "doctor_id": doctor_id}
+                    )
+                done += 1
+
+        await asyncio.gather(*(worker(n) for n in range(16)))
+    return done
+
+
+def _client(base_url: str, doctor_id: int, day: str, seconds: float) -> int:
+    return asyncio.run(_drive(base_url, doctor_id, day, seconds))
+
+
+def run(workers: int, clients: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'workers.db')}",
+            "AUTO_CREATE_SCHEMA": "1",
+            "ARCHIVE_INTERVAL_SECONDS": "0",
+        }
+        port = free_port()
+        server = start_uvicorn(env, port, workers=workers)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            doctor_id, day = _seed(base_url)
+            with ProcessPoolExecutor(clients) as pool:
+                done = sum(
+                    pool.map(
+                        _client,
+                        [base_url] * clients,
+                        [doctor_id] * clients,
+                        [day] * clients,
+                        [seconds] * clients,
+                    )
+                )
+        finally:
+            server.terminate()
+            server.wait()
+    return {"workers": workers, "rps": round(done / seconds, 1)}
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[n for n in (1, 2, 4, 8, 16, 32) if n <= cpus],
+    )
+    parser.add_argument("--clients", type=int, default=max(2, cpus // 2))
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    results = [run(workers, args.clients, args.seconds) for workers in args.workers]
+    single = results[0]["rps"] / results[0]["workers"]
+    for result in results:
+        result["efficiency"] = round(result["rps"] / (single * result["workers"]), 2)
+    print(json.dumps({"cpus": cpus, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
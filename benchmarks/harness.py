@@ -0,0 +1,199 @@
+"""Shared helpers for the benchmarks: throwaway databases, seeding, timing,
+local uvicorn servers and comparison against a stored baseline."""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from src.database import Base
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+
+BATCH_SIZE = 10_000
+SPECIALIZATIONS = ("General", "Cardiology", "Dermatology", "Neurology", "Pediatrics")
+
+
+@contextmanager
+def temp_database(name: str = "bench.db"):
+    """Yield an engine on an empty SQLite database that is deleted afterwards."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, name)}")
+        Base.metadata.create_all(bind=engine)
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+
+def _insert_batched(engine: Engine, table, rows) -> None:
+    batch = []
+    with engine.begin() as conn:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                conn.execute(insert(table), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(table), batch)
+
+
+def seed(
+    engine: Engine, patients: int, doctors: int, appointments: int, origin: datetime
+) -> None:
+    """Insert synthetic rows; appointments are non-overlapping 30-minute
+    slots round-robin across doctors, starting at ``origin``."""
+    _insert_batched(
+        engine,
+        Patient,
+        (
+            {
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "email": f"patient{i}@example.com",
+                "phone": f"555{i:010d}",
+            }
+            for i in range(patients)
+        ),
+    )
+    _insert_batched(
+        engine,
+        Doctor,
+        (
+            {
+                "full_name": f"Dr. {i}",
+                "specialization": SPECIALIZATIONS[i % len(SPECIALIZATIONS)],
+            }
+            for i in range(doctors)
+        ),
+    )
+    _insert_batched(
+        engine,
+        Appointment,
+        (
+            {
+                "patient_id": i % patients + 1,
+                "doctor_id": i % doctors + 1,
+                "start_time": origin + timedelta(minutes=30 * (i // doctors)),
+                "duration_minutes": 30,
+            }
+            for i in range(appointments)
+        ),
+    )
+
+
+def tomorrow() -> datetime:
+    """Midnight UTC at the start of tomorrow."""
+    return (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(
+    env: dict[str, str],
+    port: int,
+    ready_path: str = "/docs",
+    timeout: float = 20,
+    workers: int = 1,
+) -> subprocess.Popen:
+    """Start ``uvicorn src.main:app`` (``src.runner`` for several workers)
+    with extra environment variables and return once ``ready_path`` answers
+    200."""
+    if workers > 1:
+        command = ["-m", "src.runner", "--workers", str(workers)]
+    else:
+        command = ["-m", "uvicorn", "src.main:app"]
+    process = subprocess.Popen(  # nosec B603 - fixed argv, local benchmark only
+        [sys.executable, *command, "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, **env),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{ready_path}", timeout=1).is_success:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    process.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def summarize(timings_ms: list[float]) -> dict:
+    """Throughput and latency percentiles for a list of per-call timings."""
+    ordered = sorted(timings_ms)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "ops_per_second": round(len(ordered) / (total / 1000), 1) if total else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 4),
+        "p95_ms": round(percentile(ordered, 0.95), 4),
+        "p99_ms": round(percentile(ordered, 0.99), 4),
+    }
+
+
+def time_calls(fn, calls: int) -> list[float]:
+    """Call ``fn(i)`` for i in range(calls); return per-call milliseconds."""
+    timings = []
+    for i in range(calls):
+        began = time.perf_counter()
+        fn(i)
+        timings.append((time.perf_counter() - began) * 1000)
+    return timings
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every benchmark in both reports that regressed by more than
+    ``threshold`` (0.2 = 20%): lower throughput or a higher p99."""
+    regressions = []
+    for key, result in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if result["ops_per_second"] < before["ops_per_second"] * (1 - threshold):
+            regressions.append(
+                f"{key}: ops_per_second {before['ops_per_second']} -> "
+                f"{result['ops_per_second']}"
+            )
+        if result["p99_ms"] > before["p99_ms"] * (1 + threshold):
+            regressions.append(
+                f"{key}: p99_ms {before['p99_ms']} -> {result['p99_ms']}"
+            )
+    return regressions
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def write_report(path: str, report: dict) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write("\n")
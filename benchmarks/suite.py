@@ -0,0 +1,216 @@
+"""Throughput/latency suite for the core encounter operations.
+
+For each scale the suite seeds a throwaway SQLite database with N patients,
+N appointments and N/1000 doctors (at least 10), then times
+create_appointment, list_appointments, get_patient and get_doctor through
+each driver:
+
+- ``service``: direct calls into src.services with one Session
+- ``http``: requests through FastAPI's TestClient against src.main.app
+
+Startup is measured too (benchmarks.bench_startup): ``import src.main`` and
+time to first request, keyed ``startup:import`` and ``startup:first_request``.
+
+Results are keyed ``<driver>:<operation>:<scale>`` and written as JSON. With
+``--baseline`` the run is compared against an earlier report and exits with
+status 1 if any throughput dropped, or p99 grew, by more than
+``--threshold``.
+
+Usage:
+    python -m benchmarks.suite --scales 1000 100000 --output current.json
+    python -m benchmarks.suite --baseline baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+from datetime import timedelta
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks import bench_startup
+from benchmarks.harness import (
+    compare,
+    load_report,
+    seed,
+    summarize,
+    temp_database,
+    time_calls,
+    tomorrow,
+    write_report,
+)
+from src.cache import doctor_cache, patient_cache, schedule_cache
+from src.schemas.appointment import AppointmentCreate
+from src.services.appointment_service import create_appointment, list_appointments
+from src.services.doctor_service import get_doctor_cached
+from src.services.patient_service import get_patient_cached
+from src.services.schedule_index import schedule_index
+
+OPERATIONS = ("create_appointment", "list_appointments", "get_patient", "get_doctor")
+DRIVERS = ("service", "http")
+
+
+class Workload:  # pylint: disable=too-few-public-methods
+    """Deterministic arguments for the i-th call of each operation."""
+
+    def __init__(self, scale: int, calls: int) -> None:
+        self.patients = scale
+        self.doctors = max(10, scale // 1000)
+        self.appointments = scale
+        self.origin = tomorrow()
+        slots_per_doctor = -(-self.appointments // self.doctors)
+        self.seeded_days = max(1, slots_per_doctor * 30 // (24 * 60))
+        # New bookings go after the seeded schedule so none of them conflict.
+        self.free_from = self.origin + timedelta(minutes=30 * (slots_per_doctor + 1))
+        rng = random.Random(scale)
+        self.ids = [rng.randrange(1, scale + 1) for _ in range(calls)]
+
+    def booking(self, i: int) -> AppointmentCreate:
+        return AppointmentCreate(
+            patient_id=self.ids[i],
+            doctor_id=i % self.doctors + 1,
+            start_time=self.free_from + timedelta(minutes=30 * (i // self.doctors)),
+            duration_minutes=30,
+        )
+
+    def day(self, i: int):
+        return self.origin + timedelta(days=i % self.seeded_days)
+
+    def doctor_id(self, i: int) -> int:
+        return self.ids[i] % self.doctors + 1
+
+
+def service_calls(db: Session, work: Workload) -> dict:
+    return {
+        "create_appointment": lambda i: create_appointment(db, work.booking(i)),
+        "list_appointments": lambda i: list_appointments(
+            db, work.day(i), work.doctor_id(i)
+        ),
+        "get_patient": lambda i: get_patient_cached(db, work.ids[i]),
+        "get_doctor": lambda i: get_doctor_cached(db, work.doctor_id(i)),
+    }
+
+
+def http_calls(client, work: Workload) -> dict:
+    def book(i: int) -> None:
+        response = client.post(
+            "/appointments", json=work.booking(i).model_dump(mode="json")
+        )
+        response.raise_for_status()
+
+    return {
+        "create_appointment": book,
+        "list_appointments": lambda i: client.get(
+            "/appointments",
+            params={
+                "date": work.day(i).isoformat(),
+                "doctor_id": work.doctor_id(i),
+            },
+        ).raise_for_status(),
+        "get_patient": lambda i: client.get(
+            f"/patients/{work.ids[i]}"
+        ).raise_for_status(),
+        "get_doctor": lambda i: client.get(
+            f"/doctors/{work.doctor_id(i)}"
+        ).raise_for_status(),
+    }
+
+
+def _reset_process_state() -> None:
+    schedule_index.clear()
+    doctor_cache.clear()
+    patient_cache.clear()
+    schedule_cache.clear()
+
+
+def run_scale(scale: int, drivers, operations, calls: int) -> dict:
+    """Seed one database of the given scale and time every driver/operation."""
+    # pylint: disable=import-outside-toplevel
+    results = {}
+    work = Workload(scale, calls)
+    for driver in drivers:
+        # Bookings are not rolled back, so each driver gets a fresh database.
+        with temp_database() as engine:
+            seed(engine, work.patients, work.doctors, work.appointments, work.origin)
+            _reset_process_state()
+            with Session(engine) as db:
+                if driver == "service":
+                    table = service_calls(db, work)
+                else:
+                    # Imported lazily: src.main builds the app at import time.
+                    from fastapi.testclient import TestClient
+
+                    from src.main import app, get_db
+
+                    local_session = sessionmaker(bind=engine)
+
+                    def override_get_db():
+                        with local_session() as session:
+                            yield session
+
+                    app.dependency_overrides[get_db] = override_get_db
+                    table = http_calls(TestClient(app), work)
+                try:
+                    for operation in operations:
+                        timings = time_calls(table[operation], calls)
+                        results[f"{driver}:{operation}:{scale}"] = summarize(timings)
+                finally:
+                    if driver == "http":
+                        app.dependency_overrides.pop(get_db, None)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--drivers", nargs="+", default=list(DRIVERS), choices=DRIVERS)
+    parser.add_argument(
+        "--operations", nargs="+", default=list(OPERATIONS), choices=OPERATIONS
+    )
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument(
+        "--startup-runs", type=int, default=3, help="0 skips the startup timings"
+    )
+    parser.add_argument("--output", help="write the JSON report to this path")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed relative regression, e.g. 0.2 for 20%% (default)",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scales:
+        results.update(run_scale(scale, args.drivers, args.operations, args.calls))
+    if args.startup_runs:
+        for name, summary in bench_startup.run(args.startup_runs).items():
+            results[f"startup:{name}"] = summary
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "calls": args.calls,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        write_report(args.output, report)
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.baseline:
+        regressions = compare(
+            results, load_report(args.baseline)["results"], args.threshold
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Asyncio variants of the core endpoints, served when USE_ASYNC_DB is set.
+
+Paths, payloads and error responses match the sync handlers in src/main.py;
+only the session type differs, so no request waits on a threadpool slot.
+"""
+
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_async_sessionmaker
+from src.schemas.appointment import (
+    AppointmentCreate,
+    AppointmentRead,
+    ScheduledAppointment,
+)
+from src.schemas.doctor import DoctorCreate, DoctorRead
+from src.schemas.patient import PatientCreate, PatientRead
+from src.serialization import dump_line, etag_response, rows_response
+from src.services.appointment_service import (
+    create_appointment_async,
+    day_listing_async,
+    iter_appointments_async,
+    page_appointments_async,
+)
+from src.services.doctor_service import (
+    create_doctor_async,
+    deactivate_doctor_async,
+    get_doctor_cached_async,
+    is_doctor_active_async,
+)
+from src.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.services.patient_service import (
+    create_patient_async,
+    get_patient_cached_async,
+)
+
+router = APIRouter()
+
+
+# Dependency
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+# ---------------- Patients ----------------
+@router.post("/patients", response_model=PatientRead)
+async def create_patient(
+    patient: PatientCreate, db: AsyncSession = Depends(get_async_db)
+):
+    return await create_patient_async(db, patient)
+
+
+@router.get("/patients/{patient_id}", response_model=PatientRead)
+async def get_patient(patient_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_patient_cached_async(db, patient_id)
+
+
+# ---------------- Doctors ----------------
+@router.post("/doctors", response_model=DoctorRead)
+async def create_doctor(doctor: DoctorCreate, db: AsyncSession = Depends(get_async_db)):
+    return await create_doctor_async(db, doctor)
+
+
+@router.put("/doctors/{doctor_id}/deactivate", response_model=DoctorRead)
+async def deactivate_doctor(doctor_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await deactivate_doctor_async(db, doctor_id)
+
+
+@router.get("/doctors/{doctor_id}", response_model=DoctorRead)
+async def get_doctor(doctor_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await get_doctor_cached_async(db, doctor_id)
+
+
+# ---------------- Appointments ----------------
+@router.post("/appointments", response_model=AppointmentRead, status_code=201)
+async def create_appointment(
+    appt: AppointmentCreate, db: AsyncSession = Depends(get_async_db)
+):
+    if not await is_doctor_active_async(db, appt.doctor_id):
+        raise HTTPException(status_code=400, detail="Doctor not available")
+
+    # Conflict check and insert under a per-doctor lock.
+    return await create_appointment_async(db, appt)
+
+
+@router.get("/appointments", response_model=list[ScheduledAppointment])
+async def list_appointments(
+    date: datetime,
+    doctor_id: int | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    output: Literal["json", "ndjson"] = Query("json", alias="format"),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if output == "ndjson":
+
+        async def lines():
+            async with get_async_sessionmaker()() as session:
+                async for row in iter_appointments_async(
+                    session, date, doctor_id, cursor
+                ):
+                    yield dump_line(row)
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    if limit or cursor:
+        results, next_cursor = await page_appointments_async(
+            db, date, doctor_id, limit or DEFAULT_PAGE_SIZE, cursor
+        )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return rows_response(results, headers)
+
+    # Encoded once per doctor/day and reused until a booking lands in it.
+    etag, body = await day_listing_async(db, date, doctor_id)
+    return etag_response(etag, body, if_none_match)
@@ -0,0 +1,292 @@
+"""Write-behind audit log of create/deactivate/booking events.
+
+Services call ``record(action, entity_id, **details)`` once their change is
+committed. The event goes into a bounded in-memory queue and the request
+moves on; a writer thread drains the queue in batches into the configured
+sink, so audit writes never add a statement to a request's transaction.
+
+When the queue is full, producers wait for room up to PUT_TIMEOUT_SECONDS
+(backpressure: writes slow down to the speed of the sink) and only then drop
+the event, counting and logging it. Services record from the request, so
+while the sink is stalled a write request can take up to that much longer:
+sync handlers block their threadpool thread for it, async ones wait off the
+event loop. Closing the log (the app's lifespan shutdown) stops the writer
+after it has flushed everything queued.
+
+Sinks implement AuditSink: DatabaseSink inserts into saniya_audit_events,
+SegmentFileSink appends NDJSON to rotating segment files in AUDIT_DIR.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Protocol
+
+from sqlalchemy import insert
+
+from src.instrumentation import SECONDS_BUCKETS, Histogram
+from src.models.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Events waiting for the writer; producers block when it is full
+QUEUE_SIZE = 10_000
+# Events written to the sink at a time
+BATCH_SIZE = 500
+# Longest a producer waits for room before the event is dropped
+PUT_TIMEOUT_SECONDS = 1.0
+# Tries per batch before its events are counted as failed
+WRITE_ATTEMPTS = 3
+# Segment files are rotated once they reach this size
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+flush_seconds = Histogram(
+    "audit_flush_seconds", "Time to write one batch of audit events.", SECONDS_BUCKETS
+)
+
+
+class AuditSink(Protocol):
+    """Durable destination of audit events."""
+
+    def write(self, events: list[dict]) -> None:
+        """Persist a batch; raise to have it retried."""
+
+    def close(self) -> None:
+        """Release resources."""
+
+
+class DatabaseSink:
+    """Insert each batch with one executemany in its own transaction."""
+
+    def __init__(self, session_factory) -> None:
+        self.session_factory = session_factory
+
+    def write(self, events: list[dict]) -> None:
+        with self.session_factory() as db:
+            db.execute(insert(AuditEvent), events)
+            db.commit()
+
+    def close(self) -> None:
+        pass
+
+
+class SegmentFileSink:
+    """Append NDJSON to ``<directory>/audit-<pid>-<n>.ndjson``, starting the
+    next segment once the current one reaches ``max_bytes``.
+
+    Segments are named after the writing process, so the workers of one host
+    can share the directory without appending to each other's files.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = SEGMENT_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._prefix = f"audit-{os.getpid()}-"
+        os.makedirs(directory, exist_ok=True)
+        # Other files (another process's segments, or anything else) are
+        # left alone.
+        numbers = [
+            int(name[len(self._prefix) : -len(".ndjson")])
+            for name in os.listdir(directory)
+            if re.fullmatch(rf"{self._prefix}\d+\.ndjson", name)
+        ]
+        self._number = max(numbers, default=0)
+        self._file = None
+
+    def _open(self):
+        if self._file is None or self._file.tell() >= self.max_bytes:
+            if self._file is not None:
+                self._file.close()
+                self._number += 1
+            path = os.path.join(
+                self.directory, f"{self._prefix}{self._number:06d}.ndjson"
+            )
+            # Kept open across batches until rotation or close().
+            # pylint: disable-next=consider-using-with
+            self._file = open(path, "ab")  # noqa: SIM115
+        return self._file
+
+    def write(self, events: list[dict]) -> None:
+        segment = self._open()
+        segment.write(
+            b"".join(
+                json.dumps(event, default=str).encode() + b"\n" for event in events
+            )
+        )
+        segment.flush()
+        os.fsync(segment.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class AuditLog:
+    """Bounded event queue plus the thread that writes it to a sink."""
+
+    def __init__(self, maxsize: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._sink: AuditSink | None = None
+        self._thread: threading.Thread | None = None
+        self._closed = threading.Event()
+        self._counts = {"written": 0, "dropped": 0, "failed": 0}
+
+    def _count(self, name: str, n: int) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def _drop(self, event: dict) -> None:
+        self._count("dropped", 1)
+        logger.error(
+            "Audit queue full; dropped %s %s", event["action"], event["entity_id"]
+        )
+
+    @staticmethod
+    def _event(action: str, entity_id: int | None, details: dict) -> dict:
+        return {
+            "occurred_at": datetime.now(timezone.utc),
+            "action": action,
+            "entity_id": entity_id,
+            "details": details or None,
+        }
+
+    def record(self, action: str, entity_id: int | None = None, **details) -> None:
+        """Queue an event (details must be JSON values), blocking the caller
+        up to PUT_TIMEOUT_SECONDS for room while the writer catches up."""
+        event = self._event(action, entity_id, details)
+        try:
+            self._queue.put_nowait(event)
+            return
+        except queue.Full:
+            if self._thread is None:
+                # Nobody is draining the queue; waiting would not help.
+                self._drop(event)
+                return
+        try:
+            self._queue.put(event, timeout=PUT_TIMEOUT_SECONDS)
+        except queue.Full:
+            self._drop(event)
+
+    async def record_async(
+        self, action: str, entity_id: int | None = None, **details
+    ) -> None:
+        """Async variant of record(); waits for room off the event loop."""
+        event = self._event(action, entity_id, details)
+        try:
+            self._queue.put_nowait(event)
+            return
+        except queue.Full:
+            if self._thread is None:
+                self._drop(event)
+                return
+        try:
+            await asyncio.to_thread(self._queue.put, event, timeout=PUT_TIMEOUT_SECONDS)
+        except queue.Full:
+            self._drop(event)
+
+    def _take(self, timeout: float | None) -> list[dict]:
+        """Up to batch_size queued events, waiting up to ``timeout`` seconds
+        for the first one (None: not at all)."""
+        try:
+            if timeout is None:
+                batch = [self._queue.get_nowait()]
+            else:
+                batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, sink: AuditSink, batch: list[dict]) -> None:
+        for attempt in range(WRITE_ATTEMPTS):
+            started = time.perf_counter()
+            try:
+                sink.write(batch)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Audit write failed (attempt %d)", attempt + 1)
+                time.sleep(0.1 * 2**attempt)
+                continue
+            flush_seconds.observe((type(sink).__name__,), time.perf_counter() - started)
+            self._count("written", len(batch))
+            return
+        self._count("failed", len(batch))
+
+    def flush(self, sink: AuditSink) -> int:
+        """Write everything queued to ``sink`` now; returns the event count."""
+        flushed = 0
+        while batch := self._take(None):
+            self._write(sink, batch)
+            flushed += len(batch)
+        return flushed
+
+    def _run(self, sink: AuditSink, interval: float) -> None:
+        while not self._closed.is_set():
+            batch = self._take(interval)
+            if batch:
+                self._write(sink, batch)
+        self.flush(sink)
+
+    def start(self, sink: AuditSink, interval: float) -> None:
+        """Start writing queued events to ``sink``, waking at least every
+        ``interval`` seconds to notice close()."""
+        self.close()
+        self._closed.clear()
+        self._sink = sink
+        self._thread = threading.Thread(
+            target=self._run, args=(sink, interval), name="audit", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the writer once it has flushed the queue (blocking)."""
+        if self._thread is None:
+            return
+        self._closed.set()
+        self._thread.join()
+        self._thread = None
+        self._sink.close()
+        self._sink = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"queue_depth": self._queue.qsize(), **self._counts}
+
+
+# Shared by every service in this process.
+audit_log = AuditLog()
+
+
+def record(action: str, entity_id: int | None = None, **details) -> None:
+    """Queue an audit event on the process's audit log."""
+    audit_log.record(action, entity_id, **details)
+
+
+async def record_async(action: str, entity_id: int | None = None, **details) -> None:
+    """Async variant of record()."""
+    await audit_log.record_async(action, entity_id, **details)
+
+
+def open_audit_log(settings, session_factory) -> None:
+    """Start the writer for the configured sink (AUDIT_SINK)."""
+    if settings.audit_sink == "file":
+        sink = SegmentFileSink(settings.audit_dir, settings.audit_segment_bytes)
+    else:
+        sink = DatabaseSink(session_factory)
+    audit_log.start(sink, settings.audit_flush_interval_seconds)
+
+
+def close_audit_log() -> None:
+    audit_log.close()
@@ -0,0 +1,271 @@
+"""Read-through cache backends for entity lookups.
+
+Values are cached by entity id. The in-process backend is a bounded LRU with
+a TTL; SharedCache adapts any Redis-like client (get/set/delete) so several
+processes can share one store. Writers must call ``delete`` for the ids they
+change. Readers that load a missing value take ``token()`` before the query
+and pass it to ``set``, which drops the value if anything was deleted in
+between, so a value read before a write is never cached after that write's
+invalidation.
+
+ResponseCache holds pre-serialized response bodies with their ETags (the
+per-doctor, per-day appointment listings). VersionedCache holds results over
+arbitrary ranges, which a write invalidates by scope rather than by key.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Protocol
+
+from src.config import get_settings
+
+
+class CacheBackend(Protocol):
+    """Operations every cache backend provides."""
+
+    def get(self, key) -> Any | None:
+        """Return the cached value, or None on a miss."""
+
+    def token(self) -> int:
+        """Generation to pass to set() by a reader about to load a value."""
+
+    def set(self, key, value, token: int | None = None) -> None:
+        """Store a value under key, unless deleted from since ``token``."""
+
+    def delete(self, key) -> None:
+        """Invalidate key."""
+
+    def clear(self) -> None:
+        """Drop every entry."""
+
+    def stats(self) -> dict[str, int]:
+        """Counters: hits, misses, evictions, size."""
+
+
+class LRUTTLCache:
+    """Thread-safe in-process cache bounded by entry count and age."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def token(self) -> int:
+        return self._generation
+
+    def set(self, key, value, token: int | None = None) -> None:
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+            }
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class SharedCache:
+    """Cache backend over a shared key-value store such as Redis.
+
+    ``client`` needs ``get(key)``, ``set(key, value, ex=seconds)`` and
+    ``delete(key)``; values are stored as JSON under ``<prefix>:<key>``, so
+    datetimes come back as ISO strings. The generation checked by ``set`` is
+    this process's: every worker's deletes reach it through invalidate().
+    """
+
+    def __init__(self, client, prefix: str, ttl: float = 300.0) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key) -> Any | None:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def token(self) -> int:
+        return self._generation
+
+    def set(self, key, value, token: int | None = None) -> None:
+        raw = json.dumps(value, default=_json_default)
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self.client.set(self._key(key), raw, ex=int(self.ttl))
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._generation += 1
+            self.client.delete(self._key(key))
+
+    def clear(self) -> None:
+        """Shared entries expire by TTL; nothing to drop locally."""
+        with self._lock:
+            self._generation += 1
+
+    def stats(self) -> dict[str, int]:
+        # Evictions and size are owned by the shared store.
+        return {"hits": self.hits, "misses": self.misses, "evictions": 0, "size": 0}
+
+
+class ResponseCache:
+    """Encoded response bodies and their ETags over an LRUTTLCache.
+
+    Readers take a ``token()`` before running the query and pass it to
+    ``put``; the put is dropped if anything was invalidated in between, so a
+    body built from rows read before a write is never cached after that
+    write's invalidation.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self._entries = LRUTTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, key) -> tuple[str, bytes] | None:
+        """Return (etag, body), or None on a miss."""
+        return self._entries.get(key)
+
+    def token(self) -> int:
+        return self._generation
+
+    def put(self, key, token: int, body: bytes) -> str:
+        """Cache body under key unless invalidated since ``token``; return
+        its ETag either way."""
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        with self._lock:
+            if token == self._generation:
+                self._entries.set(key, (etag, body))
+        return etag
+
+    def invalidate(self, *keys) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._entries.stats()
+
+
+class VersionedCache:
+    """Results keyed by (scope, version of the scope, key) over an LRUTTLCache.
+
+    ``bump(scope)`` moves the scope to a new version, so every entry cached
+    under the old one becomes unreachable at once and ages out of the LRU.
+    Readers take ``key()`` before running the query: a result read before a
+    write is then stored under the version that write has retired.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0) -> None:
+        self._entries = LRUTTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self._versions: dict = {}
+
+    def key(self, scope, key) -> tuple:
+        return (scope, self._versions.get(scope, 0), key)
+
+    def get(self, key) -> Any | None:
+        return self._entries.get(key)
+
+    def set(self, key, value) -> None:
+        self._entries.set(key, value)
+
+    def bump(self, *scopes) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._entries.stats()
+
+
+_settings = get_settings()
+
+# Entity caches keyed by primary key; swap in a SharedCache for multi-process
+# deployments that need one coherent view.
+doctor_cache: CacheBackend = LRUTTLCache(
+    _settings.cache_maxsize, _settings.cache_ttl_seconds
+)
+patient_cache: CacheBackend = LRUTTLCache(
+    _settings.cache_maxsize, _settings.cache_ttl_seconds
+)
+
+# Encoded GET /appointments bodies keyed by (doctor_id or None, UTC date).
+schedule_cache = ResponseCache(
+    _settings.schedule_cache_maxsize, _settings.schedule_cache_ttl_seconds
+)
+
+# Utilization reports; scopes are doctor ids, and None for the department
+# reports, which every booking affects.
+utilization_cache = VersionedCache(
+    _settings.utilization_cache_maxsize, _settings.utilization_cache_ttl_seconds
+)
@@ -0,0 +1,99 @@
+"""Maintenance commands.
+
+Usage:
+    python -m src.cli archive [--older-than-days N] [--batch-size N]
+    python -m src.cli import-patients FILE [--format csv|ndjson] [--chunk-size N]
+"""
+
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+from src.audit import close_audit_log, open_audit_log
+from src.config import get_settings
+from src.database import SessionLocal
+from src.models import doctor, patient  # noqa: F401  (register the mappers)
+from src.services.archive_service import archive_appointments, archive_horizon
+from src.services.patient_import_service import (
+    CHUNK_SIZE,
+    import_patients,
+    iter_lines,
+)
+
+# Bytes read from the import file at a time
+READ_SIZE = 64 * 1024
+
+
+def archive(args: argparse.Namespace) -> None:
+    """Move past appointments to the archive table once."""
+    before = archive_horizon()
+    if args.older_than_days is not None:
+        midnight = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        before = midnight - timedelta(days=args.older_than_days)
+    with SessionLocal() as db:
+        moved = archive_appointments(db, before, args.batch_size)
+    print(f"Archived {moved} appointments starting before {before.isoformat()}")
+
+
+def import_patients_file(args: argparse.Namespace) -> None:
+    """Create patients from a CSV or NDJSON file, a chunk at a time."""
+    source_format = args.format
+    if source_format is None:
+        extension = os.path.splitext(args.file)[1].lower()
+        source_format = "ndjson" if extension in (".ndjson", ".jsonl") else "csv"
+    with open(args.file, "rb") as source, SessionLocal() as db:
+        chunks = iter(lambda: source.read(READ_SIZE), b"")
+        try:
+            report = import_patients(
+                db, iter_lines(chunks), source_format, args.chunk_size
+            )
+        except HTTPException as exc:
+            raise SystemExit(f"{args.file}: {exc.detail}") from exc
+    for error in report["errors"]:
+        print(f"{args.file}:{error['line']}: {error['error']}")
+    if report["errors_truncated"]:
+        print("(further errors not listed)")
+    print(f"Imported {report['inserted']} patients, rejected {report['rejected']}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Patient encounter maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive_parser = commands.add_parser("archive", help=archive.__doc__)
+    archive_parser.add_argument(
+        "--older-than-days",
+        type=int,
+        help="archive appointments that started before midnight UTC this many "
+        "days ago (default: ARCHIVE_AFTER_DAYS)",
+    )
+    archive_parser.add_argument("--batch-size", type=int)
+    archive_parser.set_defaults(handler=archive)
+
+    import_parser = commands.add_parser(
+        "import-patients", help=import_patients_file.__doc__
+    )
+    import_parser.add_argument("file")
+    import_parser.add_argument(
+        "--format",
+        choices=("csv", "ndjson"),
+        help="default: ndjson for .ndjson/.jsonl files, otherwise csv",
+    )
+    import_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    import_parser.set_defaults(handler=import_patients_file)
+
+    args = parser.parse_args(argv)
+    # Commands record audit events too; close() flushes them before exit.
+    open_audit_log(get_settings(), SessionLocal)
+    try:
+        args.handler(args)
+    finally:
+        close_audit_log()
+
+
+if __name__ == "__main__":
+    main()
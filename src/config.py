@@ -0,0 +1,220 @@
+"""Application settings read from the environment (and a .env file).
+
+Engine and pool options come from a named profile (DB_PROFILE) that
+individual DB_* variables can override:
+
+=============  ===========  ==========
+setting        development  production
+=============  ===========  ==========
+pool_size      5            20
+max_overflow   10           10
+pool_timeout   30 s         10 s
+pool_recycle   3600 s       1800 s
+echo           off          off
+pre_ping       always       never
+=============  ===========  ==========
+
+``pre_ping=never`` skips the per-checkout round trip and relies on
+pool_recycle plus SQLAlchemy invalidating the pool on disconnect errors.
+For SQLite the SQLITE_* PRAGMAs are applied to every new connection.
+
+Nothing connects to the database at import. AUTO_CREATE_SCHEMA creates
+missing tables at startup (development only; use ``alembic upgrade head``
+otherwise) and STARTUP_PREWARM opens the pool's connections and loads the
+schedule index before the first request.
+
+Worker processes of one host keep their caches coherent by publishing
+invalidations through datagram sockets in INVALIDATION_DIR (src.runner sets
+one up; unset means a single process).
+
+Appointments that started more than ARCHIVE_AFTER_DAYS days ago are moved
+to the archive table every ARCHIVE_INTERVAL_SECONDS (0 disables the
+background job; ``python -m src.cli archive`` runs one pass by hand).
+
+Audit events are written behind the requests by a background writer, to
+the saniya_audit_events table (AUDIT_SINK=database) or to NDJSON segment
+files in AUDIT_DIR rotated at AUDIT_SEGMENT_BYTES (AUDIT_SINK=file).
+
+Responses to POSTs carrying an Idempotency-Key are kept for
+IDEMPOTENCY_TTL_SECONDS in process memory (IDEMPOTENCY_STORE=memory, at most
+IDEMPOTENCY_MAXSIZE keys) or in the saniya_idempotency_keys table
+(IDEMPOTENCY_STORE=database, shared by the workers).
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+PROFILES = {
+    "development": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30.0,
+        "pool_recycle": 3600,
+        "echo": False,
+        "pre_ping": "always",
+    },
+    "production": {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10.0,
+        "pool_recycle": 1800,
+        "echo": False,
+        "pre_ping": "never",
+    },
+}
+
+PRE_PING_STRATEGIES = ("always", "never")
+AUDIT_SINKS = ("database", "file")
+IDEMPOTENCY_STORES = ("memory", "database")
+
+
+def _flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def _int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(default if value is None else value)
+
+
+def _float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(default if value is None else value)
+
+
+@dataclass(frozen=True)
+class Settings:  # pylint: disable=too-many-instance-attributes
+    """Resolved configuration; build it with Settings.from_env()."""
+
+    database_url: str = "sqlite:///./test.db"
+    async_database_url: str | None = None
+    use_async_db: bool = False
+    auto_create_schema: bool = False
+    invalidation_dir: str | None = None
+    startup_prewarm: bool = False
+
+    profile: str = "development"
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 3600
+    echo: bool = False
+    pre_ping: str = "always"
+
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64_000  # negative = KiB, i.e. 64 MB
+    sqlite_busy_timeout_ms: int = 5000
+
+    cache_maxsize: int = 10_000
+    cache_ttl_seconds: float = 300.0
+    schedule_cache_maxsize: int = 4096
+    schedule_cache_ttl_seconds: float = 60.0
+    utilization_cache_maxsize: int = 1024
+    utilization_cache_ttl_seconds: float = 300.0
+
+    archive_after_days: int = 30
+    archive_interval_seconds: float = 3600.0
+    archive_batch_size: int = 1000
+
+    audit_sink: str = "database"
+    audit_dir: str | None = None
+    audit_segment_bytes: int = 64 * 1024 * 1024
+    audit_flush_interval_seconds: float = 0.5
+
+    idempotency_store: str = "memory"
+    idempotency_ttl_seconds: float = 86_400.0
+    idempotency_maxsize: int = 10_000
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Read the profile, then apply any explicit DB_* overrides."""
+        profile = os.getenv("DB_PROFILE", "development")
+        if profile not in PROFILES:
+            raise ValueError(
+                f"Unknown DB_PROFILE {profile!r}; expected one of {sorted(PROFILES)}"
+            )
+        base = PROFILES[profile]
+
+        pre_ping = os.getenv("DB_PRE_PING", base["pre_ping"])
+        if pre_ping not in PRE_PING_STRATEGIES:
+            raise ValueError(
+                f"Unknown DB_PRE_PING {pre_ping!r}; "
+                f"expected one of {PRE_PING_STRATEGIES}"
+            )
+
+        audit_sink = os.getenv("AUDIT_SINK", "database")
+        if audit_sink not in AUDIT_SINKS:
+            raise ValueError(
+                f"Unknown AUDIT_SINK {audit_sink!r}; expected one of {AUDIT_SINKS}"
+            )
+        audit_dir = os.getenv("AUDIT_DIR")
+        if audit_sink == "file" and not audit_dir:
+            raise ValueError("AUDIT_SINK=file needs AUDIT_DIR")
+        idempotency_store = os.getenv("IDEMPOTENCY_STORE", "memory")
+        if idempotency_store not in IDEMPOTENCY_STORES:
+            raise ValueError(
+                f"Unknown IDEMPOTENCY_STORE {idempotency_store!r}; "
+                f"expected one of {IDEMPOTENCY_STORES}"
+            )
+
+        return cls(
+            database_url=os.getenv("DATABASE_URL", "sqlite:///./test.db"),
+            async_database_url=os.getenv("ASYNC_DATABASE_URL"),
+            use_async_db=_flag("USE_ASYNC_DB", False),
+            auto_create_schema=_flag("AUTO_CREATE_SCHEMA", False),
+            invalidation_dir=os.getenv("INVALIDATION_DIR"),
+            startup_prewarm=_flag("STARTUP_PREWARM", False),
+            profile=profile,
+            pool_size=_int("DB_POOL_SIZE", base["pool_size"]),
+            max_overflow=_int("DB_MAX_OVERFLOW", base["max_overflow"]),
+            pool_timeout=_float("DB_POOL_TIMEOUT", base["pool_timeout"]),
+            pool_recycle=_int("DB_POOL_RECYCLE", base["pool_recycle"]),
+            echo=_flag("DB_ECHO", base["echo"]),
+            pre_ping=pre_ping,
+            sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+            sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+            sqlite_mmap_size=_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+            sqlite_cache_size=_int("SQLITE_CACHE_SIZE", -64_000),
+            sqlite_busy_timeout_ms=_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+            cache_maxsize=_int("CACHE_MAXSIZE", 10_000),
+            cache_ttl_seconds=_float("CACHE_TTL_SECONDS", 300),
+            schedule_cache_maxsize=_int("SCHEDULE_CACHE_MAXSIZE", 4096),
+            schedule_cache_ttl_seconds=_float("SCHEDULE_CACHE_TTL_SECONDS", 60),
+            utilization_cache_maxsize=_int("UTILIZATION_CACHE_MAXSIZE", 1024),
+            utilization_cache_ttl_seconds=_float("UTILIZATION_CACHE_TTL_SECONDS", 300),
+            archive_after_days=_int("ARCHIVE_AFTER_DAYS", 30),
+            archive_interval_seconds=_float("ARCHIVE_INTERVAL_SECONDS", 3600),
+            archive_batch_size=_int("ARCHIVE_BATCH_SIZE", 1000),
+            audit_sink=audit_sink,
+            audit_dir=audit_dir,
+            audit_segment_bytes=_int("AUDIT_SEGMENT_BYTES", 64 * 1024 * 1024),
+            audit_flush_interval_seconds=_float("AUDIT_FLUSH_INTERVAL_SECONDS", 0.5),
+            idempotency_store=idempotency_store,
+            idempotency_ttl_seconds=_float("IDEMPOTENCY_TTL_SECONDS", 86_400),
+            idempotency_maxsize=_int("IDEMPOTENCY_MAXSIZE", 10_000),
+        )
+
+    def sqlite_pragmas(self) -> list[str]:
+        """PRAGMA statements run on each new SQLite connection."""
+        return [
+            f"PRAGMA journal_mode={self.sqlite_journal_mode}",
+            f"PRAGMA synchronous={self.sqlite_synchronous}",
+            f"PRAGMA mmap_size={self.sqlite_mmap_size}",
+            f"PRAGMA cache_size={self.sqlite_cache_size}",
+            f"PRAGMA busy_timeout={self.sqlite_busy_timeout_ms}",
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings for this process, read once."""
+    load_dotenv()  # take environment variables from .env
+    return Settings.from_env()
@@ -1,30 +1,293 @@
-"""Database configuration and session management."""
+"""Database configuration and session management.
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+Importing this module neither reads the settings (nor .env) nor does any
+database I/O: the engines are created from the settings on first use
+(get_engine, get_async_engine) and the schema is managed by Alembic. A process forked after an engine was created
+starts with that engine's pool emptied, so parent and child never share a
+connection.
+"""
 
-# Connection string to your MySQL database
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-load_dotenv()  # take environment variables from .env
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+from src.config import Settings, get_settings
+from src.instrumentation import install_sql_timing
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
-# Create engine with connection health checks
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True,
-    pool_pre_ping=True,  # ensures stale connections are revalidated
-    pool_recycle=3600,  # recycle connections every hour to avoid timeouts
-)
+# asyncio driver substituted for each backend's sync DBAPI (asyncmy also works
+# for MySQL when set explicitly through ASYNC_DATABASE_URL)
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+    "postgresql": "asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the DBAPI driver of a sync URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS or parsed.get_dialect().is_async:
+        return url
+    return parsed.set(
+        drivername=f"{backend}+{ASYNC_DRIVERS[backend]}"
+    ).render_as_string(hide_password=False)
+
+
+class PoolMetrics:
+    """Counters for connection checkouts and time spent waiting on the pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self.timeouts += timed_out
+
+    def snapshot(self, pool=None) -> dict:
+        """Counters plus the live size/checked-out/overflow of a QueuePool."""
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def engine_options(config: Settings) -> dict:
+    """create_engine() keyword arguments for the configured profile."""
+    options = {
+        "echo": config.echo,
+        "pool_pre_ping": config.pre_ping == "always",
+        "pool_recycle": config.pool_recycle,
+    }
+    # In-memory SQLite uses a single-connection pool without these knobs.
+    if not _is_sqlite_memory(config.database_url):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+        )
+    return options
+
+
+def install_engine_hooks(target: Engine, config: Settings) -> None:
+    """Attach SQLite PRAGMAs, pool counters and SQL timing to an engine."""
+    if target.dialect.name == "sqlite":
+
+        @event.listens_for(target, "connect")
+        def _apply_pragmas(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            for pragma in config.sqlite_pragmas():
+                cursor.execute(pragma)
+            cursor.close()
+
+    @event.listens_for(target, "connect")
+    def _count_connect(_dbapi_connection, _record):
+        pool_metrics.record_connect()
+
+    @event.listens_for(target, "checkout")
+    def _count_checkout(_dbapi_connection, _record, _proxy):
+        pool_metrics.record_checkout()
+
+    install_sql_timing(target)
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """Create the engine with the configured pool on first use."""
+    settings = get_settings()
+    created = create_engine(settings.database_url, **engine_options(settings))
+    install_engine_hooks(created, settings)
+    return created
+
+
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> sessionmaker:
+    """Session factory bound to the engine."""
+    # Sessions are per request and written rows are serialized straight from
+    # the state the flush produced, so commit need not expire them (which
+    # would cost a SELECT per object on the next attribute access).
+    return sessionmaker(
+        bind=get_engine(), autocommit=False, autoflush=False, expire_on_commit=False
+    )
+
+
+def SessionLocal(**kwargs) -> Session:  # pylint: disable=invalid-name
+    """Open a new Session (creating the engine if this is the first)."""
+    return get_sessionmaker()(**kwargs)
+
+
+def begin_write(db: Session) -> bool:
+    """On SQLite, take the database write lock now (BEGIN IMMEDIATE) instead
+    of at the transaction's first write. Returns False on databases with row
+    locks, where callers lock rows instead."""
+    connection = db.connection()
+    if connection.dialect.name != "sqlite":
+        return False
+    # pysqlite opens its transaction, and so takes the lock, at the first write.
+    if not connection.connection.driver_connection.in_transaction:
+        db.execute(text("BEGIN IMMEDIATE"))
+    return True
+
+
+async def begin_write_async(db: "AsyncSession") -> bool:
+    """Async variant of begin_write."""
+    connection = await db.connection()
+    if connection.dialect.name != "sqlite":
+        return False
+    raw = await connection.get_raw_connection()
+    if not raw.driver_connection.in_transaction:
+        await db.execute(text("BEGIN IMMEDIATE"))
+    return True
+
+
+def warm_pool(target: Engine, connections: int) -> None:
+    """Open up to ``connections`` pooled connections ahead of the first
+    requests, so they do not pay the connect (and PRAGMA) cost."""
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(target.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL with its asyncio driver."""
+    settings = get_settings()
+    return settings.async_database_url or to_async_url(settings.database_url)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> "AsyncEngine":
+    """Create the async engine on first use so sync deployments need no driver."""
+    # Imported here: the asyncio extension needs greenlet and an async driver.
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    settings = get_settings()
+    async_engine = create_async_engine(
+        async_database_url(),
+        echo=settings.echo,
+        pool_pre_ping=settings.pre_ping == "always",
+        pool_recycle=settings.pool_recycle,
+    )
+    install_engine_hooks(async_engine.sync_engine, settings)
+    return async_engine
+
+
+async def warm_async_pool(connections: int) -> None:
+    """Async variant of warm_pool, for the async engine."""
+    async_engine = get_async_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await async_engine.connect())
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> "async_sessionmaker":
+    """Session factory bound to the async engine."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    # Attributes are read after commit in async handlers, where an implicit
+    # refresh (lazy IO) is not allowed.
+    return async_sessionmaker(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+def _dispose_inherited_engines() -> None:
+    # Runs in the child after fork(). close=False: the pooled connections
+    # still belong to the parent, so they are dropped without being closed;
+    # the child opens its own on demand.
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
+    if get_async_engine.cache_info().currsize:
+        get_async_engine().sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_inherited_engines)
 
-# Session factory
-SessionLocal = sessionmaker(
-    bind=engine, autocommit=False, autoflush=False
-)  # pylint: disable=invalid-name
 
 # Base class for models
 Base = declarative_base()
+
+
+def __getattr__(name: str):
+    # Lazy module attributes, kept for callers that import them directly.
+    if name == "engine":
+        return get_engine()
+    if name == "ASYNC_DATABASE_URL":
+        return async_database_url()
+    if name == "DATABASE_URL":
+        return get_settings().database_url
+    if name == "USE_ASYNC_DB":
+        return get_settings().use_async_db
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
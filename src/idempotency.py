@@ -0,0 +1,357 @@
+"""Idempotency-Key support for the create endpoints.
+
+A client that retries a POST with the same ``Idempotency-Key`` header gets
+the response of the first execution back (marked ``Idempotent-Replayed:
+true``) instead of running the request again, so a retry storm costs a
+store lookup per request. Responses are kept for IDEMPOTENCY_TTL_SECONDS.
+5xx responses are not kept, so the retry after one runs the request again.
+
+The first request with a key claims it in the store before running. A
+duplicate that arrives while the first is still running waits for its
+response (coalescing), up to WAIT_SECONDS. Reusing a key with a different
+request (method, path or body) is rejected with 422.
+
+Stores implement IdempotencyStore. MemoryStore is a bounded LRU with a TTL
+for a single process. DatabaseStore keeps the keys in
+saniya_idempotency_keys, so several workers share them.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+
+from src.config import get_settings
+from src.database import SessionLocal
+from src.models.idempotency import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# A claim not completed within this long (a crashed worker) can be taken over
+PENDING_TTL_SECONDS = 60.0
+# How often a duplicate checks whether the first execution has finished
+POLL_SECONDS = 0.02
+# Longest a duplicate waits for the first execution before a 409
+WAIT_SECONDS = 30.0
+# DatabaseStore deletes expired keys once per this many claims
+PURGE_EVERY_CLAIMS = 1000
+
+
+@dataclass
+class StoredResponse:
+    """A claimed key; status_code is None until the first execution ends."""
+
+    fingerprint: str
+    status_code: int | None = None
+    content_type: str | None = None
+    body: bytes = b""
+
+
+class IdempotencyStore(Protocol):
+    """Where claimed keys and their responses live."""
+
+    # True when the methods block on I/O (they are then run in a thread).
+    blocking: bool
+
+    def claim(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """Claim an unused key (returns None), or return its stored record."""
+
+    def get(self, key: str) -> StoredResponse | None:
+        """The key's record, or None if it is unused or expired."""
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """Store the response of the claimed key."""
+
+    def release(self, key: str) -> None:
+        """Forget a claim whose execution failed."""
+
+
+class MemoryStore:
+    """Thread-safe in-process store bounded by entry count and age."""
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86_400.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> StoredResponse | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[1]
+
+    def _put(self, key: str, ttl: float, record: StoredResponse) -> None:
+        self._data[key] = (time.monotonic() + ttl, record)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def claim(self, key: str, fingerprint: str) -> StoredResponse | None:
+        with self._lock:
+            record = self._live(key)
+            if record is None:
+                self._put(key, PENDING_TTL_SECONDS, StoredResponse(fingerprint))
+            return record
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            return self._live(key)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            self._put(key, self.ttl, response)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DatabaseStore:
+    """Store shared by every worker: one row per key, claimed by INSERT (the
+    primary key makes exactly one concurrent claim succeed)."""
+
+    blocking = True
+
+    def __init__(self, session_factory, ttl: float = 86_400.0) -> None:
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self._claims = 0
+
+    @staticmethod
+    def _expires(seconds: float) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+    def claim(self, key: str, fingerprint: str) -> StoredResponse | None:
+        self._claims += 1
+        with self.session_factory() as db:
+            if self._claims % PURGE_EVERY_CLAIMS == 0:
+                self.purge(db)
+            for _ in range(3):
+                now = datetime.now(timezone.utc)
+                db.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.key == key, IdempotencyKey.expires_at <= now
+                    )
+                )
+                try:
+                    db.execute(
+                        insert(IdempotencyKey).values(
+                            key=key,
+                            fingerprint=fingerprint,
+                            expires_at=self._expires(PENDING_TTL_SECONDS),
+                        )
+                    )
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+                record = self._get(db, key)
+                if record is not None:
+                    return record
+                # Released or expired since the INSERT failed; claim again.
+        raise RuntimeError(f"Could not claim idempotency key {key!r}")
+
+    @staticmethod
+    def _get(db, key: str) -> StoredResponse | None:
+        row = db.execute(
+            select(
+                IdempotencyKey.fingerprint,
+                IdempotencyKey.status_code,
+                IdempotencyKey.content_type,
+                IdempotencyKey.body,
+            ).where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > datetime.now(timezone.utc),
+            )
+        ).first()
+        if row is None:
+            return None
+        return StoredResponse(row[0], row[1], row[2], row[3] or b"")
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self.session_factory() as db:
+            return self._get(db, key)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self.session_factory() as db:
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status_code,
+                    content_type=response.content_type,
+                    body=response.body,
+                    expires_at=self._expires(self.ttl),
+                )
+            )
+            db.commit()
+
+    def release(self, key: str) -> None:
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            db.commit()
+
+    @staticmethod
+    def purge(db) -> None:
+        """Delete every expired key."""
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.expires_at <= datetime.now(timezone.utc)
+            )
+        )
+        db.commit()
+
+
+_store: IdempotencyStore | None = None
+
+
+def get_store() -> IdempotencyStore:
+    """The store configured by IDEMPOTENCY_STORE, built on first use."""
+    global _store  # pylint: disable=global-statement
+    if _store is None:
+        settings = get_settings()
+        if settings.idempotency_store == "database":
+            _store = DatabaseStore(SessionLocal, settings.idempotency_ttl_seconds)
+        else:
+            _store = MemoryStore(
+                settings.idempotency_maxsize, settings.idempotency_ttl_seconds
+            )
+    return _store
+
+
+def set_store(store: IdempotencyStore | None) -> None:
+    """Replace the store (None: rebuild it from the settings on next use)."""
+    global _store  # pylint: disable=global-statement
+    _store = store
+
+
+async def _call(store: IdempotencyStore, method, *args):
+    if store.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+class IdempotencyMiddleware:  # pylint: disable=too-few-public-methods
+    """ASGI middleware applying Idempotency-Key to POSTs on ``paths``."""
+
+    def __init__(self, app, paths) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get(HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            detail = f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters"
+            await JSONResponse({"detail": detail}, 400)(scope, receive, send)
+            return
+
+        # The body is part of the fingerprint, so read it before the app does.
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(
+            b"\0".join((scope["method"].encode(), scope["path"].encode(), body))
+        ).hexdigest()
+
+        store = get_store()
+        record = await _call(store, store.claim, key, fingerprint)
+        deadline = time.monotonic() + WAIT_SECONDS
+        while (
+            record is not None
+            and record.status_code is None
+            and record.fingerprint == fingerprint
+        ):
+            if time.monotonic() >= deadline:
+                detail = f"A request with this {HEADER} is still in progress"
+                await JSONResponse({"detail": detail}, 409)(scope, receive, send)
+                return
+            await asyncio.sleep(POLL_SECONDS)
+            # None: the first execution failed and let go; try to take over.
+            record = await _call(store, store.get, key) or await _call(
+                store, store.claim, key, fingerprint
+            )
+
+        if record is None:
+            await self._execute(scope, body, receive, send, store, key, fingerprint)
+        elif record.fingerprint != fingerprint:
+            detail = f"{HEADER} was already used for a different request"
+            await JSONResponse({"detail": detail}, 422)(scope, receive, send)
+        else:
+            replay = Response(
+                record.body,
+                record.status_code,
+                headers={REPLAYED_HEADER: "true"},
+                media_type=record.content_type,
+            )
+            await replay(scope, receive, send)
+
+    async def _execute(  # pylint: disable=too-many-arguments
+        self, scope, body, receive, send, store, key, fingerprint
+    ):
+        """Run the request and store its response under the key."""
+        response = StoredResponse(fingerprint)
+        parts = []
+        sent_body = False
+
+        async def receive_body():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()  # e.g. http.disconnect
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                response.status_code = message["status"]
+                response.content_type = Headers(raw=message["headers"]).get(
+                    "content-type"
+                )
+            elif message["type"] == "http.response.body":
+                parts.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+        except BaseException:
+            await _call(store, store.release, key)
+            raise
+        if response.status_code is None or response.status_code >= 500:
+            await _call(store, store.release, key)
+        else:
+            response.body = b"".join(parts)
+            await _call(store, store.complete, key, response)
@@ -0,0 +1,179 @@
+"""Per-request SQL statement counts, DB time and handler time.
+
+SQL timing hooks on the engines add every cursor execution to the stats of
+the request currently being served (a ContextVar, so it follows the request
+into the threadpool). InstrumentationMiddleware reports them in a
+Server-Timing header and feeds per-route histograms that ``render_metrics``
+prints in the Prometheus text format.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestStats:
+    """What one request spent in the database."""
+
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def track():
+    """Collect RequestStats for the statements executed inside the block."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def install_sql_timing(target: Engine) -> None:
+    """Count and time every cursor execution on ``target``."""
+
+    # The start time rides on the per-execution context, so a statement that
+    # raises leaves nothing behind on the connection.
+    @event.listens_for(target, "before_cursor_execute")
+    def _started(_conn, _cursor, _statement, _parameters, context, _executemany):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _finished(_conn, _cursor, _statement, _parameters, context, _executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += time.perf_counter() - context.query_started
+
+
+class Histogram:
+    """Cumulative Prometheus histogram with one series per label set."""
+
+    def __init__(self, name: str, doc: str, buckets: tuple) -> None:
+        self.name = name
+        self.doc = doc
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self, label_names: tuple) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (counts, total) in series:
+            label_text = ",".join(
+                f'{name}="{value}"' for name, value in zip(label_names, labels)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+LABELS = ("method", "route")
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Total request time.", SECONDS_BUCKETS
+)
+db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL.", SECONDS_BUCKETS
+)
+sql_statements = Histogram(
+    "http_request_sql_statements", "SQL statements per request.", STATEMENT_BUCKETS
+)
+HISTOGRAMS = (request_seconds, db_seconds, sql_statements)
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    """Server-Timing header value for a finished handler."""
+    return (
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+        f"app;dur={total_seconds * 1000:.2f}"
+    )
+
+
+class InstrumentationMiddleware:  # pylint: disable=too-few-public-methods
+    """ASGI middleware that records RequestStats for every HTTP request."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing(stats, time.perf_counter() - started),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # Route templates, not raw paths, keep the series count bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            labels = (scope["method"], route)
+            request_seconds.observe(labels, time.perf_counter() - started)
+            db_seconds.observe(labels, stats.db_seconds)
+            sql_statements.observe(labels, stats.statements)
+
+
+def render_metrics(gauges: list[tuple[str, dict, float]], histograms=()) -> str:
+    """Prometheus text exposition of the request histograms, the other
+    ``histograms`` given as (Histogram, label names) and ``gauges`` given as
+    (name, labels, value)."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render(LABELS))
+    for histogram, label_names in histograms:
+        lines.extend(histogram.render(label_names))
+    declared = set()
+    for name, labels, value in gauges:
+        if name not in declared:
+            lines.append(f"# TYPE {name} gauge")
+            declared.add(name)
+        label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}")
+    return "\n".join(lines) + "\n"
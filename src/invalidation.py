@@ -0,0 +1,213 @@
+"""Cache invalidation shared by every worker process.
+
+Writers call ``invalidate(topic, *keys)`` instead of deleting from a cache
+directly. The keys are dropped from this process's cache and published on
+the configured channel, and every other worker drops them from its own
+copy when the message arrives.
+
+Channels implement InvalidationChannel. LocalChannel (the default) only
+serves a single process. UnixSocketChannel is a broker-less stand-in for
+several workers on one host: each worker binds a datagram socket in a shared
+directory (INVALIDATION_DIR) and publishing sends to all of them. Something
+like Redis pub/sub can be plugged in with ``set_channel``. Delivery is best
+effort; the caches' TTLs bound how stale a missed message can leave a worker.
+"""
+
+import json
+import logging
+import os
+import secrets
+import socket
+import threading
+from collections.abc import Callable
+from contextlib import suppress
+from datetime import date
+from typing import Protocol
+
+from src.cache import doctor_cache, patient_cache, schedule_cache, utilization_cache
+from src.services.schedule_index import schedule_index
+from src.services.schedule_snapshot import schedule_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Keys per datagram, far below the default AF_UNIX datagram size limit.
+MAX_KEYS_PER_MESSAGE = 500
+
+
+class InvalidationChannel(Protocol):
+    """Transport for invalidation messages between processes."""
+
+    def start(self, on_message: Callable[[bytes], None]) -> None:
+        """Begin delivering messages published by other processes."""
+
+    def publish(self, message: bytes) -> None:
+        """Send message to every other subscribed process."""
+
+    def close(self) -> None:
+        """Stop receiving and release resources."""
+
+
+class LocalChannel:
+    """Single-process channel: there is nobody else to tell."""
+
+    def start(self, on_message: Callable[[bytes], None]) -> None:
+        pass
+
+    def publish(self, message: bytes) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class UnixSocketChannel:
+    """Datagram pub/sub between the processes of one host.
+
+    Every subscriber binds ``<directory>/<pid>-<random>.sock``; publish()
+    sends the message to every other socket there and removes those whose
+    process is gone.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._path = ""
+        self._receiver: socket.socket | None = None
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._closed = threading.Event()
+
+    def start(self, on_message: Callable[[bytes], None]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(
+            self.directory, f"{os.getpid()}-{secrets.token_hex(4)}.sock"
+        )
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self._path)
+        # A timeout lets the thread notice close() without a wake-up message.
+        self._receiver.settimeout(0.5)
+        threading.Thread(
+            target=self._listen, args=(on_message,), name="invalidation", daemon=True
+        ).start()
+
+    def _listen(self, on_message: Callable[[bytes], None]) -> None:
+        while not self._closed.is_set():
+            try:
+                message = self._receiver.recv(1 << 16)
+            except TimeoutError:
+                continue
+            except OSError:
+                return
+            try:
+                on_message(message)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Bad invalidation message %r", message[:200])
+
+    def _peers(self) -> list[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in names
+            if name.endswith(".sock")
+            and os.path.join(self.directory, name) != self._path
+        ]
+
+    def publish(self, message: bytes) -> None:
+        for path in self._peers():
+            try:
+                self._sender.sendto(message, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker behind this socket has exited.
+                with suppress(FileNotFoundError):
+                    os.unlink(path)
+            except BlockingIOError:
+                logger.warning("Invalidation queue of %s is full; dropped", path)
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._receiver is not None:
+            self._receiver.close()
+            with suppress(FileNotFoundError):
+                os.unlink(self._path)
+        self._sender.close()
+
+
+def _drop_schedule(keys) -> None:
+    keys = [(doctor_id, date.fromisoformat(day)) for doctor_id, day in keys]
+    schedule_cache.invalidate(*keys)
+    for doctor_id, day in keys:
+        if doctor_id is not None:
+            schedule_snapshot.invalidate(doctor_id, day)
+
+
+# topic -> how to drop a list of JSON-decoded keys from this process's cache
+HANDLERS: dict[str, Callable[[list], None]] = {
+    "doctor": lambda keys: [doctor_cache.delete(key) for key in keys],
+    "patient": lambda keys: [patient_cache.delete(key) for key in keys],
+    "schedule": _drop_schedule,
+    # Department reports (scope None) cover every doctor.
+    "utilization": lambda keys: utilization_cache.bump(*keys, None),
+}
+
+
+def _drop_indexed_schedule(keys) -> None:
+    # Local bookings add themselves to the schedule index; one made in another
+    # worker is not there, so the next lookup reloads the doctor.
+    for doctor_id in {doctor_id for doctor_id, _ in keys if doctor_id is not None}:
+        schedule_index.invalidate(doctor_id)
+
+
+# topic -> what else to drop when the message comes from another worker
+REMOTE_HANDLERS: dict[str, Callable[[list], None]] = {
+    "schedule": _drop_indexed_schedule,
+}
+
+_channel: InvalidationChannel = LocalChannel()
+
+
+def _apply(message: bytes, remote: bool = False) -> None:
+    decoded = json.loads(message)
+    HANDLERS[decoded["topic"]](decoded["keys"])
+    if remote and decoded["topic"] in REMOTE_HANDLERS:
+        REMOTE_HANDLERS[decoded["topic"]](decoded["keys"])
+
+
+def _receive(message: bytes) -> None:
+    """Apply a message published by another worker."""
+    _apply(message, remote=True)
+
+
+def invalidate(topic: str, *keys) -> None:
+    """Drop keys from the ``topic`` cache here and in every other worker.
+
+    Keys are ids (doctor ids for "utilization"), or (doctor_id, date) pairs
+    for "schedule".
+    """
+    keys = list(keys)
+    for start in range(0, len(keys), MAX_KEYS_PER_MESSAGE):
+        message = json.dumps(
+            {"topic": topic, "keys": keys[start : start + MAX_KEYS_PER_MESSAGE]},
+            default=str,  # dates as YYYY-MM-DD
+        ).encode()
+        _apply(message)
+        _channel.publish(message)
+
+
+def set_channel(channel: InvalidationChannel) -> None:
+    """Replace the channel (closing the old one) and start receiving."""
+    global _channel  # pylint: disable=global-statement
+    _channel.close()
+    _channel = channel
+    channel.start(_receive)
+
+
+def open_channel(directory: str | None) -> None:
+    """Start the channel configured for this worker: a UnixSocketChannel in
+    ``directory``, or the single-process LocalChannel."""
+    set_channel(UnixSocketChannel(directory) if directory else LocalChannel())
+
+
+def close_channel() -> None:
+    set_channel(LocalChannel())
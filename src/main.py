@@ -1,17 +1,135 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from typing import Literal
+from fastapi import (
+    APIRouter,
+    FastAPI,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+)
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta, timezone
-from src.database import SessionLocal, engine, Base
-from src.schemas.patient import PatientCreate
-from src.schemas.doctor import DoctorCreate
-from src.schemas.appointment import AppointmentCreate, AppointmentRead
-from src.models.patient import Patient
-from src.models.doctor import Doctor
-from src.models.appointment import Appointment
+from starlette.concurrency import run_in_threadpool
+from datetime import date, datetime
+import asyncio
+from contextlib import suppress
+from src.cache import doctor_cache, patient_cache, schedule_cache, utilization_cache
+from src.config import get_settings
+from src.database import (
+    Base,
+    SessionLocal,
+    get_async_sessionmaker,
+    get_engine,
+    pool_metrics,
+    warm_async_pool,
+    warm_pool,
+)
+from src.audit import (
+    audit_log,
+    close_audit_log,
+    flush_seconds as audit_flush_seconds,
+    open_audit_log,
+)
+from src.idempotency import IdempotencyMiddleware
+from src.instrumentation import InstrumentationMiddleware, render_metrics
+from src.invalidation import close_channel, open_channel
+from src.schemas.availability import DoctorAvailability
+from src.schemas.encounter import DoctorPatient, PatientEncounter
+from src.schemas.utilization import DepartmentUtilization, DoctorUtilization
+from src.schemas.patient import PatientCreate, PatientImportReport, PatientRead
+from src.schemas.doctor import DoctorCreate, DoctorRead
+from src.schemas.appointment import (
+    AppointmentBulkResult,
+    AppointmentCreate,
+    AppointmentRead,
+    AppointmentSeriesCreate,
+    AppointmentSeriesRead,
+    ScheduledAppointment,
+)
+from src.services import (
+    appointment_service,
+    availability_service,
+    doctor_service,
+    encounter_service,
+    patient_import_service,
+    patient_service,
+    series_service,
+    utilization_service,
+)
+from src.services.appointment_service import (
+    bulk_create_appointments,
+    iter_appointments,
+    page_appointments,
+)
+from src.services.archive_service import archive_periodically
+from src.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ndjson_response
+from src.services.schedule_index import schedule_index
+from src.services.schedule_snapshot import schedule_snapshot
+from src.serialization import etag_response, rows_response
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Medical Encounter Management System")
+async def prewarm() -> None:
+    """Open the pool's connections and load the schedule index up front."""
+    settings = get_settings()
+    if settings.use_async_db:
+        await warm_async_pool(settings.pool_size)
+        async with get_async_sessionmaker()() as db:
+            await schedule_index.warm_async(db)
+    else:
+        warm_pool(get_engine(), settings.pool_size)
+        with SessionLocal() as db:
+            schedule_index.warm(db)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Startup and shutdown. Importing this module touches no database; the
+    schema is Alembic's unless AUTO_CREATE_SCHEMA is set, and pre-warming is
+    opt-in (STARTUP_PREWARM) since the caches also fill on demand. Past
+    appointments are moved to the archive while serving, and audit events
+    are written behind the requests (flushed before shutdown completes)."""
+    settings = get_settings()
+    if settings.auto_create_schema:
+        Base.metadata.create_all(bind=get_engine())
+    if settings.startup_prewarm:
+        await prewarm()
+    # Cross-worker cache invalidation; a no-op channel for a single process.
+    open_channel(settings.invalidation_dir)
+    open_audit_log(settings, SessionLocal)
+
+    archiver = None
+    if settings.archive_interval_seconds > 0:
+        archiver = asyncio.create_task(
+            archive_periodically(SessionLocal, settings.archive_interval_seconds)
+        )
+    yield
+    if archiver is not None:
+        archiver.cancel()
+        with suppress(asyncio.CancelledError):
+            await archiver
+    # Joins the writer once the queue is flushed; off the event loop.
+    await asyncio.to_thread(close_audit_log)
+    close_channel()
+
+
+app = FastAPI(title="Medical Encounter Management System", lifespan=lifespan)
+# Create endpoints whose retries carrying an Idempotency-Key are replayed
+IDEMPOTENT_PATHS = (
+    "/patients",
+    "/doctors",
+    "/appointments",
+    "/appointments/bulk",
+    "/appointment-series",
+)
+# Added first so it runs inside the instrumentation: replays are measured too.
+app.add_middleware(IdempotencyMiddleware, paths=IDEMPOTENT_PATHS)
+app.add_middleware(InstrumentationMiddleware)
+
+# Core CRUD endpoints served from the threadpool with blocking sessions; the
+# asyncio equivalents live in src/async_api.py (USE_ASYNC_DB).
+router = APIRouter()
 
 
 # Dependency
@@ -24,105 +142,304 @@ def get_db():
 
 
 # ---------------- Patients ----------------
-@app.post("/patients")
+@router.post("/patients", response_model=PatientRead)
 def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
-    db_patient = Patient(**patient.dict())
-    db.add(db_patient)
-    db.commit()
-    db.refresh(db_patient)
-    return db_patient
+    return patient_service.create_patient(db, patient)
 
 
-@app.get("/patients/{patient_id}")
+@router.get("/patients/{patient_id}", response_model=PatientRead)
 def get_patient(patient_id: int, db: Session = Depends(get_db)):
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    return patient
+    return patient_service.get_patient_cached(db, patient_id)
 
 
 # ---------------- Doctors ----------------
-@app.post("/doctors")
+@router.post("/doctors", response_model=DoctorRead)
 def create_doctor(doctor: DoctorCreate, db: Session = Depends(get_db)):
-    db_doctor = Doctor(**doctor.dict())
-    db.add(db_doctor)
-    db.commit()
-    db.refresh(db_doctor)
-    return db_doctor
+    return doctor_service.create_doctor(db, doctor)
 
 
-@app.put("/doctors/{doctor_id}/deactivate")
+@router.put("/doctors/{doctor_id}/deactivate", response_model=DoctorRead)
 def deactivate_doctor(doctor_id: int, db: Session = Depends(get_db)):
-    doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
-    if not doctor:
-        raise HTTPException(status_code=404, detail="Doctor not found")
-    doctor.active = False
-    db.commit()
-    db.refresh(doctor)
-    return doctor
+    return doctor_service.deactivate_doctor(db, doctor_id)
 
 
-@app.get("/doctors/{doctor_id}")
+@router.get("/doctors/{doctor_id}", response_model=DoctorRead)
 def get_doctor(doctor_id: int, db: Session = Depends(get_db)):
-    doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
-    if not doctor:
-        raise HTTPException(status_code=404, detail="Doctor not found")
-    return doctor
+    return doctor_service.get_doctor_cached(db, doctor_id)
 
 
 # ---------------- Appointments ----------------
-@app.post("/appointments")
-@app.post("/appointments", response_model=AppointmentRead, status_code=201)
+@router.post("/appointments", response_model=AppointmentRead, status_code=201)
 def create_appointment(appt: AppointmentCreate, db: Session = Depends(get_db)):
-    if appt.start_time <= datetime.now(timezone.utc):
-        raise HTTPException(
-            status_code=400, detail="Appointment must be scheduled in the future"
+    if not doctor_service.is_doctor_active(db, appt.doctor_id):
+        raise HTTPException(status_code=400, detail="Doctor not available")
+
+    # Conflict check and insert under a per-doctor lock.
+    return appointment_service.create_appointment(db, appt)
+
+
+@router.get("/appointments", response_model=list[ScheduledAppointment])
+def list_appointments(
+    date: datetime,
+    doctor_id: int | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    output: Literal["json", "ndjson"] = Query("json", alias="format"),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    """A day's appointments, optionally keyset-paged or streamed as NDJSON.
+
+    With `limit`/`cursor` rows come in (start_time, id) order and the cursor
+    of the next page is returned in the X-Next-Cursor header.
+    """
+    if output == "ndjson":
+        return ndjson_response(
+            lambda session: iter_appointments(session, date, doctor_id, cursor)
         )
 
-    if appt.duration_minutes < 15 or appt.duration_minutes > 180:
-        raise HTTPException(
-            status_code=400, detail="Duration must be between 15 and 180 minutes"
+    if limit or cursor:
+        results, next_cursor = page_appointments(
+            db, date, doctor_id, limit or DEFAULT_PAGE_SIZE, cursor
         )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return rows_response(results, headers)
+
+    # Encoded once per doctor/day and reused until a booking lands in it.
+    etag, body = appointment_service.day_listing(db, date, doctor_id)
+    return etag_response(etag, body, if_none_match)
+
 
-    doctor = db.query(Doctor).filter(Doctor.id == appt.doctor_id).first()
-    if not doctor or not doctor.active:
+@app.post("/appointments/bulk", response_model=list[AppointmentBulkResult])
+def create_appointments_bulk(
+    appts: list[AppointmentCreate], db: Session = Depends(get_db)
+):
+    """Book a batch of appointments; each item reports its own status."""
+    return bulk_create_appointments(db, appts)
+
+
+@app.post("/appointment-series", response_model=AppointmentSeriesRead, status_code=201)
+def create_appointment_series(
+    series: AppointmentSeriesCreate, db: Session = Depends(get_db)
+):
+    """Book a recurring series; 409 if any occurrence conflicts."""
+    if not doctor_service.is_doctor_active(db, series.doctor_id):
         raise HTTPException(status_code=400, detail="Doctor not available")
 
-    new_end = appt.start_time + timedelta(minutes=appt.duration_minutes)
-    existing_appts = (
-        db.query(Appointment).filter(Appointment.doctor_id == appt.doctor_id).all()
-    )
+    return series_service.create_series(db, series)
+
+
+@app.get("/appointment-series/{series_id}", response_model=AppointmentSeriesRead)
+def get_appointment_series(series_id: int, db: Session = Depends(get_db)):
+    return series_service.get_series(db, series_id)
+
+
+@app.get("/schedule/today", response_model=list[ScheduledAppointment])
+def todays_schedule(doctor_id: int | None = None, db: Session = Depends(get_db)):
+    """Today's (UTC) appointments and series occurrences of every doctor, or
+    of one, in (doctor_id, start_time) order; served from the in-memory
+    schedule snapshot, which reloads only the doctors changed since."""
+    return rows_response(schedule_snapshot.rows(db, doctor_id=doctor_id))
 
-    for existing in existing_appts:
-        existing_start = existing.start_time
-        if existing_start.tzinfo is None:
-            existing_start = existing_start.replace(tzinfo=timezone.utc)
-        existing_end = existing_start + timedelta(minutes=existing.duration_minutes)
-        if existing_start < new_end and existing_end > appt.start_time:
-            raise HTTPException(
-                status_code=409, detail="Doctor already has an overlapping appointment"
+
+# ---------------- Search ----------------
+# On the app, so it is matched before the router's /patients/{patient_id}.
+@app.get("/patients/search", response_model=list[PatientRead])
+def search_patients(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(
+        patient_service.DEFAULT_SEARCH_LIMIT,
+        ge=1,
+        le=patient_service.MAX_SEARCH_LIMIT,
+    ),
+    db: Session = Depends(get_db),
+):
+    """Patients by last/first name prefix, "first last", email or phone,
+    best matches first."""
+    return rows_response(patient_service.search_patients(db, q, limit))
+
+
+# ---------------- Import ----------------
+@app.post("/patients/import", response_model=PatientImportReport)
+async def import_patients(
+    request: Request,
+    source_format: Literal["csv", "ndjson"] | None = Query(None, alias="format"),
+):
+    """Create patients from a CSV (header row naming the fields) or NDJSON
+    body, streamed and committed in chunks; rejected rows are reported.
+    The format defaults from Content-Type, then to CSV."""
+    if source_format is None:
+        content_type = request.headers.get("content-type", "")
+        source_format = "ndjson" if "json" in content_type else "csv"
+    chunks = patient_import_service.blocking_chunks(request.stream())
+
+    def run_import() -> dict:
+        with SessionLocal() as db:
+            return patient_import_service.import_patients(
+                db, patient_import_service.iter_lines(chunks), source_format
             )
 
-    db_appt = Appointment(**appt.model_dump())  # ✅ use model_dump
-    db.add(db_appt)
-    db.commit()
-    db.refresh(db_appt)
-    return db_appt
-
-
-@app.get("/appointments", response_model=list[AppointmentRead])
-@app.get("/appointments")
-def list_appointments(date: datetime, doctor_id: int, db: Session = Depends(get_db)):
-    start_day = datetime(date.year, date.month, date.day, tzinfo=timezone.utc)
-    end_day = start_day + timedelta(days=1)
-
-    results = (
-        db.query(Appointment)
-        .filter(
-            Appointment.doctor_id == doctor_id,
-            Appointment.start_time >= start_day,
-            Appointment.start_time < end_day,
+    return await run_in_threadpool(run_import)
+
+
+# ---------------- Listings ----------------
+@app.get("/patients", response_model=list[PatientRead])
+def list_patients(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    output: Literal["json", "ndjson"] = Query("json", alias="format"),
+    db: Session = Depends(get_db),
+):
+    """Patients by id, keyset-paged (X-Next-Cursor) or streamed as NDJSON."""
+    if output == "ndjson":
+        return ndjson_response(
+            lambda session: patient_service.iter_patients(session, cursor)
         )
-        .all()
+    patients, next_cursor = patient_service.page_patients(db, limit, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return rows_response(patients, headers)
+
+
+@app.get("/doctors", response_model=list[DoctorRead])
+def list_doctors(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    output: Literal["json", "ndjson"] = Query("json", alias="format"),
+    db: Session = Depends(get_db),
+):
+    """Doctors by id, keyset-paged (X-Next-Cursor) or streamed as NDJSON."""
+    if output == "ndjson":
+        return ndjson_response(
+            lambda session: doctor_service.iter_doctors(session, cursor)
+        )
+    doctors, next_cursor = doctor_service.page_doctors(db, limit, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return rows_response(doctors, headers)
+
+
+# ---------------- Encounters ----------------
+@app.get("/patients/{patient_id}/encounters", response_model=list[PatientEncounter])
+def list_patient_encounters(
+    patient_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """The patient's appointments with their doctors, newest first,
+    keyset-paged (X-Next-Cursor)."""
+    encounters, next_cursor = encounter_service.page_patient_encounters(
+        db, patient_id, limit, cursor
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return rows_response(encounters, headers)
+
+
+@app.get("/doctors/{doctor_id}/patients", response_model=list[DoctorPatient])
+def list_doctor_patients(
+    doctor_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Patients the doctor has appointments with, most recently seen first,
+    with their appointment counts; keyset-paged (X-Next-Cursor)."""
+    patients, next_cursor = encounter_service.page_doctor_patients(
+        db, doctor_id, limit, cursor
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return rows_response(patients, headers)
+
+
+# ---------------- Availability ----------------
+@app.get("/doctors/{doctor_id}/availability", response_model=DoctorAvailability)
+def get_doctor_availability(
+    doctor_id: int,
+    start: datetime = Query(alias="from"),
+    end: datetime = Query(alias="to"),
+    duration: int = Query(description="Appointment length in minutes"),
+    db: Session = Depends(get_db),
+):
+    """Open windows in which the doctor can take an appointment of `duration`."""
+    return availability_service.get_doctor_availability(
+        db, doctor_id, start, end, duration
+    )
+
+
+@app.get("/availability", response_model=list[DoctorAvailability])
+def search_availability(
+    start: datetime = Query(alias="from"),
+    end: datetime = Query(alias="to"),
+    duration: int = Query(description="Appointment length in minutes"),
+    specialization: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Open windows across active doctors, optionally of one specialization."""
+    return availability_service.search_availability(
+        db, start, end, duration, specialization
     )
-    return results
+
+
+# ---------------- Utilization ----------------
+@app.get("/doctors/{doctor_id}/utilization", response_model=DoctorUtilization)
+def get_doctor_utilization(
+    doctor_id: int,
+    start: date = Query(alias="from"),
+    end: date = Query(alias="to"),
+    period: Literal["day", "week"] = "day",
+    db: Session = Depends(get_db),
+):
+    """Booked minutes, gaps and peak hours of a doctor, per day or ISO week
+    (UTC, `from` and `to` inclusive)."""
+    return utilization_service.doctor_utilization(db, doctor_id, start, end, period)
+
+
+@app.get("/departments/utilization", response_model=list[DepartmentUtilization])
+def get_department_utilization(
+    start: date = Query(alias="from"),
+    end: date = Query(alias="to"),
+    period: Literal["day", "week"] = "day",
+    specialization: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """The same report summed over the doctors of each specialization."""
+    return utilization_service.department_utilization(
+        db, start, end, period, specialization
+    )
+
+
+# ---------------- Metrics ----------------
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Request histograms, pool counters and cache stats for Prometheus."""
+    gauges = [
+        (f"db_pool_{name}", {}, value)
+        for name, value in pool_metrics.snapshot(get_engine().pool).items()
+    ]
+    for name, cache in (
+        ("doctor", doctor_cache),
+        ("patient", patient_cache),
+        ("schedule", schedule_cache),
+        ("utilization", utilization_cache),
+    ):
+        gauges.extend(
+            (f"cache_{stat}", {"cache": name}, value)
+            for stat, value in cache.stats().items()
+        )
+    gauges.extend(
+        (f"audit_events_{stat}", {}, value) for stat, value in audit_log.stats().items()
+    )
+    gauges.extend(
+        (f"schedule_snapshot_{stat}", {}, value)
+        for stat, value in schedule_snapshot.stats().items()
+    )
+    return render_metrics(gauges, [(audit_flush_seconds, ("sink",))])
+
+
+# The one setting the app is built from; everything else is read at startup.
+if get_settings().use_async_db:
+    # Imported only in async mode: it needs greenlet and an asyncio driver.
+    from src.async_api import router as async_router
+
+    app.include_router(async_router)
+else:
+    app.include_router(router)
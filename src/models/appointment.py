@@ -1,6 +1,8 @@
 """SQLAlchemy model for appointments."""
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from typing import ClassVar
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, String, func
 from sqlalchemy.orm import relationship
 from datetime import timedelta
 
@@ -11,6 +13,16 @@ class Appointment(Base):
     """Database model representing an appointment."""
 
     __tablename__ = "saniya_appointments"
+    __table_args__ = (
+        # Serves the per-doctor overlap check as a bounded index range scan.
+        Index("ix_saniya_appointments_doctor_id_start_time", "doctor_id", "start_time"),
+        # Serves a patient's encounter timeline in start_time order.
+        Index(
+            "ix_saniya_appointments_patient_id_start_time", "patient_id", "start_time"
+        ),
+    )
+    # Fetch created_at in the INSERT itself via RETURNING.
+    __mapper_args__: ClassVar[dict] = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_id = Column(Integer, ForeignKey("saniya_patients.id"), nullable=False)
@@ -19,8 +31,15 @@ class Appointment(Base):
     duration_minutes = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    patient = relationship("Patient")
-    doctor = relationship("Doctor")
+    # Never loaded implicitly: listings select joined columns instead, so a
+    # per-row lazy load (an N+1) raises rather than querying.
+    patient = relationship(
+        "Patient", back_populates="appointments", lazy="raise_on_sql"
+    )
+    doctor = relationship("Doctor", back_populates="appointments", lazy="raise_on_sql")
+
+    # Set on occurrences of a series, which are listed as unsaved Appointments.
+    series_id = None
 
     @property
     def end_time(self):
@@ -28,3 +47,61 @@ class Appointment(Base):
             return None
 
         return self.start_time + timedelta(minutes=self.duration_minutes)
+
+
+class AppointmentArchive(Base):
+    """Appointments moved out of saniya_appointments once they are history.
+
+    Same columns and ids as the hot table, so rows are copied with
+    INSERT ... SELECT and the two tables can be read as one UNION ALL.
+    """
+
+    __tablename__ = "saniya_appointments_archive"
+    __table_args__ = (
+        Index(
+            "ix_saniya_appointments_archive_doctor_id_start_time",
+            "doctor_id",
+            "start_time",
+        ),
+        Index(
+            "ix_saniya_appointments_archive_patient_id_start_time",
+            "patient_id",
+            "start_time",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    patient_id = Column(Integer, ForeignKey("saniya_patients.id"), nullable=False)
+    doctor_id = Column(Integer, ForeignKey("saniya_doctors.id"), nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False, index=True)
+    duration_minutes = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+
+
+class AppointmentSeries(Base):
+    """A recurring booking: ``count`` occurrences of the same slot, every
+    ``interval`` days or weeks (``frequency``) from ``start_time`` in UTC.
+
+    Occurrences are never stored as rows; they are computed from the rule
+    within whatever window is being read. ends_at (the end of the last
+    occurrence) lets a window query find the series it overlaps by range.
+    """
+
+    __tablename__ = "saniya_appointment_series"
+    __table_args__ = (
+        Index("ix_saniya_appointment_series_doctor_id_ends_at", "doctor_id", "ends_at"),
+    )
+    __mapper_args__: ClassVar[dict] = {"eager_defaults": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    patient_id = Column(
+        Integer, ForeignKey("saniya_patients.id"), nullable=False, index=True
+    )
+    doctor_id = Column(Integer, ForeignKey("saniya_doctors.id"), nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    frequency = Column(String(10), nullable=False)
+    interval = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False)
+    ends_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
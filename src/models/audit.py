@@ -0,0 +1,21 @@
+"""SQLAlchemy model for the append-only audit log."""
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+
+from src.database import Base
+
+
+class AuditEvent(Base):  # pylint: disable=too-few-public-methods
+    """One create/deactivate/booking event; rows are only ever inserted."""
+
+    __tablename__ = "saniya_audit_events"
+    __table_args__ = (
+        Index("ix_saniya_audit_events_action_entity_id", "action", "entity_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # When the change was made, not when the row was written
+    occurred_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    action = Column(String(40), nullable=False)
+    entity_id = Column(Integer)
+    details = Column(JSON)
@@ -1,5 +1,7 @@
 """SQLAlchemy model for doctors."""
 
+from typing import ClassVar
+
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,6 +13,9 @@ class Doctor(Base):  # pylint: disable=too-few-public-methods
     """Database model representing a doctor."""
 
     __tablename__ = "saniya_doctors"
+    # Fetch server defaults (id, created_at) in the INSERT itself via
+    # RETURNING instead of a refresh SELECT after commit.
+    __mapper_args__: ClassVar[dict] = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String(100), nullable=False)
@@ -19,4 +24,6 @@ class Doctor(Base):  # pylint: disable=too-few-public-methods
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    appointments = relationship("Appointment", back_populates="doctor")
+    appointments = relationship(
+        "Appointment", back_populates="doctor", lazy="raise_on_sql"
+    )
@@ -0,0 +1,22 @@
+"""SQLAlchemy model for stored responses of idempotent requests."""
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from sqlalchemy.dialects import mysql
+
+from src.database import Base
+
+
+class IdempotencyKey(Base):  # pylint: disable=too-few-public-methods
+    """A claimed Idempotency-Key and, once the request finished, its response."""
+
+    __tablename__ = "saniya_idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    # sha256 of method, path and body; a reused key must match it
+    fingerprint = Column(String(64), nullable=False)
+    # NULL while the first execution is still running
+    status_code = Column(Integer)
+    content_type = Column(String(100))
+    # A plain BLOB on MySQL holds only 64 KB; bulk responses can be larger.
+    body = Column(LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"))
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
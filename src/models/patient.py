@@ -1,24 +1,60 @@
 """SQLAlchemy model for patients."""
 
-from sqlalchemy import Column, Integer, String, DateTime
+import re
+from typing import ClassVar
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, null
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from src.database import Base
 
 
+def normalize_phone(phone: str) -> str:
+    """The digits of a phone number, as stored in phone_normalized."""
+    return re.sub(r"\D", "", phone)
+
+
+def _phone_normalized_default(context) -> str:
+    return normalize_phone(context.get_current_parameters()["phone"])
+
+
 class Patient(Base):  # pylint: disable=too-few-public-methods
     """Database model representing a patient."""
 
     __tablename__ = "saniya_patients"
+    # Fetch server defaults (id, created_at) in the INSERT itself via
+    # RETURNING instead of a refresh SELECT after commit.
+    __mapper_args__: ClassVar[dict] = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     email = Column(String(100), unique=True, nullable=False)
     phone = Column(String(15), unique=True, nullable=False)
+    # Filled from phone on insert (ORM and Core, bulk included) for search.
+    phone_normalized = Column(
+        String(15), nullable=False, index=True, default=_phone_normalized_default
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Explicit NULL on insert so the flush does not post-fetch the column.
+    updated_at = Column(DateTime(timezone=True), default=null(), onupdate=func.now())
 
     # Relationships
-    appointments = relationship("Appointment", back_populates="patient")
+    appointments = relationship(
+        "Appointment", back_populates="patient", lazy="raise_on_sql"
+    )
+
+
+# Case-insensitive prefix search: lower(column) range scans, in rank order.
+Index(
+    "ix_saniya_patients_lower_last_name_first_name",
+    func.lower(Patient.last_name),
+    func.lower(Patient.first_name),
+)
+Index(
+    "ix_saniya_patients_lower_first_name_last_name",
+    func.lower(Patient.first_name),
+    func.lower(Patient.last_name),
+)
+Index("ix_saniya_patients_lower_email", func.lower(Patient.email))
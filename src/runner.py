@@ -0,0 +1,138 @@
+"""Pre-fork runner: one listening socket shared by several uvicorn workers.
+
+The parent imports the application once, creates the schema if
+AUTO_CREATE_SCHEMA is set, binds the socket and forks the workers; each
+worker serves the inherited socket with its own event loop, engine and
+connection pool (database.py disposes anything inherited at fork). Workers
+that die are replaced. Caches stay coherent through the invalidation
+channel: unless INVALIDATION_DIR is set, the runner points every worker at a
+fresh temporary directory.
+
+Usage:
+    python -m src.runner --workers 4 --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pause before replacing a worker, so one that crashes on startup cannot spin.
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve(app, sock: socket.socket, log_level: str) -> None:
+    """Worker body: run uvicorn on the inherited socket, never return."""
+    import uvicorn  # pylint: disable=import-outside-toplevel
+
+    # uvicorn installs its own handlers for a graceful shutdown.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    code = 0
+    try:
+        uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+    except SystemExit as exc:  # startup failed; uvicorn has logged why
+        code = exc.code if isinstance(exc.code, int) else 1
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Worker %s failed", os.getpid())
+        code = 1
+    os._exit(code)  # pylint: disable=protected-access
+
+
+def _spawn(app, sock: socket.socket, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        _serve(app, sock, log_level)
+    return pid
+
+
+def run(host: str, port: int, workers: int, log_level: str = "info") -> None:
+    """Serve src.main:app from ``workers`` processes until SIGTERM/SIGINT."""
+    invalidation_dir = None
+    if not os.environ.get("INVALIDATION_DIR"):
+        invalidation_dir = tempfile.mkdtemp(prefix="saniya-invalidation-")
+        os.environ["INVALIDATION_DIR"] = invalidation_dir
+    # Imported after INVALIDATION_DIR is set: building the app reads the settings.
+    # pylint: disable=import-outside-toplevel
+    from src.config import get_settings
+    from src.database import Base, get_engine
+    from src.main import app
+
+    if get_settings().auto_create_schema:
+        # Once, here: workers racing through create_all collide on CREATE TABLE.
+        Base.metadata.create_all(bind=get_engine())
+
+    sock = bind(host, port)
+    stopping = False
+
+    def stop(_signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    children = {_spawn(app, sock, log_level) for _ in range(workers)}
+    logger.info("Serving on %s:%s with %d workers", host, port, workers)
+    try:
+        while not stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid in children:
+                children.discard(pid)
+                logger.warning(
+                    "Worker %s exited (status %s); replacing it", pid, status
+                )
+                time.sleep(RESPAWN_DELAY_SECONDS)
+                if not stopping:
+                    children.add(_spawn(app, sock, log_level))
+            else:
+                time.sleep(0.2)
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        sock.close()
+        if invalidation_dir is not None:
+            shutil.rmtree(invalidation_dir, ignore_errors=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    run(args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
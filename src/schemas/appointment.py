@@ -1,6 +1,8 @@
 """Pydantic schemas for appointment creation and reading."""
 
-from pydantic import BaseModel, field_validator
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime, timezone
 
 
@@ -39,5 +41,45 @@ class AppointmentRead(BaseModel):
     start_time: datetime
     duration_minutes: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ScheduledAppointment(AppointmentRead):
+    """A listed appointment: a stored one, or an occurrence of a series
+    (id None, series_id set)."""
+
+    id: int | None
+    series_id: int | None = None
+
+
+class AppointmentSeriesCreate(BaseModel):
+    """Schema for booking ``count`` occurrences of one slot, every
+    ``interval`` days or weeks (in UTC) from ``start_time``."""
+
+    patient_id: int
+    doctor_id: int
+    start_time: datetime
+    duration_minutes: int
+    frequency: Literal["daily", "weekly"] = "weekly"
+    # At most 52 periods apart (a year for weekly series), which also keeps
+    # the date arithmetic of every occurrence in range.
+    interval: int = Field(1, ge=1, le=52)
+    count: int = Field(ge=1)
+
+
+class AppointmentSeriesRead(AppointmentSeriesCreate):
+    """Schema for reading a series; ends_at is the end of its last occurrence."""
+
+    id: int
+    ends_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AppointmentBulkResult(BaseModel):
+    """Outcome of one item of a bulk booking request."""
+
+    index: int
+    status_code: int
+    id: int | None = None
+    detail: str | None = None
@@ -0,0 +1,20 @@
+"""Pydantic schemas for doctor availability searches."""
+
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class AvailabilityWindow(BaseModel):
+    """An open interval long enough for the requested appointment."""
+
+    start_time: datetime
+    end_time: datetime
+
+
+class DoctorAvailability(BaseModel):
+    """Open windows of one doctor inside the searched range."""
+
+    doctor_id: int
+    full_name: str
+    specialization: str
+    windows: list[AvailabilityWindow]
@@ -1,6 +1,6 @@
 """Pydantic schemas for doctor data."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -20,5 +20,4 @@ class DoctorRead(BaseModel):
     active: bool
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
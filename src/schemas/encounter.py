@@ -0,0 +1,29 @@
+"""Pydantic schemas for patient timelines and doctors' patient lists."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, EmailStr
+
+
+class PatientEncounter(BaseModel):
+    """One of a patient's appointments, with the doctor seen."""
+
+    id: int
+    start_time: datetime
+    duration_minutes: int
+    doctor_id: int
+    doctor_name: str
+    specialization: str
+
+
+class DoctorPatient(BaseModel):
+    """A patient a doctor has appointments with, and when."""
+
+    id: int
+    first_name: str
+    last_name: str
+    email: EmailStr
+    phone: str
+    appointments: int
+    first_appointment: datetime
+    last_appointment: datetime
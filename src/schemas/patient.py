@@ -1,6 +1,6 @@
 """Pydantic schemas for patient data."""
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
 
 
@@ -24,5 +24,21 @@ class PatientRead(BaseModel):
     created_at: datetime
     updated_at: datetime | None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PatientImportError(BaseModel):
+    """A rejected row of a patient import, by its line in the file."""
+
+    line: int
+    error: str
+
+
+class PatientImportReport(BaseModel):
+    """Outcome of a patient import; errors lists at most the first
+    MAX_REPORTED_ERRORS rejected rows."""
+
+    inserted: int
+    rejected: int
+    errors: list[PatientImportError]
+    errors_truncated: bool
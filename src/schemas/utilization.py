@@ -0,0 +1,44 @@
+"""Pydantic schemas for utilization reports."""
+
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class UtilizationBucket(BaseModel):
+    """Load of one UTC day, or of one ISO week (keyed by its Monday)."""
+
+    start: date
+    appointments: int
+    booked_minutes: int
+    gap_minutes: int
+
+
+class UtilizationReport(BaseModel):
+    """Booked time over a date range.
+
+    gap_minutes is the idle time between a doctor's first and last
+    appointment of each day; hourly_minutes holds the booked minutes falling
+    in each UTC hour of the day (0-23) and peak_hours the busiest of them.
+    """
+
+    start_date: date
+    end_date: date
+    period: Literal["day", "week"]
+    appointments: int
+    booked_minutes: int
+    gap_minutes: int
+    busiest_day: date | None
+    peak_hours: list[int]
+    hourly_minutes: list[int]
+    buckets: list[UtilizationBucket]
+
+
+class DoctorUtilization(UtilizationReport):
+    doctor_id: int
+
+
+class DepartmentUtilization(UtilizationReport):
+    specialization: str
+    doctors: int
@@ -0,0 +1,64 @@
+"""Fast JSON encoding for list responses.
+
+List endpoints select just the columns of their Read schema (``columns``)
+and encode the resulting row dicts directly, skipping ORM hydration and
+per-row Pydantic validation: the values come straight from typed columns.
+orjson is used when installed; otherwise Pydantic's untyped serializer,
+which produces the same bytes.
+"""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional dependency (the "speedups" extra)
+    orjson = None
+
+_rows_adapter = TypeAdapter(list[dict[str, Any]])
+_row_adapter = TypeAdapter(dict[str, Any])
+
+
+def columns(schema: type[BaseModel], model) -> list:
+    """The model's columns named by the schema's fields, in schema order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def dump_rows(rows: list[dict]) -> bytes:
+    """Encode row dicts as a JSON array."""
+    if orjson is not None:
+        # Same datetime format as Pydantic: "Z" for UTC, naive left as is.
+        return orjson.dumps(rows, option=orjson.OPT_UTC_Z)
+    return _rows_adapter.dump_json(rows)
+
+
+def dump_line(row: Mapping) -> bytes:
+    """Encode one row as an NDJSON line."""
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_UTC_Z) + b"\n"
+    return _row_adapter.dump_json(dict(row)) + b"\n"
+
+
+def rows_response(
+    rows: Iterable[Mapping], headers: dict[str, str] | None = None
+) -> Response:
+    """JSON array response built from rows without per-row validation."""
+    return Response(
+        content=dump_rows([dict(row) for row in rows]),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def etag_response(etag: str, body: bytes, if_none_match: str | None) -> Response:
+    """JSON response carrying its ETag, or 304 Not Modified when the client's
+    If-None-Match already names that ETag."""
+    headers = {"ETag": etag}
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
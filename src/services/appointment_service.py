@@ -1,69 +1,722 @@
 """Service layer for appointment-related operations."""
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import heapq
+import math
+import time
+from datetime import date as Date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
 from fastapi import HTTPException
+from sqlalchemy import and_, insert, null, or_, select
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
+from src.audit import record, record_async
+from src.database import begin_write, begin_write_async
+from src.invalidation import invalidate
 from src.models.appointment import Appointment
-from src.schemas.appointment import AppointmentCreate
+from src.models.doctor import Doctor
+from src.schemas.appointment import (
+    AppointmentBulkResult,
+    AppointmentCreate,
+    AppointmentRead,
+)
+from src.cache import schedule_cache
+from src.serialization import columns, dump_rows
+from src.services.archive_service import appointments_source
+from src.services.booking_rules import (
+    MAX_DURATION_MINUTES,
+    as_utc,
+    check_booking_rules,
+)
+from src.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+from src.services.recurrence import (
+    Recurrence,
+    listing_key,
+    occurrence_rows,
+    series_statement,
+)
+from src.services.schedule_index import schedule_index
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
-def create_appointment(db: Session, appt: AppointmentCreate) -> Appointment:
-    """Create a new appointment, checking for conflicts."""
-
-    # Normalize new appointment times to UTC
-    appt_start_utc = appt.start_time.astimezone(timezone.utc)
-    new_end = appt_start_utc + timedelta(minutes=appt.duration_minutes)
-
-    # Define day boundaries in UTC
-    day_start = appt_start_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-    day_end = appt_start_utc.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-    # Fetch existing appointments for the same doctor on the same day
-    existing_appts = (
-        db.query(Appointment)
-        .filter(
-            Appointment.doctor_id == appt.doctor_id,
-            Appointment.start_time >= day_start,
-            Appointment.start_time <= day_end,
+CONFLICT_DETAIL = "Doctor already has an overlapping appointment"
+BOOKING_ATTEMPTS = 3
+BOOKING_RETRY_DELAY_SECONDS = 0.05
+
+
+def _conflict_candidates(doctor_id: int, start_time: datetime, duration_minutes: int):
+    """Select the few rows that could overlap the slot.
+
+    Only rows starting inside (start - MAX_DURATION_MINUTES, end) can overlap,
+    so this is a range scan on (doctor_id, start_time) that returns at most a
+    handful of (start_time, duration_minutes) tuples, independent of how long
+    the doctor's history is.
+    """
+    new_start = as_utc(start_time)
+    new_end = new_start + timedelta(minutes=duration_minutes)
+    lookback = new_start - timedelta(minutes=MAX_DURATION_MINUTES)
+
+    return select(Appointment.start_time, Appointment.duration_minutes).where(
+        Appointment.doctor_id == doctor_id,
+        Appointment.start_time > lookback,
+        Appointment.start_time < new_end,
+    )
+
+
+def _ends_after(candidates, start_time: datetime) -> bool:
+    new_start = as_utc(start_time)
+    return any(
+        as_utc(existing_start) + timedelta(minutes=existing_duration) > new_start
+        for existing_start, existing_duration in candidates
+    )
+
+
+def _series_candidates(doctor_id: int, start_time: datetime, duration_minutes: int):
+    """Select the doctor's series whose span covers the slot."""
+    new_start = as_utc(start_time)
+    return series_statement(
+        new_start, new_start + timedelta(minutes=duration_minutes), [doctor_id]
+    )
+
+
+def _occurs_during(series, start_time: datetime, duration_minutes: int) -> bool:
+    """Whether an occurrence of one of the series overlaps the slot, computed
+    from each rule without expanding it."""
+    start = as_utc(start_time).timestamp()
+    end = start + duration_minutes * 60
+    return any(Recurrence.of(one).overlaps(start, end) for one in series)
+
+
+def _audit_details(row) -> dict:
+    """Audit event details of a booking (an Appointment or AppointmentCreate)."""
+    return {
+        "patient_id": row.patient_id,
+        "doctor_id": row.doctor_id,
+        "start_time": as_utc(row.start_time).isoformat(),
+        "duration_minutes": row.duration_minutes,
+    }
+
+
+def _new_appointment(appt: AppointmentCreate) -> Appointment:
+    # Stored in UTC, like the queries that read it back
+    return Appointment(
+        **appt.model_dump(exclude={"start_time"}), start_time=as_utc(appt.start_time)
+    )
+
+
+def _day_start(date: datetime) -> datetime:
+    """Midnight UTC of the UTC day containing ``date``."""
+    return as_utc(date).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _day_statement(date: datetime, doctor_id: int | None, schema=None):
+    """Select the day's appointments (or just ``schema``'s columns), reading
+    the archive too when the day is before the archive horizon."""
+    day_start = _day_start(date)
+    day_end = day_start.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    source = appointments_source(day_start)
+    statement = select(*columns(schema, source) if schema else (source,)).where(
+        source.start_time >= day_start,
+        source.start_time <= day_end,
+    )
+
+    if doctor_id:
+        statement = statement.where(source.doctor_id == doctor_id)
+
+    return statement
+
+
+def _listing_statement(
+    date: datetime, doctor_id: int | None, cursor: str | None = None
+):
+    """The day's ScheduledAppointment columns (series_id NULL) in keyset
+    order (start_time, id)."""
+    statement = _day_statement(date, doctor_id, AppointmentRead).add_columns(
+        null().label("series_id")
+    )
+    row = statement.selected_columns
+    statement = statement.order_by(row.start_time, row.id)
+    if cursor:
+        start_time, appt_id = decode_cursor(cursor, datetime, int)
+        statement = statement.where(
+            or_(
+                row.start_time > start_time,
+                and_(row.start_time == start_time, row.id > appt_id),
+            )
         )
-        .all()
+    return statement
+
+
+def _next_cursor(rows: list[dict], more: bool) -> str | None:
+    if not more:
+        return None
+    return encode_cursor(as_utc(rows[-1]["start_time"]), listing_key(rows[-1])[1])
+
+
+def _day_series_statement(day_start: datetime, doctor_id: int | None):
+    """Series that may have an occurrence on the UTC day."""
+    day_end = day_start + timedelta(days=1)
+    return series_statement(day_start, day_end, [doctor_id] if doctor_id else None)
+
+
+def _day_occurrences(
+    series, day_start: datetime, cursor: str | None = None
+) -> list[dict]:
+    """Listing rows of the series' occurrences starting on the UTC day (after
+    the cursor), in listing_key order; expanded for this day only."""
+    start = day_start.timestamp()
+    rows = occurrence_rows([Recurrence.of(one) for one in series], start, start + 86400)
+    if cursor:
+        after_time, after_key = decode_cursor(cursor, datetime, int)
+        after = (as_utc(after_time).timestamp(), after_key)
+        return [row for row in rows if listing_key(row) > after]
+    return list(rows)
+
+
+def _merged(stored: list[dict], occurrences: list[dict]) -> list[dict]:
+    """Stored rows and occurrences, both in listing_key order, merged."""
+    if not occurrences:
+        return stored
+    return list(heapq.merge(stored, occurrences, key=listing_key))
+
+
+def _schedule_keys(doctor_id: int, start_time: datetime) -> tuple:
+    """schedule_cache keys whose listing includes a booking at start_time."""
+    day = as_utc(start_time).date()
+    return (doctor_id, day), (None, day)
+
+
+def _utc_midnight(day: Date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _utc_day_statement(day: Date, doctor_id: int | None):
+    """ScheduledAppointment columns (series_id NULL) of the UTC calendar day,
+    in (start_time, id) order so equal data always encodes to equal bytes
+    (and ETags)."""
+    start_day = _utc_midnight(day)
+    end_day = start_day + timedelta(days=1)
+    # Only days before the archive horizon read saniya_appointments_archive.
+    source = appointments_source(start_day)
+    statement = (
+        select(*columns(AppointmentRead, source), null().label("series_id"))
+        .where(source.start_time >= start_day, source.start_time < end_day)
+        .order_by(source.start_time, source.id)
+    )
+    if doctor_id:
+        statement = statement.where(source.doctor_id == doctor_id)
+    return statement
+
+
+def day_listing(
+    db: Session, date: datetime, doctor_id: int | None = None
+) -> tuple[str, bytes]:
+    """The ETag and encoded JSON array of a day's appointments, read through
+    schedule_cache. The day is the UTC day containing ``date``, as in every
+    other listing."""
+    key = (doctor_id or None, _day_start(date).date())
+    cached = schedule_cache.get(key)
+    if cached is not None:
+        return cached
+    token = schedule_cache.token()
+    rows = db.execute(_utc_day_statement(key[1], key[0])).mappings()
+    stored = [dict(row) for row in rows]
+    day_start = _utc_midnight(key[1])
+    series = db.scalars(_day_series_statement(day_start, key[0]))
+    body = dump_rows(_merged(stored, _day_occurrences(series, day_start)))
+    return schedule_cache.put(key, token, body), body
+
+
+def has_conflict(
+    db: Session, doctor_id: int, start_time: datetime, duration_minutes: int
+) -> bool:
+    """Check whether the doctor already has an appointment, or an occurrence
+    of a series, overlapping the slot."""
+    candidates = db.execute(
+        _conflict_candidates(doctor_id, start_time, duration_minutes)
+    )
+    if _ends_after(candidates, start_time):
+        return True
+    series = db.scalars(_series_candidates(doctor_id, start_time, duration_minutes))
+    return _occurs_during(series, start_time, duration_minutes)
+
+
+def _doctor_row_locks(doctor_ids):
+    # Sorted so two transactions locking overlapping sets cannot deadlock.
+    return (
+        select(Doctor.id)
+        .where(Doctor.id.in_(sorted(doctor_ids)))
+        .order_by(Doctor.id)
+        .with_for_update()
     )
 
-    # Conflict detection (normalize existing appointments to UTC too)
-    for existing in existing_appts:
-        if existing.start_time and existing.duration_minutes:
-            existing_start = existing.start_time.astimezone(timezone.utc)
-            existing_end = existing.end_time.astimezone(timezone.utc)
-            overlap = existing_start < new_end and existing_end > appt_start_utc
 
-            if overlap:
-                raise HTTPException(status_code=409, detail="Appointment conflict")
+def lock_doctor_schedules(db: Session, doctor_ids) -> None:
+    """Serialize bookings for these doctors until the transaction ends.
 
-    # Create and save the new appointment
-    new_appt = Appointment(**appt.model_dump())
+    Where the database has row locks this is SELECT ... FOR UPDATE on the
+    doctors' rows, so bookings for other doctors proceed in parallel. SQLite
+    has one write lock per database, taken before the conflict check rather
+    than at the INSERT (begin_write).
+
+    Any transaction the session has open (reads such as is_doctor_active or
+    the schedule index load) is ended first, so the lock starts a new one.
+    Under REPEATABLE READ (MySQL's default) the conflict check would
+    otherwise read the snapshot of that earlier read and miss bookings
+    committed while this one waited for the lock. It is ended by a commit,
+    which (expire_on_commit being off) keeps the session's loaded objects.
+    """
+    db.commit()
+    if not begin_write(db):
+        db.execute(_doctor_row_locks(doctor_ids))
+
+
+def _retry_delay(attempt: int) -> float:
+    return BOOKING_RETRY_DELAY_SECONDS * 2**attempt
+
+
+def _book(db: Session, appt: AppointmentCreate) -> Appointment:
+    lock_doctor_schedules(db, [appt.doctor_id])
+    # The index is only a fast path; confirm against the DB before inserting.
+    if has_conflict(db, appt.doctor_id, appt.start_time, appt.duration_minutes):
+        db.rollback()
+        schedule_index.invalidate(appt.doctor_id)
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    new_appt = _new_appointment(appt)
     db.add(new_appt)
     db.commit()
-    db.refresh(new_appt)
     return new_appt
 
 
+def create_appointment(db: Session, appt: AppointmentCreate) -> Appointment:
+    """Create a new appointment, checking for conflicts.
+
+    The check and the insert run under lock_doctor_schedules, so concurrent
+    bookings for the same doctor cannot both pass the check. Lock timeouts
+    and deadlocks (OperationalError) are retried with backoff.
+    """
+    # Checked on every booking path: the conflict check's lookback relies on
+    # no appointment lasting longer than MAX_DURATION_MINUTES.
+    check_booking_rules(appt.start_time, appt.duration_minutes)
+
+    if schedule_index.overlaps(
+        db, appt.doctor_id, appt.start_time, appt.duration_minutes
+    ):
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    for attempt in range(BOOKING_ATTEMPTS):
+        try:
+            new_appt = _book(db, appt)
+            break
+        except OperationalError:
+            db.rollback()
+            if attempt == BOOKING_ATTEMPTS - 1:
+                raise
+            time.sleep(_retry_delay(attempt))
+
+    schedule_index.add(new_appt.doctor_id, new_appt.start_time, appt.duration_minutes)
+    invalidate("schedule", *_schedule_keys(new_appt.doctor_id, new_appt.start_time))
+    invalidate("utilization", new_appt.doctor_id)
+    record("appointment.book", new_appt.id, **_audit_details(appt))
+    return new_appt
+
+
+def _with_occurrences(appointments: list, occurrences: list[dict]) -> list:
+    for row in occurrences:
+        occurrence = Appointment(
+            patient_id=row["patient_id"],
+            doctor_id=row["doctor_id"],
+            start_time=row["start_time"],
+            duration_minutes=row["duration_minutes"],
+        )
+        occurrence.series_id = row["series_id"]
+        appointments.append(occurrence)
+    appointments.sort(key=lambda a: (as_utc(a.start_time), a.id or 0))
+    return appointments
+
+
 def list_appointments(
     db: Session, date: datetime, doctor_id: int | None = None
 ) -> list[Appointment]:
-    """List appointments for a given date, optionally filtered by doctor."""
+    """List appointments for a given date, optionally filtered by doctor, in
+    start order. Occurrences of series on that day are included as unsaved
+    Appointments (id None, series_id set)."""
+    appointments = list(db.scalars(_day_statement(date, doctor_id)))
+    day_start = _day_start(date)
+    series = db.scalars(_day_series_statement(day_start, doctor_id))
+    return _with_occurrences(appointments, _day_occurrences(series, day_start))
+
+
+def _sweep(
+    requested: list[tuple[float, float, int]], existing: list[tuple[float, float]]
+) -> list[int]:
+    """Return the indexes of requested intervals that can be booked.
+
+    Both lists hold (start, end[, index]) for one doctor. Requests are taken
+    in start order, so when two requests collide the earlier slot wins; each
+    request is compared with everything already busy before it and with the
+    next existing booking after it, which makes this a single pass.
+    """
+    existing.sort()
+    accepted = []
+    busy_until = float("-inf")
+    j = 0
+    for start, end, index in sorted(requested):
+        while j < len(existing) and existing[j][0] <= start:
+            busy_until = max(busy_until, existing[j][1])
+            j += 1
+        if busy_until > start or (j < len(existing) and existing[j][0] < end):
+            continue
+        accepted.append(index)
+        busy_until = max(busy_until, end)
+    return accepted
+
+
+def _inserted_ids(db: Session, rows: list[dict]) -> list[int]:
+    """Ids of just-inserted rows, read back in the inserting transaction.
+
+    A doctor's bookings never overlap, so the doctor and the start second
+    identify each row (DATETIME columns may round off the fraction).
+    """
+    starts = [row["start_time"] for row in rows]
+    found = db.execute(
+        select(Appointment.id, Appointment.doctor_id, Appointment.start_time).where(
+            Appointment.doctor_id.in_({row["doctor_id"] for row in rows}),
+            Appointment.start_time >= min(starts) - timedelta(seconds=1),
+            Appointment.start_time <= max(starts) + timedelta(seconds=1),
+        )
+    )
+    by_second = {
+        (doctor_id, math.floor(as_utc(start_time).timestamp())): appointment_id
+        for appointment_id, doctor_id, start_time in found
+    }
+    ids = []
+    for row in rows:
+        second = row["start_time"].timestamp()
+        ids.append(
+            by_second.get((row["doctor_id"], math.floor(second)))
+            or by_second[(row["doctor_id"], math.ceil(second))]
+        )
+    return ids
+
 
-    # Normalize date to UTC
-    date_utc = date.astimezone(timezone.utc)
-    day_start = date_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-    day_end = date_utc.replace(hour=23, minute=59, second=59, microsecond=999999)
+def bulk_create_appointments(
+    db: Session, appts: list[AppointmentCreate]
+) -> list[AppointmentBulkResult]:
+    """Book many appointments in one transaction, reporting each item's outcome.
 
-    query = db.query(Appointment).filter(
-        Appointment.start_time >= day_start,
-        Appointment.start_time <= day_end,
+    Conflicts are resolved per doctor with one sweep over the existing rows
+    (fetched in a single range query) and the batch itself; accepted rows are
+    inserted with one executemany. The batch's doctors stay locked
+    (lock_doctor_schedules) from the range query until the commit.
+    """
+    results: dict[int, AppointmentBulkResult] = {}
+    pending: list[int] = []
+    for index, appt in enumerate(appts):
+        try:
+            check_booking_rules(appt.start_time, appt.duration_minutes)
+        except HTTPException as exc:
+            results[index] = AppointmentBulkResult(
+                index=index, status_code=exc.status_code, detail=exc.detail
+            )
+        else:
+            pending.append(index)
+
+    doctor_ids = {appts[index].doctor_id for index in pending}
+    if doctor_ids:
+        lock_doctor_schedules(db, doctor_ids)
+    available = set(
+        db.scalars(
+            select(Doctor.id).where(Doctor.id.in_(doctor_ids), Doctor.active.is_(True))
+        )
     )
 
-    if doctor_id:
-        query = query.filter(Appointment.doctor_id == doctor_id)
+    requested: dict[int, list[tuple[float, float, int]]] = {}
+    for index in pending:
+        appt = appts[index]
+        if appt.doctor_id not in available:
+            results[index] = AppointmentBulkResult(
+                index=index, status_code=400, detail="Doctor not available"
+            )
+            continue
+        start = as_utc(appt.start_time).timestamp()
+        requested.setdefault(appt.doctor_id, []).append(
+            (start, start + appt.duration_minutes * 60, index)
+        )
+
+    accepted: list[int] = []
+    if requested:
+        window_start = min(r[0] for rs in requested.values() for r in rs)
+        window_end = max(r[1] for rs in requested.values() for r in rs)
+        existing: dict[int, list[tuple[float, float]]] = {
+            doctor_id: [] for doctor_id in requested
+        }
+        rows = db.execute(
+            select(
+                Appointment.doctor_id,
+                Appointment.start_time,
+                Appointment.duration_minutes,
+            ).where(
+                Appointment.doctor_id.in_(requested),
+                Appointment.start_time
+                > datetime.fromtimestamp(window_start, timezone.utc)
+                - timedelta(minutes=MAX_DURATION_MINUTES),
+                Appointment.start_time
+                < datetime.fromtimestamp(window_end, timezone.utc),
+            )
+        )
+        for doctor_id, start_time, duration in rows:
+            start = as_utc(start_time).timestamp()
+            existing[doctor_id].append((start, start + duration * 60))
+        series = db.scalars(
+            series_statement(
+                datetime.fromtimestamp(window_start, timezone.utc),
+                datetime.fromtimestamp(window_end, timezone.utc),
+                list(requested),
+            )
+        )
+        for one in series:
+            # Only the occurrences inside the batch's window are generated.
+            existing[one.doctor_id].extend(
+                Recurrence.of(one).occurrences(window_start, window_end)
+            )
+
+        for doctor_id, doctor_requests in requested.items():
+            accepted.extend(_sweep(doctor_requests, existing[doctor_id]))
+
+    accepted_set = set(accepted)
+    for index in pending:
+        if index not in results and index not in accepted_set:
+            results[index] = AppointmentBulkResult(
+                index=index, status_code=409, detail="Appointment conflict"
+            )
+
+    if accepted:
+        accepted.sort()
+        rows = [
+            {
+                **appts[index].model_dump(exclude={"start_time"}),
+                "start_time": as_utc(appts[index].start_time),
+            }
+            for index in accepted
+        ]
+        dialect = db.get_bind().dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            ids = db.scalars(
+                insert(Appointment).returning(
+                    Appointment.id, sort_by_parameter_order=True
+                ),
+                rows,
+            ).all()
+        else:
+            # e.g. MySQL: no RETURNING, so the ids are read back before commit
+            db.execute(insert(Appointment), rows)
+            ids = _inserted_ids(db, rows)
+        db.commit()
+
+        for index, new_id, row in zip(accepted, ids, rows):
+            results[index] = AppointmentBulkResult(
+                index=index, status_code=201, id=new_id
+            )
+            schedule_index.add(
+                row["doctor_id"], row["start_time"], row["duration_minutes"]
+            )
+            record("appointment.book", new_id, **_audit_details(appts[index]))
+        invalidate(
+            "schedule",
+            *{
+                key
+                for row in rows
+                for key in _schedule_keys(row["doctor_id"], row["start_time"])
+            }
+        )
+        invalidate("utilization", *{row["doctor_id"] for row in rows})
+    else:
+        db.rollback()  # nothing to insert; release the locks
 
-    return query.all()
+    return [results[index] for index in range(len(appts))]
+
+
+def page_appointments(
+    db: Session,
+    date: datetime,
+    doctor_id: int | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """One keyset page of a day's appointments and series occurrences
+    (ScheduledAppointment-shaped dicts) and the cursor of the next page."""
+    statement = _listing_statement(date, doctor_id, cursor).limit(limit + 1)
+    stored = [dict(row) for row in db.execute(statement).mappings()]
+    day_start = _day_start(date)
+    series = db.scalars(_day_series_statement(day_start, doctor_id))
+    occurrences = _day_occurrences(series, day_start, cursor)
+    rows, more = split_page(_merged(stored, occurrences)[: limit + 1], limit)
+    return rows, _next_cursor(rows, more)
+
+
+def iter_appointments(
+    db: Session,
+    date: datetime,
+    doctor_id: int | None = None,
+    cursor: str | None = None,
+    batch_size: int = 500,
+):
+    """Yield a day's appointments and series occurrences
+    (ScheduledAppointment-shaped dicts) in keyset order without buffering
+    the stored ones.
+
+    yield_per streams rows from a server-side cursor in batches, so memory
+    stays bounded by batch_size whatever the size of the day.
+    """
+    day_start = _day_start(date)
+    series = db.scalars(_day_series_statement(day_start, doctor_id))
+    occurrences = _day_occurrences(series, day_start, cursor)
+    statement = _listing_statement(date, doctor_id, cursor).execution_options(
+        yield_per=batch_size
+    )
+    stored = (dict(row) for row in db.execute(statement).mappings())
+    yield from heapq.merge(stored, occurrences, key=listing_key)
+
+
+async def has_conflict_async(
+    db: "AsyncSession", doctor_id: int, start_time: datetime, duration_minutes: int
+) -> bool:
+    """Async variant of has_conflict."""
+    candidates = await db.execute(
+        _conflict_candidates(doctor_id, start_time, duration_minutes)
+    )
+    if _ends_after(candidates, start_time):
+        return True
+    series = await db.scalars(
+        _series_candidates(doctor_id, start_time, duration_minutes)
+    )
+    return _occurs_during(series, start_time, duration_minutes)
+
+
+async def lock_doctor_schedules_async(db: "AsyncSession", doctor_ids) -> None:
+    """Async variant of lock_doctor_schedules."""
+    await db.commit()
+    if not await begin_write_async(db):
+        await db.execute(_doctor_row_locks(doctor_ids))
+
+
+async def _book_async(db: "AsyncSession", appt: AppointmentCreate) -> Appointment:
+    await lock_doctor_schedules_async(db, [appt.doctor_id])
+    if await has_conflict_async(
+        db, appt.doctor_id, appt.start_time, appt.duration_minutes
+    ):
+        await db.rollback()
+        schedule_index.invalidate(appt.doctor_id)
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    new_appt = _new_appointment(appt)
+    db.add(new_appt)
+    await db.commit()
+    return new_appt
+
+
+async def create_appointment_async(
+    db: "AsyncSession", appt: AppointmentCreate
+) -> Appointment:
+    """Async variant of create_appointment."""
+    check_booking_rules(appt.start_time, appt.duration_minutes)
+    if await schedule_index.overlaps_async(
+        db, appt.doctor_id, appt.start_time, appt.duration_minutes
+    ):
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    for attempt in range(BOOKING_ATTEMPTS):
+        try:
+            new_appt = await _book_async(db, appt)
+            break
+        except OperationalError:
+            await db.rollback()
+            if attempt == BOOKING_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+
+    schedule_index.add(new_appt.doctor_id, new_appt.start_time, appt.duration_minutes)
+    invalidate("schedule", *_schedule_keys(new_appt.doctor_id, new_appt.start_time))
+    invalidate("utilization", new_appt.doctor_id)
+    await record_async("appointment.book", new_appt.id, **_audit_details(appt))
+    return new_appt
+
+
+async def list_appointments_async(
+    db: "AsyncSession", date: datetime, doctor_id: int | None = None
+) -> list[Appointment]:
+    """Async variant of list_appointments."""
+    appointments = list(await db.scalars(_day_statement(date, doctor_id)))
+    day_start = _day_start(date)
+    series = await db.scalars(_day_series_statement(day_start, doctor_id))
+    return _with_occurrences(appointments, _day_occurrences(series, day_start))
+
+
+async def day_listing_async(
+    db: "AsyncSession", date: datetime, doctor_id: int | None = None
+) -> tuple[str, bytes]:
+    """Async variant of day_listing."""
+    key = (doctor_id or None, _day_start(date).date())
+    cached = schedule_cache.get(key)
+    if cached is not None:
+        return cached
+    token = schedule_cache.token()
+    result = await db.execute(_utc_day_statement(key[1], key[0]))
+    stored = [dict(row) for row in result.mappings()]
+    day_start = _utc_midnight(key[1])
+    series = await db.scalars(_day_series_statement(day_start, key[0]))
+    body = dump_rows(_merged(stored, _day_occurrences(series, day_start)))
+    return schedule_cache.put(key, token, body), body
+
+
+async def page_appointments_async(
+    db: "AsyncSession",
+    date: datetime,
+    doctor_id: int | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """Async variant of page_appointments."""
+    statement = _listing_statement(date, doctor_id, cursor).limit(limit + 1)
+    result = await db.execute(statement)
+    stored = [dict(row) for row in result.mappings()]
+    day_start = _day_start(date)
+    series = await db.scalars(_day_series_statement(day_start, doctor_id))
+    occurrences = _day_occurrences(series, day_start, cursor)
+    rows, more = split_page(_merged(stored, occurrences)[: limit + 1], limit)
+    return rows, _next_cursor(rows, more)
+
+
+async def iter_appointments_async(
+    db: "AsyncSession",
+    date: datetime,
+    doctor_id: int | None = None,
+    cursor: str | None = None,
+    batch_size: int = 500,
+):
+    """Async variant of iter_appointments."""
+    day_start = _day_start(date)
+    series = await db.scalars(_day_series_statement(day_start, doctor_id))
+    occurrences = _day_occurrences(series, day_start, cursor)
+    statement = _listing_statement(date, doctor_id, cursor).execution_options(
+        yield_per=batch_size
+    )
+    result = await db.stream(statement)
+    async for row in result.mappings():
+        row = dict(row)
+        while occurrences and listing_key(occurrences[0]) < listing_key(row):
+            yield occurrences.pop(0)
+        yield row
+    for row in occurrences:
+        yield row
@@ -0,0 +1,122 @@
+"""Archival of past appointments.
+
+saniya_appointments is the hot table: it keeps only appointments that
+started after the archive horizon (midnight UTC, ARCHIVE_AFTER_DAYS days
+ago), so its indexes stay the size of the live schedule however much history
+accumulates. Older rows are moved in batches to saniya_appointments_archive.
+
+Conflict checks and availability only ever look at the future, so they read
+the hot table alone. Listings for a day before the horizon read both tables
+as one UNION ALL (rows may still be hot if the mover has not run yet).
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, aliased
+
+from src.config import get_settings
+from src.database import begin_write
+from src.models.appointment import Appointment, AppointmentArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "patient_id",
+    "doctor_id",
+    "start_time",
+    "duration_minutes",
+    "created_at",
+)
+
+
+def archive_horizon(now: datetime | None = None) -> datetime:
+    """Appointments starting before this instant belong in the archive."""
+    now = now or datetime.now(timezone.utc)
+    midnight = now.astimezone(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return midnight - timedelta(days=get_settings().archive_after_days)
+
+
+def appointments_source(day_start: datetime):
+    """The entity to read a day's appointments from.
+
+    Appointment itself for days after the horizon; otherwise an Appointment
+    alias over the hot table UNION ALL the archive. Filters on the alias are
+    pushed down into both branches and served by their indexes.
+    """
+    if day_start >= archive_horizon():
+        return Appointment
+    return all_appointments()
+
+
+def all_appointments():
+    """An Appointment alias over the hot table UNION ALL the archive: every
+    appointment ever booked, for histories that span the horizon."""
+    both = union_all(
+        select(*(getattr(Appointment, name) for name in ARCHIVED_COLUMNS)),
+        select(*(getattr(AppointmentArchive, name) for name in ARCHIVED_COLUMNS)),
+    ).subquery("appointments_all")
+    return aliased(Appointment, both)
+
+
+def archive_appointments(
+    db: Session, before: datetime | None = None, batch_size: int | None = None
+) -> int:
+    """Move appointments starting before ``before`` (default: the archive
+    horizon) into the archive, one committed batch at a time; returns the
+    number of rows moved."""
+    before = before or archive_horizon()
+    batch_size = batch_size or get_settings().archive_batch_size
+    # SQLite hands out max(rowid) + 1, so deleting the newest row would let
+    # its id be reused; keeping it hot means archived ids are never reissued.
+    newest = select(func.max(Appointment.id)).scalar_subquery()
+    moved = 0
+    while True:
+        # Several workers may run this at once: each batch is claimed under
+        # the SQLite write lock, or by row locks that the others skip.
+        begin_write(db)
+        ids = db.scalars(
+            select(Appointment.id)
+            .where(Appointment.start_time < before, Appointment.id < newest)
+            .order_by(Appointment.start_time)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            db.rollback()
+            return moved
+        db.execute(
+            insert(AppointmentArchive).from_select(
+                ARCHIVED_COLUMNS,
+                select(
+                    *(getattr(Appointment, name) for name in ARCHIVED_COLUMNS)
+                ).where(Appointment.id.in_(ids)),
+            )
+        )
+        db.execute(delete(Appointment).where(Appointment.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+
+def _archive_once(session_factory) -> int:
+    with session_factory() as db:
+        return archive_appointments(db)
+
+
+async def archive_periodically(session_factory, interval: float) -> None:
+    """Run archive_appointments every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            moved = await asyncio.to_thread(_archive_once, session_factory)
+            if moved:
+                logger.info("Archived %d appointments", moved)
+        except SQLAlchemyError:
+            # e.g. another worker archived the same batch; retry next round.
+            logger.exception("Appointment archival failed")
+        await asyncio.sleep(interval)
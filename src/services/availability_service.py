@@ -0,0 +1,107 @@
+"""Service layer for free-slot (availability) searches."""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.doctor import Doctor
+from src.services.booking_rules import (
+    MAX_DURATION_MINUTES,
+    MIN_DURATION_MINUTES,
+    as_utc,
+)
+from src.services.schedule_index import schedule_index
+
+# Longest range a single search may cover
+MAX_SEARCH_DAYS = 31
+
+
+def _search_range(
+    start_time: datetime, end_time: datetime, duration_minutes: int
+) -> tuple[datetime, datetime]:
+    """Validate a search and clamp its start to now (no bookings in the past)."""
+    if (
+        duration_minutes < MIN_DURATION_MINUTES
+        or duration_minutes > MAX_DURATION_MINUTES
+    ):
+        raise HTTPException(
+            status_code=400, detail="Duration must be between 15 and 180 minutes"
+        )
+
+    start = max(as_utc(start_time), datetime.now(timezone.utc))
+    end = as_utc(end_time)
+    if end <= as_utc(start_time):
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - as_utc(start_time) > timedelta(days=MAX_SEARCH_DAYS):
+        raise HTTPException(
+            status_code=400, detail=f"Search range is limited to {MAX_SEARCH_DAYS} days"
+        )
+    return start, end
+
+
+def _availability(
+    db: Session, doctor: Doctor, start: datetime, end: datetime, duration: int
+) -> dict:
+    # Plain dicts: the endpoint's response_model validates the whole result in
+    # one pydantic-core call instead of one model __init__ per window.
+    windows = []
+    if doctor.active and start < end:
+        windows = [
+            {"start_time": gap_start, "end_time": gap_end}
+            for gap_start, gap_end in schedule_index.free_windows(
+                db, doctor.id, start, end, duration
+            )
+        ]
+    return {
+        "doctor_id": doctor.id,
+        "full_name": doctor.full_name,
+        "specialization": doctor.specialization,
+        "windows": windows,
+    }
+
+
+def get_doctor_availability(
+    db: Session,
+    doctor_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    duration_minutes: int,
+) -> dict:
+    """Open windows of one doctor that fit an appointment of the given length.
+
+    Returns a dict shaped like DoctorAvailability.
+    """
+    start, end = _search_range(start_time, end_time, duration_minutes)
+    doctor = db.get(Doctor, doctor_id)
+    if not doctor:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+    return _availability(db, doctor, start, end, duration_minutes)
+
+
+def search_availability(
+    db: Session,
+    start_time: datetime,
+    end_time: datetime,
+    duration_minutes: int,
+    specialization: str | None = None,
+) -> list[dict]:
+    """Open windows of every active doctor, optionally of one specialization.
+
+    Returns dicts shaped like DoctorAvailability, only for doctors with at
+    least one window.
+    Gaps come from the in-memory schedule index, so the database is hit once
+    for the doctor list and at most once more for doctors not indexed yet.
+    """
+    start, end = _search_range(start_time, end_time, duration_minutes)
+    query = select(Doctor).where(Doctor.active.is_(True)).order_by(Doctor.id)
+    if specialization:
+        query = query.where(Doctor.specialization == specialization)
+    doctors = db.scalars(query).all()
+
+    schedule_index.load_many(db, [doctor.id for doctor in doctors])
+    results = [
+        _availability(db, doctor, start, end, duration_minutes) for doctor in doctors
+    ]
+    return [result for result in results if result["windows"]]
@@ -0,0 +1,34 @@
+"""Booking rules and time helpers shared by the scheduling services."""
+
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+# Booking rules enforced by every booking service; MAX_DURATION_MINUTES also
+# bounds how far back an existing appointment can start and still overlap a
+# new one.
+MIN_DURATION_MINUTES = 15
+MAX_DURATION_MINUTES = 180
+
+
+def as_utc(value: datetime) -> datetime:
+    """Return value as an aware UTC datetime (naive values are taken as UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def check_booking_rules(start_time: datetime, duration_minutes: int) -> None:
+    """Reject bookings in the past or outside the allowed duration range."""
+    if start_time <= datetime.now(timezone.utc):
+        raise HTTPException(
+            status_code=400, detail="Appointment must be scheduled in the future"
+        )
+
+    if (
+        duration_minutes < MIN_DURATION_MINUTES
+        or duration_minutes > MAX_DURATION_MINUTES
+    ):
+        raise HTTPException(
+            status_code=400, detail="Duration must be between 15 and 180 minutes"
+        )
@@ -1,10 +1,26 @@
 """Service layer for doctor-related operations."""
 
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
+from src.audit import record, record_async
+from src.cache import doctor_cache
+from src.invalidation import invalidate
 from src.models.doctor import Doctor
-from src.schemas.doctor import DoctorCreate
+from src.schemas.doctor import DoctorCreate, DoctorRead
+from src.serialization import columns
+from src.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
 def create_doctor(db: Session, doctor: DoctorCreate) -> Doctor:
@@ -12,7 +28,8 @@ def create_doctor(db: Session, doctor: DoctorCreate) -> Doctor:
     new_doctor = Doctor(**doctor.model_dump())  # Pydantic v2 style
     db.add(new_doctor)
     db.commit()
-    db.refresh(new_doctor)
+    invalidate("doctor", new_doctor.id)
+    record("doctor.create", new_doctor.id)
     return new_doctor
 
 
@@ -24,19 +41,152 @@ def get_doctor(db: Session, doctor_id: int) -> Doctor:
     return doctor
 
 
-def activate_doctor(db: Session, doctor_id: int) -> Doctor:
-    """Activate a doctor (set active=True)."""
-    doctor = get_doctor(db, doctor_id)
-    doctor.active = True
+def _cache_record(doctor: Doctor, token: int) -> dict:
+    record = DoctorRead.model_validate(doctor, from_attributes=True).model_dump()
+    doctor_cache.set(doctor.id, record, token)
+    return record
+
+
+def get_doctor_cached(db: Session, doctor_id: int) -> dict:
+    """Doctor as a DoctorRead-shaped dict, read through doctor_cache."""
+    record = doctor_cache.get(doctor_id)
+    if record is None:
+        token = doctor_cache.token()
+        record = _cache_record(get_doctor(db, doctor_id), token)
+    return record
+
+
+def is_doctor_active(db: Session, doctor_id: int) -> bool:
+    """Whether the doctor exists and takes bookings, read through doctor_cache."""
+    record = doctor_cache.get(doctor_id)
+    if record is None:
+        token = doctor_cache.token()
+        doctor = db.get(Doctor, doctor_id)
+        if not doctor:
+            return False
+        record = _cache_record(doctor, token)
+    return record["active"]
+
+
+def _set_active_statement(doctor_id: int, active: bool):
+    return (
+        update(Doctor)
+        .where(Doctor.id == doctor_id)
+        .values(active=active)
+        .returning(Doctor)
+    )
+
+
+def _set_active(db: Session, doctor_id: int, active: bool) -> Doctor:
+    """UPDATE ... RETURNING in one statement, or load-and-flush without it."""
+    if db.get_bind().dialect.update_returning:
+        doctor = db.scalar(_set_active_statement(doctor_id, active))
+        if not doctor:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+    else:
+        doctor = get_doctor(db, doctor_id)
+        doctor.active = active
     db.commit()
-    db.refresh(doctor)
+    invalidate("doctor", doctor_id)
+    record("doctor.activate" if active else "doctor.deactivate", doctor_id)
     return doctor
 
 
+def activate_doctor(db: Session, doctor_id: int) -> Doctor:
+    """Activate a doctor (set active=True)."""
+    return _set_active(db, doctor_id, True)
+
+
 def deactivate_doctor(db: Session, doctor_id: int) -> Doctor:
     """Deactivate a doctor (set active=False)."""
-    doctor = get_doctor(db, doctor_id)
-    doctor.active = False
-    db.commit()
-    db.refresh(doctor)
+    return _set_active(db, doctor_id, False)
+
+
+def _doctors_after(cursor: str | None):
+    statement = select(*columns(DoctorRead, Doctor)).order_by(Doctor.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        statement = statement.where(Doctor.id > last_id)
+    return statement
+
+
+def page_doctors(
+    db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None
+) -> tuple[list[dict], str | None]:
+    """One keyset page of doctors by id (DoctorRead-shaped dicts) and the
+    cursor of the next page."""
+    statement = _doctors_after(cursor).limit(limit + 1)
+    rows, more = split_page(
+        [dict(row) for row in db.execute(statement).mappings()], limit
+    )
+    return rows, encode_cursor(rows[-1]["id"]) if more else None
+
+
+def iter_doctors(db: Session, cursor: str | None = None, batch_size: int = 500):
+    """Yield all doctors by id as dicts, streamed in batches of batch_size."""
+    statement = _doctors_after(cursor).execution_options(yield_per=batch_size)
+    for row in db.execute(statement).mappings():
+        yield dict(row)
+
+
+async def create_doctor_async(db: "AsyncSession", doctor: DoctorCreate) -> Doctor:
+    """Async variant of create_doctor."""
+    new_doctor = Doctor(**doctor.model_dump())
+    db.add(new_doctor)
+    await db.commit()
+    invalidate("doctor", new_doctor.id)
+    await record_async("doctor.create", new_doctor.id)
+    return new_doctor
+
+
+async def get_doctor_async(db: "AsyncSession", doctor_id: int) -> Doctor:
+    """Async variant of get_doctor."""
+    doctor = await db.get(Doctor, doctor_id)
+    if not doctor:
+        raise HTTPException(status_code=404, detail="Doctor not found")
     return doctor
+
+
+async def get_doctor_cached_async(db: "AsyncSession", doctor_id: int) -> dict:
+    """Async variant of get_doctor_cached."""
+    record = doctor_cache.get(doctor_id)
+    if record is None:
+        token = doctor_cache.token()
+        record = _cache_record(await get_doctor_async(db, doctor_id), token)
+    return record
+
+
+async def is_doctor_active_async(db: "AsyncSession", doctor_id: int) -> bool:
+    """Async variant of is_doctor_active."""
+    record = doctor_cache.get(doctor_id)
+    if record is None:
+        token = doctor_cache.token()
+        doctor = await db.get(Doctor, doctor_id)
+        if not doctor:
+            return False
+        record = _cache_record(doctor, token)
+    return record["active"]
+
+
+async def _set_active_async(db: "AsyncSession", doctor_id: int, active: bool) -> Doctor:
+    if db.get_bind().dialect.update_returning:
+        doctor = await db.scalar(_set_active_statement(doctor_id, active))
+        if not doctor:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+    else:
+        doctor = await get_doctor_async(db, doctor_id)
+        doctor.active = active
+    await db.commit()
+    invalidate("doctor", doctor_id)
+    await record_async("doctor.activate" if active else "doctor.deactivate", doctor_id)
+    return doctor
+
+
+async def activate_doctor_async(db: "AsyncSession", doctor_id: int) -> Doctor:
+    """Async variant of activate_doctor."""
+    return await _set_active_async(db, doctor_id, True)
+
+
+async def deactivate_doctor_async(db: "AsyncSession", doctor_id: int) -> Doctor:
+    """Async variant of deactivate_doctor."""
+    return await _set_active_async(db, doctor_id, False)
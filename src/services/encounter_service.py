@@ -0,0 +1,117 @@
+"""Patient timelines and doctors' patient lists.
+
+Each page is one projected join over every appointment, archived ones
+included: rows come back with the doctor's or patient's details already
+attached, so the number of statements does not grow with the page (the
+ORM relationships are raise_on_sql to keep it that way). Pages are keyset
+paged, most recent first.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from src.models.doctor import Doctor
+from src.models.patient import Patient
+from src.services.archive_service import all_appointments
+from src.services.booking_rules import as_utc
+from src.services.doctor_service import get_doctor_cached
+from src.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+from src.services.patient_service import get_patient_cached
+
+
+def _before(key_columns, cursor: str | None):
+    """Rows after the cursor in descending (time, id) order, or None."""
+    if not cursor:
+        return None
+    at, last_id = decode_cursor(cursor, datetime, int)
+    time_column, id_column = key_columns
+    return or_(time_column < at, and_(time_column == at, id_column < last_id))
+
+
+def _page(db: Session, statement, limit: int, key: tuple[str, str]):
+    rows, more = split_page(
+        [dict(row) for row in db.execute(statement.limit(limit + 1)).mappings()],
+        limit,
+    )
+    if not more:
+        return rows, None
+    time_key, id_key = key
+    return rows, encode_cursor(as_utc(rows[-1][time_key]), rows[-1][id_key])
+
+
+def page_patient_encounters(
+    db: Session,
+    patient_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """One page of a patient's appointments with their doctors, newest
+    first (PatientEncounter-shaped dicts), and the next page's cursor."""
+    get_patient_cached(db, patient_id)  # 404 for unknown patients
+    source = all_appointments()
+    statement = (
+        select(
+            source.id,
+            source.start_time,
+            source.duration_minutes,
+            source.doctor_id,
+            Doctor.full_name.label("doctor_name"),
+            Doctor.specialization,
+        )
+        .join(Doctor, Doctor.id == source.doctor_id)
+        .where(source.patient_id == patient_id)
+        .order_by(source.start_time.desc(), source.id.desc())
+    )
+    after = _before((source.start_time, source.id), cursor)
+    if after is not None:
+        statement = statement.where(after)
+    return _page(db, statement, limit, ("start_time", "id"))
+
+
+def page_doctor_patients(
+    db: Session,
+    doctor_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """One page of the patients a doctor has appointments with, most
+    recently seen first (DoctorPatient-shaped dicts), and the next page's
+    cursor."""
+    get_doctor_cached(db, doctor_id)  # 404 for unknown doctors
+    source = all_appointments()
+    visits = (
+        select(
+            source.patient_id,
+            func.count().label("appointments"),
+            func.min(source.start_time).label("first_appointment"),
+            func.max(source.start_time).label("last_appointment"),
+        )
+        .where(source.doctor_id == doctor_id)
+        .group_by(source.patient_id)
+        .subquery("visits")
+    )
+    statement = (
+        select(
+            Patient.id,
+            Patient.first_name,
+            Patient.last_name,
+            Patient.email,
+            Patient.phone,
+            visits.c.appointments,
+            visits.c.first_appointment,
+            visits.c.last_appointment,
+        )
+        .join(visits, visits.c.patient_id == Patient.id)
+        .order_by(visits.c.last_appointment.desc(), Patient.id.desc())
+    )
+    after = _before((visits.c.last_appointment, Patient.id), cursor)
+    if after is not None:
+        statement = statement.where(after)
+    return _page(db, statement, limit, ("last_appointment", "id"))
@@ -0,0 +1,61 @@
+"""Keyset (cursor) pagination helpers shared by the list endpoints."""
+
+import base64
+import json
+from collections.abc import Callable, Iterable, Mapping
+from datetime import datetime
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from src.database import SessionLocal
+from src.serialization import dump_line
+
+# Page size used when a list endpoint is called without `limit`
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(*key) -> str:
+    """Opaque cursor for the last row of a page (its sort key values)."""
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value for value in key
+    ]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Decode a cursor made by encode_cursor, converting values to ``types``."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(types):
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(types, values)
+        )
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def split_page(rows: list, limit: int) -> tuple[list, bool]:
+    """Trim a `limit + 1` fetch to `limit` rows and report whether more exist."""
+    return rows[:limit], len(rows) > limit
+
+
+def ndjson_response(
+    rows_of: Callable[[Session], Iterable[Mapping]],
+) -> StreamingResponse:
+    """Stream rows (dicts) as newline-delimited JSON, one per line.
+
+    The rows are produced inside a session owned by the stream, because the
+    request's session is closed before the body has finished sending.
+    """
+
+    def lines():
+        with SessionLocal() as db:
+            for row in rows_of(db):
+                yield dump_line(row)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,220 @@
+"""Bulk patient import from CSV or NDJSON.
+
+Input is consumed as a stream of lines and handled a chunk of rows at a
+time, so memory stays flat whatever the file size: each chunk is validated
+with one PatientCreate list validation, checked against the email/phone
+unique constraints with one IN query, inserted with one executemany (which
+PyMySQL sends as multi-row INSERTs) and committed. Rejected rows are
+reported by line number; only the first MAX_REPORTED_ERRORS are listed.
+"""
+
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+import anyio
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.audit import record
+from src.models.patient import Patient
+from src.schemas.patient import PatientCreate
+
+# Rows validated, checked and inserted together
+CHUNK_SIZE = 1000
+# Rejected rows listed in the report (all of them are counted)
+MAX_REPORTED_ERRORS = 1000
+# Longest accepted line; bounds the buffer of a file without newlines
+MAX_LINE_CHARS = 64 * 1024
+# Tries per chunk when a concurrent insert takes an email/phone first
+INSERT_ATTEMPTS = 3
+
+FIELDS = tuple(PatientCreate.model_fields)
+
+_patients_adapter = TypeAdapter(list[PatientCreate])
+
+
+def blocking_chunks(stream: AsyncIterator[bytes]) -> Iterator[bytes]:
+    """Iterate an async byte stream (a request body) from a worker thread,
+    fetching each chunk on the event loop only when it is needed."""
+
+    async def next_chunk() -> bytes:
+        return await stream.__anext__()
+
+    while True:
+        try:
+            yield anyio.from_thread.run(next_chunk)
+        except StopAsyncIteration:
+            return
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split UTF-8 byte chunks into lines, keeping their line endings."""
+    pending = ""
+    for text in codecs.iterdecode(chunks, "utf-8-sig"):
+        pending += text
+        start = 0
+        while (end := pending.find("\n", start)) != -1:
+            yield pending[start : end + 1]
+            start = end + 1
+        pending = pending[start:]
+        if len(pending) > MAX_LINE_CHARS:
+            raise HTTPException(
+                status_code=400, detail=f"Lines are limited to {MAX_LINE_CHARS} chars"
+            )
+    if pending:
+        yield pending
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict | str]]:
+    """(line number, record or error message) per CSV row; the first row
+    names the columns and must include every PatientCreate field."""
+    reader = csv.reader(lines)
+    header = [name.strip() for name in next(reader, [])]
+    missing = [name for name in FIELDS if name not in header]
+    if missing:
+        raise HTTPException(
+            status_code=400, detail=f"CSV header is missing {', '.join(missing)}"
+        )
+    for row in reader:
+        if not any(row):
+            continue
+        if len(row) != len(header):
+            yield reader.line_num, f"Expected {len(header)} fields, got {len(row)}"
+        else:
+            yield reader.line_num, dict(zip(header, row))
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[tuple[int, dict | str]]:
+    """(line number, record or error message) per non-blank NDJSON line."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield number, "Invalid JSON"
+            continue
+        yield number, value if isinstance(value, dict) else "Expected an object"
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson}
+
+
+def _validate(chunk: list[tuple[int, dict]]) -> tuple[list, list[tuple[int, str]]]:
+    """Validate a chunk in one call; returns (line, patient dict) pairs and
+    (line, error) pairs."""
+    records = [row for _, row in chunk]
+    errors: dict[int, str] = {}
+    try:
+        patients = _patients_adapter.validate_python(records)
+    except ValidationError as exc:
+        for error in exc.errors():
+            index, *field = error["loc"]
+            location = ".".join(str(part) for part in field)
+            errors.setdefault(index, f"{location}: {error['msg']}")
+        records = [r for i, r in enumerate(records) if i not in errors]
+        patients = _patients_adapter.validate_python(records)
+    lines = [line for i, (line, _) in enumerate(chunk) if i not in errors]
+    valid = list(zip(lines, _patients_adapter.dump_python(patients)))
+    return valid, [(chunk[index][0], message) for index, message in errors.items()]
+
+
+def _split_duplicates(
+    db: Session, rows: list[tuple[int, dict]]
+) -> tuple[list[dict], list[tuple[int, str]]]:
+    """Drop rows whose email or phone is taken, in the database (one IN
+    query) or by an earlier row of the chunk."""
+    taken = db.execute(
+        select(Patient.email, Patient.phone).where(
+            or_(
+                Patient.email.in_([row["email"] for _, row in rows]),
+                Patient.phone.in_([row["phone"] for _, row in rows]),
+            )
+        )
+    ).all()
+    emails = {email for email, _ in taken}
+    phones = {phone for _, phone in taken}
+    accepted, rejected = [], []
+    for line, row in rows:
+        if row["email"] in emails:
+            rejected.append((line, "Email already exists"))
+        elif row["phone"] in phones:
+            rejected.append((line, "Phone already exists"))
+        else:
+            accepted.append(row)
+            emails.add(row["email"])
+            phones.add(row["phone"])
+    return accepted, rejected
+
+
+def _insert_unique(
+    db: Session, rows: list[tuple[int, dict]]
+) -> tuple[list[dict], list[tuple[int, str]]]:
+    """Insert and commit the rows whose email and phone are free; returns
+    them and the (line, error) pairs of the others."""
+    accepted, duplicates = _split_duplicates(db, rows) if rows else ([], [])
+    if accepted:
+        db.execute(insert(Patient), accepted)
+    db.commit()
+    return accepted, duplicates
+
+
+def _import_chunk(db: Session, chunk: list[tuple[int, dict]]) -> tuple[int, list]:
+    valid, rejected = _validate(chunk)
+    for _ in range(INSERT_ATTEMPTS - 1):
+        try:
+            accepted, duplicates = _insert_unique(db, valid)
+            break
+        except IntegrityError:
+            # Another writer took an email/phone since the check; re-check.
+            db.rollback()
+    else:
+        accepted, duplicates = _insert_unique(db, valid)
+    if accepted:
+        # One event per chunk: executemany does not report the ids.
+        record("patient.import", None, inserted=len(accepted))
+    return len(accepted), rejected + duplicates
+
+
+def import_patients(
+    db: Session,
+    lines: Iterable[str],
+    source_format: str = "csv",
+    chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """Import patients from CSV or NDJSON lines; returns a dict shaped like
+    PatientImportReport. Every chunk is committed on its own, so rows
+    before a failure stay imported."""
+    report = {"inserted": 0, "rejected": 0, "errors": [], "errors_truncated": False}
+
+    def reject(errors: list[tuple[int, str]]) -> None:
+        report["rejected"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(report["errors"])
+        report["errors"].extend(
+            {"line": line, "error": error} for line, error in errors[:room]
+        )
+        report["errors_truncated"] |= len(errors) > room
+
+    def flush(chunk: list[tuple[int, dict]]) -> None:
+        inserted, errors = _import_chunk(db, chunk)
+        report["inserted"] += inserted
+        reject(errors)
+
+    chunk = []
+    for line, row in PARSERS[source_format](lines):
+        if isinstance(row, str):
+            reject([(line, row)])
+            continue
+        chunk.append((line, row))
+        if len(chunk) == chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    report["errors"].sort(key=lambda error: error["line"])
+    return report
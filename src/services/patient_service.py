@@ -1,21 +1,51 @@
 """Service layer for patient-related operations."""
 
+import re
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, func, not_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from src.models.patient import Patient
-from src.schemas.patient import PatientCreate
+from src.audit import record, record_async
+from src.cache import patient_cache
+from src.invalidation import invalidate
+from src.models.patient import Patient, normalize_phone
+from src.schemas.patient import PatientCreate, PatientRead
+from src.serialization import columns
+from src.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Fewer digits than this search names, not phone numbers
+MIN_PHONE_DIGITS = 3
+
+
+def _duplicate_error(exc: IntegrityError) -> HTTPException:
+    """Map a unique-constraint violation on email/phone to a 400."""
+    field = "Phone" if "phone" in str(exc.orig).lower() else "Email"
+    return HTTPException(status_code=400, detail=f"{field} already exists")
 
 
 def create_patient(db: Session, patient: PatientCreate) -> Patient:
     """Create a new patient record in the database."""
-    existing = db.query(Patient).filter(Patient.email == patient.email).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already exists")
-
-    new_patient = Patient(**patient.dict())
+    new_patient = Patient(**patient.model_dump())
     db.add(new_patient)
-    db.commit()
-    db.refresh(new_patient)
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise _duplicate_error(exc) from exc
+    invalidate("patient", new_patient.id)
+    record("patient.create", new_patient.id)
     return new_patient
 
 
@@ -25,3 +55,142 @@ def get_patient(db: Session, patient_id: int) -> Patient:
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     return patient
+
+
+def _cache_record(patient: Patient, token: int) -> dict:
+    record = PatientRead.model_validate(patient, from_attributes=True).model_dump()
+    patient_cache.set(patient.id, record, token)
+    return record
+
+
+def get_patient_cached(db: Session, patient_id: int) -> dict:
+    """Patient as a PatientRead-shaped dict, read through patient_cache."""
+    record = patient_cache.get(patient_id)
+    if record is None:
+        token = patient_cache.token()
+        record = _cache_record(get_patient(db, patient_id), token)
+    return record
+
+
+def _patients_after(cursor: str | None):
+    statement = select(*columns(PatientRead, Patient)).order_by(Patient.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        statement = statement.where(Patient.id > last_id)
+    return statement
+
+
+def page_patients(
+    db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None
+) -> tuple[list[dict], str | None]:
+    """One keyset page of patients by id (PatientRead-shaped dicts) and the
+    cursor of the next page."""
+    statement = _patients_after(cursor).limit(limit + 1)
+    rows, more = split_page(
+        [dict(row) for row in db.execute(statement).mappings()], limit
+    )
+    return rows, encode_cursor(rows[-1]["id"]) if more else None
+
+
+def iter_patients(db: Session, cursor: str | None = None, batch_size: int = 500):
+    """Yield all patients by id as dicts, streamed in batches of batch_size."""
+    statement = _patients_after(cursor).execution_options(yield_per=batch_size)
+    for row in db.execute(statement).mappings():
+        yield dict(row)
+
+
+def _prefix(column, prefix: str):
+    """column starts with prefix, as a range the column's index can scan."""
+    return and_(column >= prefix, column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+def _search_tiers(q: str) -> list[tuple]:
+    """(condition, order) per rank tier, best first. Each tier is served by
+    one index in its order, so every tier is a bounded range scan."""
+    last, first = func.lower(Patient.last_name), func.lower(Patient.first_name)
+    by_last, by_first = (last, first, Patient.id), (first, last, Patient.id)
+    if "@" in q:
+        email = func.lower(Patient.email)
+        return [(_prefix(email, q.lower()), (email,))]
+    digits = normalize_phone(q)
+    if len(digits) >= MIN_PHONE_DIGITS and not re.search(r"[^\d\s()+.-]", q):
+        return [
+            (_prefix(Patient.phone_normalized, digits), (Patient.phone_normalized,))
+        ]
+    words = [word for word in re.split(r"[\s,]+", q.lower()) if word]
+    if not words:
+        return []
+    if len(words) >= 2:
+        # "First Last" (and "Last, First"); extra words join the last name.
+        head, tail = words[0], " ".join(words[1:])
+        return [
+            (and_(_prefix(last, tail), _prefix(first, head)), by_last),
+            (and_(_prefix(last, head), _prefix(first, tail)), by_last),
+        ]
+    (word,) = words
+    return [
+        (_prefix(last, word), by_last),
+        (and_(_prefix(first, word), not_(_prefix(last, word))), by_first),
+    ]
+
+
+def search_patients(
+    db: Session, q: str, limit: int = DEFAULT_SEARCH_LIMIT
+) -> list[dict]:
+    """Patients matching q, best first (PatientRead-shaped dicts).
+
+    q is an email prefix when it has an @, a phone number prefix (digits
+    only, punctuation ignored) when it is all digits, otherwise a last or
+    first name prefix, or "first last" prefixes. Matching is
+    case-insensitive; last-name matches rank above first-name matches and
+    exact names above longer ones.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is empty")
+    results: list[dict] = []
+    seen: set[int] = set()
+    for condition, order in _search_tiers(q.strip()):
+        statement = (
+            select(*columns(PatientRead, Patient))
+            .where(condition)
+            .order_by(*order)
+            .limit(limit)
+        )
+        for row in db.execute(statement).mappings():
+            if row["id"] not in seen and len(results) < limit:
+                seen.add(row["id"])
+                results.append(dict(row))
+        if len(results) == limit:
+            break
+    return results
+
+
+async def create_patient_async(db: "AsyncSession", patient: PatientCreate) -> Patient:
+    """Async variant of create_patient."""
+    new_patient = Patient(**patient.model_dump())
+    db.add(new_patient)
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise _duplicate_error(exc) from exc
+    invalidate("patient", new_patient.id)
+    await record_async("patient.create", new_patient.id)
+    return new_patient
+
+
+async def get_patient_async(db: "AsyncSession", patient_id: int) -> Patient:
+    """Async variant of get_patient."""
+    patient = await db.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return patient
+
+
+async def get_patient_cached_async(db: "AsyncSession", patient_id: int) -> dict:
+    """Async variant of get_patient_cached."""
+    record = patient_cache.get(patient_id)
+    if record is None:
+        token = patient_cache.token()
+        record = _cache_record(await get_patient_async(db, patient_id), token)
+    return record
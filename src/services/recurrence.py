@@ -0,0 +1,130 @@
+"""Arithmetic over recurring appointment series.
+
+A series is ``count`` occurrences of one slot, ``period`` apart. Nothing
+here materializes a series: overlap with an interval is answered from the
+range of occurrence numbers that could touch it (O(1)), and occurrences are
+generated lazily, only for the window being read.
+"""
+
+import heapq
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from math import ceil, floor
+
+from sqlalchemy import select
+
+from src.models.appointment import AppointmentSeries
+from src.services.booking_rules import as_utc
+
+PERIODS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+
+@dataclass
+class Recurrence:
+    """One series' rule; times are epoch seconds unless noted."""
+
+    series_id: int | None
+    patient_id: int
+    doctor_id: int
+    origin: datetime  # first occurrence, as stored (naive or aware)
+    duration_minutes: int
+    period: timedelta
+    count: int
+    start: float = field(init=False)
+    step: float = field(init=False)
+    length: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.start = as_utc(self.origin).timestamp()
+        self.step = self.period.total_seconds()
+        self.length = self.duration_minutes * 60.0
+
+    @classmethod
+    def of(cls, series) -> "Recurrence":
+        """From an AppointmentSeries (or a row with its column names)."""
+        return cls(
+            series.id,
+            series.patient_id,
+            series.doctor_id,
+            series.start_time,
+            series.duration_minutes,
+            PERIODS[series.frequency] * series.interval,
+            series.count,
+        )
+
+    @property
+    def end(self) -> float:
+        """End of the last occurrence."""
+        return self.start + (self.count - 1) * self.step + self.length
+
+    def _numbers(self, low: float, high: float, strict: bool) -> range:
+        """Numbers k of the occurrences starting in [low, high), or in
+        (low, high) when strict."""
+        offset = (low - self.start) / self.step
+        first = floor(offset) + 1 if strict else ceil(offset)
+        last = ceil((high - self.start) / self.step) - 1
+        return range(max(first, 0), min(last, self.count - 1) + 1)
+
+    def _overlapping(self, start: float, end: float) -> range:
+        # [start_k, start_k + length) overlaps [start, end) iff
+        # start - length < start_k < end.
+        return self._numbers(start - self.length, end, strict=True)
+
+    def overlaps(self, start: float, end: float) -> bool:
+        """Whether any occurrence overlaps [start, end)."""
+        return len(self._overlapping(start, end)) > 0
+
+    def occurrences(self, start: float, end: float) -> Iterator[tuple[float, float]]:
+        """(start, end) of the occurrences overlapping [start, end), in order."""
+        for k in self._overlapping(start, end):
+            begin = self.start + k * self.step
+            yield begin, begin + self.length
+
+    def conflicts(self, other: "Recurrence") -> bool:
+        """Whether an occurrence of this series overlaps one of ``other``;
+        only this series' occurrences within other's span are generated."""
+        return any(
+            other.overlaps(start, end)
+            for start, end in self.occurrences(other.start, other.end)
+        )
+
+    def rows(self, start: float, end: float) -> Iterator[dict]:
+        """Occurrences starting in [start, end) as listing rows (shaped like
+        ScheduledAppointment), their times of the same kind as ``origin``."""
+        for k in self._numbers(start, end, strict=False):
+            yield {
+                "id": None,
+                "patient_id": self.patient_id,
+                "doctor_id": self.doctor_id,
+                "start_time": self.origin + k * self.period,
+                "duration_minutes": self.duration_minutes,
+                "series_id": self.series_id,
+            }
+
+
+def series_statement(start: datetime, end: datetime, doctor_ids=None):
+    """Series with an occurrence possibly overlapping [start, end), optionally
+    of some doctors only: a range scan on (doctor_id, ends_at)."""
+    statement = select(AppointmentSeries).where(
+        AppointmentSeries.ends_at > start, AppointmentSeries.start_time < end
+    )
+    if doctor_ids is not None:
+        statement = statement.where(AppointmentSeries.doctor_id.in_(doctor_ids))
+    return statement
+
+
+def listing_key(row) -> tuple[float, int]:
+    """Sort key of listing rows: (start, id), occurrences keyed by
+    -series_id so they order (and page) consistently with stored rows."""
+    series_id = row.get("series_id")
+    key = -series_id if series_id else row["id"]
+    return as_utc(row["start_time"]).timestamp(), key
+
+
+def occurrence_rows(
+    recurrences: Iterable[Recurrence], start: float, end: float
+) -> Iterator[dict]:
+    """Listing rows of every occurrence starting in [start, end), merged
+    lazily in listing_key order."""
+    return heapq.merge(*(r.rows(start, end) for r in recurrences), key=listing_key)
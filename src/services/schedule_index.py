@@ -0,0 +1,267 @@
+"""Process-local per-doctor schedule index for appointment conflict checks."""
+
+import heapq
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.appointment import Appointment, AppointmentSeries
+from src.services.booking_rules import MAX_DURATION_MINUTES, as_utc
+from src.services.recurrence import Recurrence
+
+
+class ScheduleIndex:
+    """Sorted upcoming [start, end) intervals per doctor, as epoch seconds.
+
+    Bookings never overlap, so for each doctor the intervals are disjoint and
+    sorted by start, which makes the overlap test two bisects. Recurring
+    series are kept as rules next to the intervals and never expanded: they
+    are tested arithmetically and generate occurrences only for the window
+    being searched. The index is a fast path only: a miss is always confirmed
+    against the database before commit, and a doctor whose index disagrees
+    with the database is reloaded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._starts: dict[int, list[float]] = {}
+        self._ends: dict[int, list[float]] = {}
+        self._series: dict[int, list[Recurrence]] = {}
+        self._complete = False
+
+    @staticmethod
+    def _horizon() -> datetime:
+        """Earliest start that can still overlap a booking made from now on."""
+        return datetime.now(timezone.utc) - timedelta(minutes=MAX_DURATION_MINUTES)
+
+    def _store(self, doctor_id: int, rows, series=()) -> None:
+        intervals = sorted(
+            (as_utc(start_time).timestamp(), duration * 60)
+            for start_time, duration in rows
+        )
+        self._starts[doctor_id] = [start for start, _ in intervals]
+        self._ends[doctor_id] = [start + length for start, length in intervals]
+        self._series[doctor_id] = [Recurrence.of(s) for s in series]
+
+    def _warm_statement(self):
+        return select(
+            Appointment.doctor_id,
+            Appointment.start_time,
+            Appointment.duration_minutes,
+        ).where(Appointment.start_time > self._horizon())
+
+    def _series_statement(self):
+        """Series with occurrences that can still overlap a new booking."""
+        return select(AppointmentSeries).where(
+            AppointmentSeries.ends_at > self._horizon()
+        )
+
+    @staticmethod
+    def _by_doctor(rows, series, doctor_ids=()) -> dict[int, tuple[list, list]]:
+        by_doctor: dict[int, tuple[list, list]] = {
+            doctor_id: ([], []) for doctor_id in doctor_ids
+        }
+        for doctor_id, start_time, duration in rows:
+            by_doctor.setdefault(doctor_id, ([], []))[0].append((start_time, duration))
+        for one in series:
+            by_doctor.setdefault(one.doctor_id, ([], []))[1].append(one)
+        return by_doctor
+
+    def _replace_all(self, rows, series) -> None:
+        by_doctor = self._by_doctor(rows, series)
+        with self._lock:
+            self._starts.clear()
+            self._ends.clear()
+            self._series.clear()
+            for doctor_id, (doctor_rows, doctor_series) in by_doctor.items():
+                self._store(doctor_id, doctor_rows, doctor_series)
+            self._complete = True
+
+    def warm(self, db: Session) -> None:
+        """Load the upcoming schedule of every doctor (two queries)."""
+        rows = db.execute(self._warm_statement()).all()
+        self._replace_all(rows, db.scalars(self._series_statement()))
+
+    async def warm_async(self, db: "AsyncSession") -> None:
+        """Async variant of warm()."""
+        rows = (await db.execute(self._warm_statement())).all()
+        self._replace_all(rows, await db.scalars(self._series_statement()))
+
+    def _is_loaded(self, doctor_id: int) -> bool:
+        with self._lock:
+            return self._complete or doctor_id in self._starts
+
+    def _load_statement(self, doctor_id: int):
+        return select(Appointment.start_time, Appointment.duration_minutes).where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.start_time > self._horizon(),
+        )
+
+    def _load(self, doctor_id: int, rows, series) -> None:
+        with self._lock:
+            self._store(doctor_id, rows, series)
+
+    def _doctor_series_statement(self, doctor_id: int):
+        return self._series_statement().where(AppointmentSeries.doctor_id == doctor_id)
+
+    def _load_doctor(self, db: Session, doctor_id: int) -> None:
+        rows = db.execute(self._load_statement(doctor_id)).all()
+        series = db.scalars(self._doctor_series_statement(doctor_id)).all()
+        self._load(doctor_id, rows, series)
+
+    def _contains(
+        self, doctor_id: int, start_time: datetime, duration_minutes: int
+    ) -> bool:
+        start = as_utc(start_time).timestamp()
+        end = start + duration_minutes * 60
+        with self._lock:
+            starts = self._starts.get(doctor_id, [])
+            # The last interval starting before `end` has the latest end of all
+            # intervals that could overlap, since the intervals are disjoint.
+            i = bisect_left(starts, end)
+            if i > 0 and self._ends[doctor_id][i - 1] > start:
+                return True
+            return any(
+                series.overlaps(start, end)
+                for series in self._series.get(doctor_id, ())
+            )
+
+    def overlaps(
+        self, db: Session, doctor_id: int, start_time: datetime, duration_minutes: int
+    ) -> bool:
+        """Return True if [start, start + duration) overlaps an indexed booking
+        or an occurrence of an indexed series."""
+        if not self._is_loaded(doctor_id):
+            self._load_doctor(db, doctor_id)
+        return self._contains(doctor_id, start_time, duration_minutes)
+
+    async def overlaps_async(
+        self,
+        db: "AsyncSession",
+        doctor_id: int,
+        start_time: datetime,
+        duration_minutes: int,
+    ) -> bool:
+        """Async variant of overlaps()."""
+        if not self._is_loaded(doctor_id):
+            rows = (await db.execute(self._load_statement(doctor_id))).all()
+            series = await db.scalars(self._doctor_series_statement(doctor_id))
+            self._load(doctor_id, rows, series.all())
+        return self._contains(doctor_id, start_time, duration_minutes)
+
+    def load_many(self, db: Session, doctor_ids) -> None:
+        """Load every doctor in doctor_ids that is not indexed yet, in two
+        queries (bookings and series)."""
+        with self._lock:
+            if self._complete:
+                return
+            missing = [d for d in doctor_ids if d not in self._starts]
+        if not missing:
+            return
+        rows = db.execute(
+            self._warm_statement().where(Appointment.doctor_id.in_(missing))
+        ).all()
+        series = db.scalars(
+            self._series_statement().where(AppointmentSeries.doctor_id.in_(missing))
+        )
+        by_doctor = self._by_doctor(rows, series, missing)
+        with self._lock:
+            for doctor_id, (doctor_rows, doctor_series) in by_doctor.items():
+                self._store(doctor_id, doctor_rows, doctor_series)
+
+    def free_windows(
+        self,
+        db: Session,
+        doctor_id: int,
+        window_start: datetime,
+        window_end: datetime,
+        min_minutes: int,
+    ) -> list[tuple[datetime, datetime]]:
+        """Gaps of at least min_minutes between bookings (and occurrences of
+        series) inside the window."""
+        if not self._is_loaded(doctor_id):
+            self._load_doctor(db, doctor_id)
+        cursor = as_utc(window_start).timestamp()
+        stop = as_utc(window_end).timestamp()
+        min_length = min_minutes * 60
+
+        gaps = []
+        with self._lock:
+            starts = self._starts.get(doctor_id, [])
+            ends = self._ends.get(doctor_id, [])
+            # Disjoint intervals have sorted ends too: skip those already over.
+            i = bisect_right(ends, cursor)
+            j = bisect_left(starts, stop, lo=i)
+            # Series occurrences are generated for this window only; all of
+            # them are disjoint from each other and from the bookings.
+            busy = heapq.merge(
+                zip(starts[i:j], ends[i:j]),
+                *(
+                    series.occurrences(cursor, stop)
+                    for series in self._series.get(doctor_id, ())
+                ),
+            )
+            for busy_start, busy_end in busy:
+                if busy_start - cursor >= min_length:
+                    gaps.append((cursor, busy_start))
+                cursor = max(cursor, busy_end)
+        if stop - cursor >= min_length:
+            gaps.append((cursor, stop))
+
+        return [
+            (
+                datetime.fromtimestamp(start, timezone.utc),
+                datetime.fromtimestamp(end, timezone.utc),
+            )
+            for start, end in gaps
+        ]
+
+    def add(self, doctor_id: int, start_time: datetime, duration_minutes: int) -> None:
+        """Record a committed booking."""
+        start = as_utc(start_time).timestamp()
+        end = start + duration_minutes * 60
+        with self._lock:
+            if not self._complete and doctor_id not in self._starts:
+                # Not loaded yet; the first lookup will read it from the DB.
+                return
+            starts = self._starts.setdefault(doctor_id, [])
+            ends = self._ends.setdefault(doctor_id, [])
+            i = bisect_left(starts, start)
+            starts.insert(i, start)
+            ends.insert(i, end)
+
+    def add_series(self, series: Recurrence) -> None:
+        """Record a committed series."""
+        with self._lock:
+            if not self._complete and series.doctor_id not in self._starts:
+                return
+            self._starts.setdefault(series.doctor_id, [])
+            self._ends.setdefault(series.doctor_id, [])
+            self._series.setdefault(series.doctor_id, []).append(series)
+
+    def invalidate(self, doctor_id: int) -> None:
+        """Drop a doctor's intervals so the next lookup reloads them."""
+        with self._lock:
+            self._starts.pop(doctor_id, None)
+            self._ends.pop(doctor_id, None)
+            self._series.pop(doctor_id, None)
+            self._complete = False
+
+    def clear(self) -> None:
+        """Forget everything (e.g. after the tables were recreated)."""
+        with self._lock:
+            self._starts.clear()
+            self._ends.clear()
+            self._series.clear()
+            self._complete = False
+
+
+# Shared by the API handlers and the service layer.
+schedule_index = ScheduleIndex()
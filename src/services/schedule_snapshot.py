@@ -0,0 +1,184 @@
+"""Compact read-only snapshot of one day's schedule for dashboards.
+
+The day's appointments and series occurrences are held as parallel typed
+arrays sorted by (doctor_id, start, id): int64 ids, int32 doctor and patient
+ids, int64 epoch-second starts and int16 durations, 26 bytes per
+appointment against well over a kilobyte for an ORM Appointment with its
+instance state. Occurrences are stored with id -series_id, as in listing
+keys.
+
+The snapshot is rebuilt incrementally. Writes publish "schedule"
+invalidations for the (doctor, day) they touch, here and in every other
+worker, and that marks the doctor stale. The next read reloads only the
+stale doctors' rows (one indexed query) and splices them into the arrays. A
+new day is loaded whole.
+"""
+
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date as Date, datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.appointment import Appointment
+from src.services.booking_rules import as_utc
+from src.services.recurrence import Recurrence, series_statement
+
+# Column name and array typecode, in row order
+COLUMNS = (
+    ("id", "q"),
+    ("doctor_id", "i"),
+    ("patient_id", "i"),
+    ("start", "q"),
+    ("duration_minutes", "h"),
+)
+# Rows fetched per round trip while loading
+LOAD_BATCH_SIZE = 1000
+
+
+def _empty() -> dict[str, array]:
+    return {name: array(typecode) for name, typecode in COLUMNS}
+
+
+def _sort_key(row: tuple) -> tuple:
+    return row[1], row[3], row[0]
+
+
+class ScheduleSnapshot:
+    """One UTC day of the schedule as typed columns."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._day: Date | None = None
+        self._loading: Date | None = None
+        self._stale: set[int] = set()
+        self._columns = _empty()
+
+    def _load(self, db: Session, day: Date, doctor_ids=None) -> dict[str, array]:
+        """Columns of the day's rows (of some doctors only), in snapshot order."""
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        occurrences = []
+        for series in db.scalars(series_statement(start, end, doctor_ids)):
+            recurrence = Recurrence.of(series)
+            occurrences.extend(
+                (
+                    -recurrence.series_id,
+                    recurrence.doctor_id,
+                    recurrence.patient_id,
+                    int(as_utc(row["start_time"]).timestamp()),
+                    recurrence.duration_minutes,
+                )
+                for row in recurrence.rows(start.timestamp(), end.timestamp())
+            )
+        occurrences.sort(key=_sort_key)
+
+        statement = (
+            select(
+                Appointment.id,
+                Appointment.doctor_id,
+                Appointment.patient_id,
+                Appointment.start_time,
+                Appointment.duration_minutes,
+            )
+            .where(Appointment.start_time >= start, Appointment.start_time < end)
+            .order_by(Appointment.doctor_id, Appointment.start_time, Appointment.id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        if doctor_ids is not None:
+            statement = statement.where(Appointment.doctor_id.in_(doctor_ids))
+        stored = (
+            (id_, doctor_id, patient_id, int(as_utc(start_time).timestamp()), minutes)
+            for id_, doctor_id, patient_id, start_time, minutes in db.execute(statement)
+        )
+
+        # Appended row by row, so loading never holds the day as objects.
+        columns = _empty()
+        appenders = [column.append for column in columns.values()]
+        for row in heapq.merge(stored, occurrences, key=_sort_key):
+            for append, value in zip(appenders, row):
+                append(value)
+        return columns
+
+    def _splice(self, fresh: dict[str, array], doctor_ids) -> None:
+        """Replace the doctors' rows with theirs from ``fresh``."""
+        current = self._columns["doctor_id"]
+        loaded = fresh["doctor_id"]
+        for doctor_id in sorted(doctor_ids):
+            lo, hi = bisect_left(current, doctor_id), bisect_right(current, doctor_id)
+            new_lo = bisect_left(loaded, doctor_id)
+            new_hi = bisect_right(loaded, doctor_id)
+            for name, _ in COLUMNS:
+                self._columns[name][lo:hi] = fresh[name][new_lo:new_hi]
+
+    def _refresh(self, db: Session, day: Date) -> None:
+        with self._lock:
+            if self._day == day:
+                stale, self._stale = self._stale, set()
+            else:
+                # Invalidations arriving during the load apply on the next read.
+                stale, self._loading, self._stale = None, day, set()
+        if stale is None:
+            fresh = self._load(db, day)
+            with self._lock:
+                self._day, self._columns, self._loading = day, fresh, None
+        elif stale:
+            fresh = self._load(db, day, sorted(stale))
+            with self._lock:
+                if self._day == day:
+                    self._splice(fresh, stale)
+
+    def rows(
+        self, db: Session, day: Date | None = None, doctor_id: int | None = None
+    ) -> list[dict]:
+        """The day's rows (today's by default, UTC), optionally one doctor's,
+        as ScheduledAppointment-shaped dicts in (doctor_id, start) order."""
+        day = day or datetime.now(timezone.utc).date()
+        self._refresh(db, day)
+        with self._lock:
+            columns = self._columns
+            lo, hi = 0, len(columns["id"])
+            if doctor_id is not None:
+                lo = bisect_left(columns["doctor_id"], doctor_id)
+                hi = bisect_right(columns["doctor_id"], doctor_id)
+            sliced = [columns[name][lo:hi] for name, _ in COLUMNS]
+        return [
+            {
+                "id": id_ if id_ > 0 else None,
+                "patient_id": patient_id,
+                "doctor_id": doctor,
+                "start_time": datetime.fromtimestamp(start, timezone.utc),
+                "duration_minutes": minutes,
+                "series_id": -id_ if id_ < 0 else None,
+            }
+            for id_, doctor, patient_id, start, minutes in zip(*sliced)
+        ]
+
+    def invalidate(self, doctor_id: int, day: Date) -> None:
+        """Mark a doctor's rows of ``day`` for reloading on the next read."""
+        with self._lock:
+            if day in (self._day, self._loading):
+                self._stale.add(doctor_id)
+
+    def stats(self) -> dict:
+        """Rows held and the bytes of their columns."""
+        with self._lock:
+            columns = self._columns.values()
+            return {
+                "rows": len(self._columns["id"]),
+                "bytes": sum(len(column) * column.itemsize for column in columns),
+            }
+
+    def clear(self) -> None:
+        """Forget the snapshot (e.g. after the tables were recreated)."""
+        with self._lock:
+            self._day = self._loading = None
+            self._stale = set()
+            self._columns = _empty()
+
+
+# Shared by the API handlers; kept current through the "schedule" topic.
+schedule_snapshot = ScheduleSnapshot()
@@ -0,0 +1,138 @@
+"""Recurring appointment series.
+
+A series is stored once, as its rule, and never expanded into rows: booking
+one checks each stored appointment and each other series of the doctor
+against the rule arithmetically (see recurrence.Recurrence), and readers
+expand occurrences only for the window they list.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.audit import record
+from src.invalidation import invalidate
+from src.models.appointment import Appointment, AppointmentSeries
+from src.schemas.appointment import AppointmentSeriesCreate
+from src.services.appointment_service import (
+    BOOKING_ATTEMPTS,
+    BOOKING_RETRY_DELAY_SECONDS,
+    CONFLICT_DETAIL,
+    lock_doctor_schedules,
+)
+from src.services.booking_rules import (
+    MAX_DURATION_MINUTES,
+    as_utc,
+    check_booking_rules,
+)
+from src.services.recurrence import PERIODS, Recurrence, series_statement
+from src.services.schedule_index import schedule_index
+
+# Occurrences per series (a year of daily visits)
+MAX_SERIES_OCCURRENCES = 366
+
+
+def _new_series(series: AppointmentSeriesCreate) -> AppointmentSeries:
+    start_time = as_utc(series.start_time)
+    last_start = (
+        start_time + (series.count - 1) * series.interval * PERIODS[series.frequency]
+    )
+    return AppointmentSeries(
+        **series.model_dump(exclude={"start_time"}),
+        start_time=start_time,
+        ends_at=last_start + timedelta(minutes=series.duration_minutes),
+    )
+
+
+def _has_conflict(db: Session, new: AppointmentSeries) -> bool:
+    """Whether an occurrence of the new series overlaps a stored appointment
+    or an occurrence of another of the doctor's series."""
+    recurrence = Recurrence.of(new)
+    lookback = new.start_time - timedelta(minutes=MAX_DURATION_MINUTES)
+    booked = db.execute(
+        select(Appointment.start_time, Appointment.duration_minutes).where(
+            Appointment.doctor_id == new.doctor_id,
+            Appointment.start_time > lookback,
+            Appointment.start_time < new.ends_at,
+        )
+    )
+    for start_time, duration in booked:
+        start = as_utc(start_time).timestamp()
+        if recurrence.overlaps(start, start + duration * 60):
+            return True
+    others = db.scalars(series_statement(new.start_time, new.ends_at, [new.doctor_id]))
+    return any(recurrence.conflicts(Recurrence.of(other)) for other in others)
+
+
+def _book(db: Session, series: AppointmentSeriesCreate) -> AppointmentSeries:
+    lock_doctor_schedules(db, [series.doctor_id])
+    new_series = _new_series(series)
+    if _has_conflict(db, new_series):
+        db.rollback()
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    db.add(new_series)
+    db.commit()
+    return new_series
+
+
+def _schedule_keys(recurrence: Recurrence) -> list[tuple]:
+    """schedule_cache keys of every day with an occurrence."""
+    days = {
+        datetime.fromtimestamp(start, timezone.utc).date()
+        for start, _ in recurrence.occurrences(recurrence.start, recurrence.end)
+    }
+    doctor_id = recurrence.doctor_id
+    return [key for day in sorted(days) for key in ((doctor_id, day), (None, day))]
+
+
+def create_series(db: Session, series: AppointmentSeriesCreate) -> AppointmentSeries:
+    """Book a recurring series if none of its occurrences conflicts.
+
+    Like create_appointment, the check and the insert run under
+    lock_doctor_schedules and lock timeouts are retried with backoff.
+    """
+    check_booking_rules(series.start_time, series.duration_minutes)
+    if series.count > MAX_SERIES_OCCURRENCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A series has at most {MAX_SERIES_OCCURRENCES} occurrences",
+        )
+
+    for attempt in range(BOOKING_ATTEMPTS):
+        try:
+            new_series = _book(db, series)
+            break
+        except OperationalError:
+            db.rollback()
+            if attempt == BOOKING_ATTEMPTS - 1:
+                raise
+            time.sleep(BOOKING_RETRY_DELAY_SECONDS * 2**attempt)
+
+    recurrence = Recurrence.of(new_series)
+    schedule_index.add_series(recurrence)
+    invalidate("schedule", *_schedule_keys(recurrence))
+    record(
+        "series.book",
+        recurrence.series_id,
+        patient_id=recurrence.patient_id,
+        doctor_id=recurrence.doctor_id,
+        start_time=as_utc(series.start_time).isoformat(),
+        duration_minutes=series.duration_minutes,
+        frequency=series.frequency,
+        interval=series.interval,
+        count=series.count,
+    )
+    return new_series
+
+
+def get_series(db: Session, series_id: int) -> AppointmentSeries:
+    """Return a series or raise 404."""
+    series = db.get(AppointmentSeries, series_id)
+    if series is None:
+        raise HTTPException(status_code=404, detail="Series not found")
+    return series
@@ -0,0 +1,365 @@
+"""Utilization reports: booked time, gaps and peak hours over a date range.
+
+Every report is built from one aggregate per doctor and UTC day (count,
+booked minutes, first start and last end, hence the gaps) and the booked
+minutes per UTC hour of the day. With NumPy installed (the ``analytics``
+extra) both come from a single columnar read of (doctor_id, start epoch,
+duration) integers that NumPy groups and splits into hours; over a large
+range that beats SQL's GROUP BY, which sorts every row. Without NumPy they
+come from two GROUP BY statements, one per doctor and day and one per
+(minute of day, duration) slot, whose few rows are split in Python.
+
+Reports are cached under the doctor's version in utilization_cache (the
+department reports under the all-doctors one), which bookings bump.
+"""
+
+import itertools
+import sqlite3
+from datetime import date, datetime, time, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import Integer, func, literal_column, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from src.cache import utilization_cache
+from src.models.doctor import Doctor
+from src.services.archive_service import appointments_source
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - exercised when numpy is absent
+    numpy = None
+
+# Longest range a single report may cover
+MAX_REPORT_DAYS = 366
+# Hours listed in peak_hours
+PEAK_HOURS = 3
+
+EPOCH = date(1970, 1, 1)
+SECONDS_PER_DAY = 86_400
+# Inlined rather than bound: MySQL only matches GROUP BY expressions with the
+# select list when they are written identically.
+_DAY = literal_column(str(SECONDS_PER_DAY), Integer)
+_MINUTE = literal_column("60", Integer)
+
+
+class epoch_seconds(FunctionElement):  # pylint: disable=invalid-name
+    """Seconds since 1970-01-01 of a (naive UTC) DATETIME expression."""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(epoch_seconds)
+def _epoch_seconds(element, compiler, **kw):
+    value = compiler.process(element.clauses, **kw)
+    return f"CAST(EXTRACT(EPOCH FROM {value}) AS BIGINT)"
+
+
+@compiles(epoch_seconds, "sqlite")
+def _epoch_seconds_sqlite(element, compiler, **kw):
+    value = compiler.process(element.clauses, **kw)
+    if sqlite3.sqlite_version_info >= (3, 38):
+        return f"unixepoch({value})"  # about twice as fast as strftime()
+    return f"CAST(strftime('%s', {value}) AS INTEGER)"
+
+
+@compiles(epoch_seconds, "mysql")
+def _epoch_seconds_mysql(element, compiler, **kw):
+    # Not UNIX_TIMESTAMP(), which reads the value in the session time zone.
+    value = compiler.process(element.clauses, **kw)
+    return f"TIMESTAMPDIFF(SECOND, '1970-01-01', {value})"
+
+
+def _report_range(start_date: date, end_date: date) -> tuple[datetime, datetime]:
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (end_date - start_date).days >= MAX_REPORT_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Reports are limited to {MAX_REPORT_DAYS} days"
+        )
+    start = datetime.combine(start_date, time(), timezone.utc)
+    return start, start + timedelta(days=(end_date - start_date).days + 1)
+
+
+def _scoped(statement, source, start, end, doctor_id, specialization):
+    """Restrict a statement over ``source`` to appointments starting in
+    [start, end) of one doctor or of one specialization."""
+    statement = statement.where(source.start_time >= start, source.start_time < end)
+    if doctor_id is not None:
+        return statement.where(source.doctor_id == doctor_id)
+    if specialization:
+        in_department = select(Doctor.id).where(Doctor.specialization == specialization)
+        return statement.where(source.doctor_id.in_(in_department))
+    return statement
+
+
+def _add_hours(hours: list[int], minute: int, duration: int, count: int) -> None:
+    """Spread ``count`` appointments of ``duration`` minutes starting at
+    ``minute`` of the day over the 24 hourly totals."""
+    end = minute + duration
+    hour = minute // 60
+    while hour * 60 < end:
+        hours[hour % 24] += (min(end, hour * 60 + 60) - max(minute, hour * 60)) * count
+        hour += 1
+
+
+def _sql_aggregates(db: Session, start, end, doctor_id, specialization) -> dict:
+    source = appointments_source(start)
+    began = epoch_seconds(source.start_time)
+    day = began // _DAY
+    minute = began % _DAY // _MINUTE
+    if doctor_id is not None:
+        group, keys = source.doctor_id, [source.doctor_id]
+    else:
+        group, keys = Doctor.specialization, [Doctor.specialization, source.doctor_id]
+
+    daily = select(
+        group,
+        source.doctor_id,
+        day,
+        func.count(),
+        func.sum(source.duration_minutes),
+        func.max(began + source.duration_minutes * 60) - func.min(began),
+    ).group_by(*keys, day)
+    slots = select(group, minute, source.duration_minutes, func.count()).group_by(
+        group, minute, source.duration_minutes
+    )
+    if doctor_id is None:
+        daily = daily.join(Doctor, Doctor.id == source.doctor_id)
+        slots = slots.join(Doctor, Doctor.id == source.doctor_id)
+
+    groups: dict = {}
+    for name, doctor, *row in db.execute(
+        _scoped(daily, source, start, end, doctor_id, specialization)
+    ):
+        # int(): MySQL returns SUM() and FLOOR() as Decimal.
+        daily_rows, doctors, _ = groups.setdefault(name, ([], set(), [0] * 24))
+        daily_rows.append(tuple(map(int, row)))
+        doctors.add(doctor)
+    for name, *row in db.execute(
+        _scoped(slots, source, start, end, doctor_id, specialization)
+    ):
+        _add_hours(groups[name][2], *map(int, row))
+    return {
+        name: (daily_rows, len(doctors), hours)
+        for name, (daily_rows, doctors, hours) in groups.items()
+    }
+
+
+def _int_columns(db: Session, statement) -> list:
+    """The columns of an all-integer statement as int64 arrays.
+
+    Rows are read from the DBAPI cursor and flattened into one array: a
+    Row object per record would cost more than the whole aggregation.
+    """
+    result = db.connection().execute(statement)
+    try:
+        rows = result.cursor.fetchall()
+    finally:
+        result.close()
+    width = len(statement.selected_columns)
+    flat = numpy.fromiter(
+        itertools.chain.from_iterable(rows), dtype=numpy.int64, count=len(rows) * width
+    )
+    return list(flat.reshape(-1, width).T)
+
+
+def _hourly_minutes(group, minute, duration, groups: int):
+    """Booked minutes per group and UTC hour of the day, a (groups, 24) array."""
+    hours = numpy.zeros(groups * 24, dtype=numpy.int64)
+    end = minute + duration
+    hour = minute // 60
+    # One pass per hour boundary: add each appointment's share of ``hour``
+    # and keep those that run on into the next hour.
+    while len(hour):
+        share = numpy.minimum(end, hour * 60 + 60) - numpy.maximum(minute, hour * 60)
+        live = share > 0
+        numpy.add.at(hours, group[live] * 24 + hour[live] % 24, share[live])
+        live = end > hour * 60 + 60
+        group, minute, end, hour = group[live], minute[live], end[live], hour[live] + 1
+    return hours.reshape(groups, 24)
+
+
+def _columnar_aggregates(db: Session, start, end, doctor_id, specialization) -> dict:
+    source = appointments_source(start)
+    doctor, began, duration = _int_columns(
+        db,
+        _scoped(
+            select(
+                source.doctor_id,
+                epoch_seconds(source.start_time),
+                source.duration_minutes,
+            ),
+            source,
+            start,
+            end,
+            doctor_id,
+            specialization,
+        ),
+    )
+    if not len(doctor):
+        return {}
+    doctor_ids, doctor_index = numpy.unique(doctor, return_inverse=True)
+    if doctor_id is not None:
+        names, group_of_doctor = [doctor_id], numpy.zeros(1, dtype=numpy.int64)
+    else:
+        departments = dict(
+            db.execute(
+                select(Doctor.id, Doctor.specialization).where(
+                    Doctor.id.in_(doctor_ids.tolist())
+                )
+            ).all()
+        )
+        names = sorted(set(departments.values()))
+        group_of_doctor = numpy.array(
+            [names.index(departments[d]) for d in doctor_ids.tolist()]
+        )
+
+    # The per doctor and day aggregate of the SQL path.
+    day = began // SECONDS_PER_DAY
+    first_day = int(day.min())
+    days = int(day.max()) - first_day + 1
+    keys, key_index = numpy.unique(
+        doctor_index * days + (day - first_day), return_inverse=True
+    )
+    count = numpy.bincount(key_index)
+    booked = numpy.bincount(key_index, weights=duration).astype(numpy.int64)
+    first = numpy.full(len(keys), numpy.iinfo(numpy.int64).max)
+    numpy.minimum.at(first, key_index, began)
+    last = numpy.zeros(len(keys), dtype=numpy.int64)
+    numpy.maximum.at(last, key_index, began + duration * 60)
+    key_group = group_of_doctor[keys // days]
+    key_day = keys % days + first_day
+
+    hourly = _hourly_minutes(
+        group_of_doctor[doctor_index],
+        began % SECONDS_PER_DAY // 60,
+        duration,
+        len(names),
+    )
+    aggregates = {}
+    for index, name in enumerate(names):
+        mine = key_group == index
+        daily_rows = zip(
+            key_day[mine].tolist(),
+            count[mine].tolist(),
+            booked[mine].tolist(),
+            (last - first)[mine].tolist(),
+        )
+        aggregates[name] = (
+            list(daily_rows),
+            int((group_of_doctor == index).sum()),
+            hourly[index].tolist(),
+        )
+    return aggregates
+
+
+def _aggregates(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    doctor_id: int | None = None,
+    specialization: str | None = None,
+) -> dict:
+    """{doctor_id or specialization: (daily rows, doctors, hourly minutes)}
+    for the appointments starting in [start, end). Daily rows are (day
+    number since the epoch, appointments, booked minutes, seconds from the
+    first start to the last end) per doctor and day."""
+    if numpy is not None:
+        return _columnar_aggregates(db, start, end, doctor_id, specialization)
+    return _sql_aggregates(db, start, end, doctor_id, specialization)
+
+
+def _report(daily, hourly, start_date: date, end_date: date, period: str) -> dict:
+    """Assemble a report (shaped like UtilizationReport) from one group's
+    daily rows and hourly minutes."""
+    days: dict[date, list[int]] = {}
+    for day_number, appointments, booked, span in daily:
+        totals = days.setdefault(EPOCH + timedelta(days=day_number), [0, 0, 0])
+        totals[0] += appointments
+        totals[1] += booked
+        # Idle time between the doctor's first and last appointment.
+        totals[2] += max(span // 60 - booked, 0)
+
+    buckets: dict[date, list[int]] = {}
+    for day in sorted(days):
+        start = day - timedelta(days=day.weekday()) if period == "week" else day
+        bucket = buckets.setdefault(start, [0, 0, 0])
+        for i, value in enumerate(days[day]):
+            bucket[i] += value
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "period": period,
+        "appointments": sum(totals[0] for totals in days.values()),
+        "booked_minutes": sum(totals[1] for totals in days.values()),
+        "gap_minutes": sum(totals[2] for totals in days.values()),
+        "busiest_day": max(days, key=lambda day: days[day][1]) if days else None,
+        "peak_hours": sorted(
+            (hour for hour in range(24) if hourly[hour]), key=lambda h: -hourly[h]
+        )[:PEAK_HOURS],
+        "hourly_minutes": hourly,
+        "buckets": [
+            {
+                "start": start,
+                "appointments": appointments,
+                "booked_minutes": booked,
+                "gap_minutes": gap,
+            }
+            for start, (appointments, booked, gap) in buckets.items()
+        ],
+    }
+
+
+def doctor_utilization(
+    db: Session, doctor_id: int, start_date: date, end_date: date, period: str = "day"
+) -> dict:
+    """One doctor's utilization from ``start_date`` to ``end_date`` inclusive,
+    bucketed per day or ISO week. Returns a dict shaped like
+    DoctorUtilization."""
+    start, end = _report_range(start_date, end_date)
+    key = utilization_cache.key(doctor_id, (start_date, end_date, period))
+    cached = utilization_cache.get(key)
+    if cached is not None:
+        return cached
+    if db.get(Doctor, doctor_id) is None:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+
+    daily, _, hourly = _aggregates(db, start, end, doctor_id).get(
+        doctor_id, ([], 0, [0] * 24)
+    )
+    report = _report(daily, hourly, start_date, end_date, period)
+    report["doctor_id"] = doctor_id
+    utilization_cache.set(key, report)
+    return report
+
+
+def department_utilization(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    period: str = "day",
+    specialization: str | None = None,
+) -> list[dict]:
+    """Utilization per Doctor.specialization (or of one), summed over its
+    doctors. Returns dicts shaped like DepartmentUtilization, only for
+    departments with appointments in the range."""
+    start, end = _report_range(start_date, end_date)
+    key = utilization_cache.key(None, (start_date, end_date, period, specialization))
+    cached = utilization_cache.get(key)
+    if cached is not None:
+        return cached
+
+    reports = []
+    aggregates = _aggregates(db, start, end, specialization=specialization)
+    for department, (daily, doctors, hourly) in sorted(aggregates.items()):
+        report = _report(daily, hourly, start_date, end_date, period)
+        report["specialization"] = department
+        report["doctors"] = doctors
+        reports.append(report)
+    utilization_cache.set(key, reports)
+    return reports
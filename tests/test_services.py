@@ -1,19 +1,80 @@
 """Unit tests for patient, doctor, and appointment services."""
 
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
 from pydantic import ValidationError
 from fastapi.testclient import TestClient
 from src.main import app
 
-from src.database import Base, engine, SessionLocal
+from src import audit
+from src.audit import AuditLog, DatabaseSink, SegmentFileSink, audit_log
+from src.cache import (
+    LRUTTLCache,
+    doctor_cache,
+    patient_cache,
+    schedule_cache,
+    utilization_cache,
+)
+from src.idempotency import DatabaseStore, MemoryStore, StoredResponse, set_store
+from src.config import Settings
+from src.database import Base, engine, get_engine, SessionLocal, ASYNC_DATABASE_URL
+from src.database import engine_options, install_engine_hooks, pool_metrics
+from src.instrumentation import track
+from src.invalidation import LocalChannel, UnixSocketChannel, invalidate, set_channel
+from src.models.appointment import Appointment, AppointmentArchive, AppointmentSeries
+from src.models.idempotency import IdempotencyKey
+from src.models.patient import Patient
 from src.schemas.patient import PatientCreate
 from src.schemas.doctor import DoctorCreate
 from src.schemas.appointment import AppointmentCreate
-from src.services.patient_service import create_patient, get_patient
-from src.services.doctor_service import create_doctor, deactivate_doctor, get_doctor
-from src.services.appointment_service import create_appointment, list_appointments
+from src.services.patient_service import (
+    create_patient,
+    _search_tiers,
+    create_patient_async,
+    get_patient,
+    search_patients,
+)
+from src.services.doctor_service import (
+    create_doctor,
+    create_doctor_async,
+    deactivate_doctor,
+    get_doctor,
+    get_doctor_cached,
+    is_doctor_active,
+)
+from src.services.appointment_service import (
+    bulk_create_appointments,
+    create_appointment,
+    create_appointment_async,
+    has_conflict,
+    list_appointments,
+    list_appointments_async,
+)
+from src.services.archive_service import archive_appointments
+from src.services.booking_rules import as_utc
+from src.services.encounter_service import (
+    page_doctor_patients,
+    page_patient_encounters,
+)
+from src.services.patient_import_service import import_patients, iter_lines
+from src.services.schedule_index import ScheduleIndex, schedule_index
+from src.services import patient_service
+from src.services.schedule_snapshot import schedule_snapshot
 
 # pylint: disable=redefined-outer-name,unused-argument
 client = TestClient(app)
@@ -24,6 +85,13 @@ def reset_db():
     """Reset database before each test run."""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    schedule_index.clear()
+    schedule_snapshot.clear()
+    set_store(MemoryStore())
+    doctor_cache.clear()
+    patient_cache.clear()
+    schedule_cache.clear()
+    utilization_cache.clear()
 
 
 @pytest.fixture
@@ -175,3 +243,1366 @@ def test_list_appointments(db_session: Session, sample_patient, sample_doctor):
     results = list_appointments(db_session, date=start_time, doctor_id=sample_doctor.id)
     assert len(results) == 1
     assert results[0].id == appt.id
+
+
+def test_has_conflict_uses_duration_lookback(
+    db_session: Session, sample_patient, sample_doctor
+):
+    """Test long appointments starting earlier still block later slots."""
+    start_time = datetime.now(timezone.utc) + timedelta(days=1)
+    create_appointment(
+        db_session,
+        AppointmentCreate(
+            patient_id=sample_patient.id,
+            doctor_id=sample_doctor.id,
+            start_time=start_time,
+            duration_minutes=180,
+        ),
+    )
+
+    assert has_conflict(
+        db_session, sample_doctor.id, start_time + timedelta(minutes=150), 30
+    )
+    assert not has_conflict(
+        db_session, sample_doctor.id, start_time + timedelta(minutes=180), 30
+    )
+    assert not has_conflict(
+        db_session, sample_doctor.id, start_time - timedelta(minutes=30), 30
+    )
+
+    # Longer bookings would escape the lookback, so the service refuses them.
+    with pytest.raises(HTTPException) as exc:
+        create_appointment(
+            db_session,
+            AppointmentCreate(
+                patient_id=sample_patient.id,
+                doctor_id=sample_doctor.id,
+                start_time=start_time + timedelta(days=1),
+                duration_minutes=240,
+            ),
+        )
+    assert exc.value.status_code == 400
+
+
+def test_schedule_index_detects_overlaps(
+    db_session: Session, sample_patient, sample_doctor
+):
+    """Test the in-memory index answers overlap queries after warm-up."""
+    start_time = datetime.now(timezone.utc) + timedelta(days=2)
+    for offset in (0, 60, 180):
+        create_appointment(
+            db_session,
+            AppointmentCreate(
+                patient_id=sample_patient.id,
+                doctor_id=sample_doctor.id,
+                start_time=start_time + timedelta(minutes=offset),
+                duration_minutes=45,
+            ),
+        )
+
+    index = ScheduleIndex()
+    index.warm(db_session)
+    assert index.overlaps(db_session, sample_doctor.id, start_time, 15)
+    assert index.overlaps(
+        db_session, sample_doctor.id, start_time + timedelta(minutes=100), 90
+    )
+    assert not index.overlaps(
+        db_session, sample_doctor.id, start_time + timedelta(minutes=45), 15
+    )
+    assert not index.overlaps(
+        db_session, sample_doctor.id, start_time + timedelta(minutes=225), 60
+    )
+
+    index.add(sample_doctor.id, start_time + timedelta(minutes=225), 60)
+    assert index.overlaps(
+        db_session, sample_doctor.id, start_time + timedelta(minutes=250), 15
+    )
+
+
+def test_async_services_round_trip():
+    """Test the async service variants book and list like the sync ones."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    async def scenario():
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+        session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+        try:
+            async with session_factory() as db:
+                patient = await create_patient_async(
+                    db,
+                    PatientCreate(
+                        first_name="Asha",
+                        last_name="K",
+                        email="asha@example.com",
+                        phone="4445556666",
+                    ),
+                )
+                doctor = await create_doctor_async(
+                    db, DoctorCreate(full_name="Dr. Rao", specialization="ENT")
+                )
+                appt_data = AppointmentCreate(
+                    patient_id=patient.id,
+                    doctor_id=doctor.id,
+                    start_time=datetime.now(timezone.utc) + timedelta(hours=5),
+                    duration_minutes=30,
+                )
+                appt = await create_appointment_async(db, appt_data)
+                with pytest.raises(HTTPException):
+                    await create_appointment_async(db, appt_data)
+                listed = await list_appointments_async(
+                    db, appt_data.start_time, doctor.id
+                )
+                return appt.id, [a.id for a in listed]
+        finally:
+            await async_engine.dispose()
+
+    appt_id, listed_ids = asyncio.run(scenario())
+    assert listed_ids == [appt_id]
+
+
+def test_bulk_create_appointments_reports_each_item(
+    monkeypatch, db_session: Session, sample_patient, sample_doctor
+):
+    """Test bulk booking accepts free slots and rejects conflicts per item."""
+    start_time = datetime.now(timezone.utc) + timedelta(days=3)
+    create_appointment(
+        db_session,
+        AppointmentCreate(
+            patient_id=sample_patient.id,
+            doctor_id=sample_doctor.id,
+            start_time=start_time,
+            duration_minutes=60,
+        ),
+    )
+    inactive = deactivate_doctor(
+        db_session,
+        create_doctor(
+            db_session, DoctorCreate(full_name="Dr. Off", specialization="GP")
+        ).id,
+    )
+
+    def slot(offset: int, duration: int, doctor_id: int = sample_doctor.id):
+        return AppointmentCreate(
+            patient_id=sample_patient.id,
+            doctor_id=doctor_id,
+            start_time=start_time + timedelta(minutes=offset),
+            duration_minutes=duration,
+        )
+
+    results = bulk_create_appointments(
+        db_session,
+        [
+            slot(90, 30),  # free
+            slot(30, 30),  # overlaps the existing booking
+            slot(100, 30),  # overlaps item 0 from the same batch
+            slot(60, 30),  # free, directly after the existing booking
+            slot(200, 30, doctor_id=inactive.id),
+            slot(300, 200),  # too long
+        ],
+    )
+
+    assert [r.status_code for r in results] == [201, 409, 409, 201, 400, 400]
+    assert all(r.id for r in results if r.status_code == 201)
+    listed = list_appointments(db_session, date=start_time, doctor_id=sample_doctor.id)
+    assert len(listed) == 3
+
+    # Databases without RETURNING (MySQL) read the new ids back.
+    monkeypatch.setattr(
+        get_engine().dialect,
+        "insert_executemany_returning_sort_by_parameter_order",
+        False,
+    )
+    results = bulk_create_appointments(db_session, [slot(240, 30), slot(120, 60)])
+    assert [r.status_code for r in results] == [201, 201]
+    starts = dict(
+        db_session.execute(
+            select(Appointment.id, Appointment.start_time).where(
+                Appointment.id.in_([r.id for r in results])
+            )
+        ).all()
+    )
+    starts = {appointment_id: as_utc(start) for appointment_id, start in starts.items()}
+    assert starts == {
+        results[0].id: start_time + timedelta(minutes=240),
+        results[1].id: start_time + timedelta(minutes=120),
+    }
+
+
+def test_doctor_availability_returns_gaps():
+    """Test availability lists the gaps around existing bookings."""
+    doctor = client.post(
+        "/doctors", json={"full_name": "Dr. Free", "specialization": "Pediatrics"}
+    ).json()
+    patient = client.post(
+        "/patients",
+        json={
+            "first_name": "Mira",
+            "last_name": "N",
+            "email": "mira@example.com",
+            "phone": "7778889999",
+        },
+    ).json()
+    day = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    for offset, duration in ((0, 60), (90, 30)):
+        client.post(
+            "/appointments",
+            json={
+                "patient_id": patient["id"],
+                "doctor_id": doctor["id"],
+                "start_time": (day + timedelta(minutes=offset)).isoformat(),
+                "duration_minutes": duration,
+            },
+        )
+
+    params = {
+        "from": day.isoformat(),
+        "to": (day + timedelta(hours=3)).isoformat(),
+        "duration": 30,
+    }
+    resp = client.get(f"/doctors/{doctor['id']}/availability", params=params)
+    assert resp.status_code == 200
+    windows = [
+        (
+            datetime.fromisoformat(w["start_time"]) - day,
+            datetime.fromisoformat(w["end_time"]) - day,
+        )
+        for w in resp.json()["windows"]
+    ]
+    assert windows == [
+        (timedelta(minutes=60), timedelta(minutes=90)),
+        (timedelta(minutes=120), timedelta(minutes=180)),
+    ]
+
+    params["duration"] = 45
+    resp = client.get(
+        "/availability", params={**params, "specialization": "Pediatrics"}
+    )
+    assert [len(d["windows"]) for d in resp.json()] == [1]
+
+    params["duration"] = 5
+    resp = client.get(f"/doctors/{doctor['id']}/availability", params=params)
+    assert resp.status_code == 400
+
+
+def test_list_appointments_keyset_pages_and_ndjson(
+    db_session: Session, sample_patient, sample_doctor
+):
+    """Test keyset pages cover the day exactly once and NDJSON matches."""
+    day = (datetime.now(timezone.utc) + timedelta(days=4)).replace(
+        hour=8, minute=0, second=0, microsecond=0
+    )
+    for slot in range(5):
+        create_appointment(
+            db_session,
+            AppointmentCreate(
+                patient_id=sample_patient.id,
+                doctor_id=sample_doctor.id,
+                start_time=day + timedelta(minutes=30 * slot),
+                duration_minutes=30,
+            ),
+        )
+
+    seen, cursor = [], None
+    while True:
+        params = {"date": day.isoformat(), "doctor_id": sample_doctor.id, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/appointments", params=params)
+        assert resp.status_code == 200
+        seen.extend(a["id"] for a in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 5 and len(set(seen)) == 5
+
+    resp = client.get(
+        "/appointments", params={"date": day.isoformat(), "format": "ndjson"}
+    )
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in resp.text.splitlines()] == seen
+
+    # 22:00 the evening before at -10:00: every mode lists the same UTC day.
+    local = day.astimezone(timezone(timedelta(hours=-10))).isoformat()
+    for extra in ({}, {"limit": 10}):
+        resp = client.get("/appointments", params={"date": local, **extra})
+        assert [a["id"] for a in resp.json()] == seen
+    resp = client.get("/appointments", params={"date": local, "format": "ndjson"})
+    assert [json.loads(line)["id"] for line in resp.text.splitlines()] == seen
+
+    resp = client.get("/patients", params={"limit": 1})
+    assert [p["id"] for p in resp.json()] == [sample_patient.id]
+    assert "X-Next-Cursor" not in resp.headers
+
+
+def test_lru_ttl_cache_counts_hits_misses_and_evictions(monkeypatch):
+    """Test the LRU bound, TTL expiry and counters of the in-process cache."""
+    cache = LRUTTLCache(maxsize=2, ttl=10)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    cache.set(3, "c")  # evicts 2, the least recently used
+    assert cache.get(2) is None
+
+    now = __import__("time").monotonic()
+    monkeypatch.setattr("src.cache.time.monotonic", lambda: now + 11)
+    assert cache.get(1) is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 2, "size": 1}
+
+
+def test_doctor_cache_is_invalidated_on_deactivate(db_session: Session, sample_doctor):
+    """Test cached doctor lookups see deactivation."""
+    assert get_doctor_cached(db_session, sample_doctor.id)["active"] is True
+    hits = doctor_cache.stats()["hits"]
+    assert get_doctor_cached(db_session, sample_doctor.id)["active"] is True
+    assert doctor_cache.stats()["hits"] == hits + 1
+
+    # A lookup that read the row before the deactivation landed does not put
+    # its stale record back.
+    stale = get_doctor_cached(db_session, sample_doctor.id)
+    doctor_cache.delete(sample_doctor.id)
+    token = doctor_cache.token()
+    client.put(f"/doctors/{sample_doctor.id}/deactivate")
+    doctor_cache.set(sample_doctor.id, stale, token)
+    assert doctor_cache.get(sample_doctor.id) is None
+    assert client.get(f"/doctors/{sample_doctor.id}").json()["active"] is False
+
+
+def test_request_instrumentation(db_session: Session, sample_doctor):
+    """Test SQL counts reach Server-Timing, /metrics and track()."""
+    with track() as stats:
+        get_doctor(db_session, sample_doctor.id)
+    assert stats.statements == 1
+    assert stats.db_seconds > 0
+
+    response = client.get(f"/doctors/{sample_doctor.id}")
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+
+    metrics = client.get("/metrics").text
+    assert (
+        'http_request_sql_statements_count{method="GET",route="/doctors/{doctor_id}"}'
+        in metrics
+    )
+    assert 'cache_misses{cache="doctor"}' in metrics
+
+
+def test_engine_applies_profile_and_pragmas(tmp_path):
+    """Test engines get the profile's pool settings and, for SQLite, the
+    PRAGMAs on every connection, and that checkouts from several threads are
+    all counted."""
+    config = Settings(
+        database_url=f"sqlite:///{tmp_path / 'profile.db'}",
+        profile="production",
+        pool_size=4,
+        max_overflow=0,
+        pre_ping="never",
+        sqlite_synchronous="FULL",
+        sqlite_cache_size=-2000,
+        sqlite_busy_timeout_ms=1234,
+    )
+    options = engine_options(config)
+    assert options["pool_pre_ping"] is False and options["pool_size"] == 4
+    target = create_engine(config.database_url, **options)
+    install_engine_hooks(target, config)
+    before = pool_metrics.snapshot()
+    try:
+        with target.connect() as connection:
+            pragmas = {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in ("journal_mode", "synchronous", "cache_size")
+            }
+            busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        assert pragmas == {"journal_mode": "wal", "synchronous": 2, "cache_size": -2000}
+        assert busy_timeout == 1234
+
+        def check_out(_):
+            for _ in range(100):
+                with target.connect():
+                    pass
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(check_out, range(4)))
+        after = pool_metrics.snapshot(target.pool)
+    finally:
+        target.dispose()
+    assert after["checkouts"] - before["checkouts"] == 401
+    assert 1 <= after["connects"] - before["connects"] <= 4
+    assert after["size"] == 4
+
+
+def test_writes_use_one_statement(db_session: Session):
+    """Test creates and deactivation skip pre-check and refresh round trips."""
+    with track() as stats:
+        patient = create_patient(
+            db_session,
+            PatientCreate(
+                first_name="Ann", last_name="Lee", email="ann@x.com", phone="111"
+            ),
+        )
+    assert stats.statements == 1
+    assert patient.id and patient.created_at
+
+    with track() as stats:
+        doctor = create_doctor(
+            db_session, DoctorCreate(full_name="Dr. One", specialization="General")
+        )
+        deactivate_doctor(db_session, doctor.id)
+    assert stats.statements == 2
+    assert doctor.active is False
+
+    with pytest.raises(HTTPException) as exc:
+        create_patient(
+            db_session,
+            PatientCreate(
+                first_name="Ann", last_name="Lee", email="ann@x.com", phone="222"
+            ),
+        )
+    assert exc.value.detail == "Email already exists"
+    with pytest.raises(HTTPException) as exc:
+        create_patient(
+            db_session,
+            PatientCreate(
+                first_name="Ann", last_name="Lee", email="ann2@x.com", phone="111"
+            ),
+        )
+    assert exc.value.detail == "Phone already exists"
+
+
+def test_list_encoding_matches_without_orjson(
+    monkeypatch, sample_patient, sample_doctor
+):
+    """Test list bodies are the same with orjson and with the fallback."""
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    client.post(
+        "/appointments",
+        json={
+            "patient_id": sample_patient.id,
+            "doctor_id": sample_doctor.id,
+            "start_time": start.isoformat(),
+            "duration_minutes": 30,
+        },
+    )
+    requests = [
+        ("/appointments", {"date": start.isoformat()}),
+        ("/appointments", {"date": start.isoformat(), "format": "ndjson"}),
+        ("/patients", {}),
+        ("/doctors", {"format": "ndjson"}),
+    ]
+    fast = [client.get(url, params=params).content for url, params in requests]
+    monkeypatch.setattr("src.serialization.orjson", None)
+    assert [client.get(url, params=params).content for url, params in requests] == fast
+
+    appointments = json.loads(fast[0])
+    assert set(appointments[0]) == {
+        "id",
+        "patient_id",
+        "doctor_id",
+        "start_time",
+        "duration_minutes",
+        "series_id",
+    }
+
+
+def test_archived_appointments_are_still_listed(
+    db_session: Session, sample_patient, sample_doctor
+):
+    """Test past appointments move to the archive and are read back from it."""
+    past_day = (datetime.now(timezone.utc) - timedelta(days=90)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    for slot in range(3):
+        db_session.add(
+            Appointment(
+                patient_id=sample_patient.id,
+                doctor_id=sample_doctor.id,
+                start_time=past_day + timedelta(minutes=30 * slot),
+                duration_minutes=30,
+            )
+        )
+    db_session.commit()
+    upcoming = create_appointment(
+        db_session,
+        AppointmentCreate(
+            patient_id=sample_patient.id,
+            doctor_id=sample_doctor.id,
+            start_time=datetime.now(timezone.utc) + timedelta(days=1),
+            duration_minutes=30,
+        ),
+    )
+
+    assert archive_appointments(db_session, batch_size=2) == 3
+    assert db_session.scalars(select(Appointment.id)).all() == [upcoming.id]
+    assert db_session.scalar(select(func.count(AppointmentArchive.id))) == 3
+
+    listed = list_appointments(db_session, past_day, sample_doctor.id)
+    assert [a.start_time.hour for a in listed] == [9, 9, 10]
+    resp = client.get("/appointments", params={"date": past_day.isoformat()})
+    assert len(resp.json()) == 3
+    resp = client.get(
+        "/appointments", params={"date": past_day.isoformat(), "limit": 2}
+    )
+    assert len(resp.json()) == 2 and "X-Next-Cursor" in resp.headers
+
+
+def test_concurrent_bookings_never_double_book(sample_patient, sample_doctor):
+    """Test racing bookings of overlapping slots: exactly one wins."""
+    start = datetime.now(timezone.utc) + timedelta(days=2)
+    threads = 8
+    barrier = threading.Barrier(threads)
+
+    def book(i: int) -> int:
+        barrier.wait()
+        with SessionLocal() as db:
+            try:
+                create_appointment(
+                    db,
+                    AppointmentCreate(
+                        patient_id=sample_patient.id,
+                        doctor_id=sample_doctor.id,
+                        start_time=start + timedelta(minutes=5 * i),
+                        duration_minutes=60,
+                    ),
+                )
+            except HTTPException as exc:
+                return exc.status_code
+            return 201
+
+    with ThreadPoolExecutor(threads) as pool:
+        statuses = list(pool.map(book, range(threads)))
+
+    assert sorted(statuses) == [201] + [409] * (threads - 1)
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count(Appointment.id))) == 1
+
+
+def test_booking_checks_conflicts_in_the_locked_transaction(
+    sample_patient, sample_doctor
+):
+    """Test the transaction holding the conflict check begins with the doctor
+    lock, not with earlier reads (a REPEATABLE READ snapshot taken before the
+    lock would miss bookings committed while waiting for it)."""
+    doctor_cache.clear()
+    statements = []
+
+    def began(*_args):
+        statements.append("BEGIN")
+
+    def executed(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", executed)
+    try:
+        with SessionLocal() as db:
+            event.listen(db, "after_begin", began)
+            # What POST /appointments does: the doctor check, then the booking.
+            assert is_doctor_active(db, sample_doctor.id)
+            create_appointment(
+                db,
+                AppointmentCreate(
+                    patient_id=sample_patient.id,
+                    doctor_id=sample_doctor.id,
+                    start_time=datetime.now(timezone.utc) + timedelta(days=2),
+                    duration_minutes=30,
+                ),
+            )
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", executed)
+
+    insert_at = next(
+        i for i, s in enumerate(statements) if s.startswith("INSERT INTO saniya_")
+    )
+    begin_at = max(i for i in range(insert_at) if statements[i] == "BEGIN")
+    lock = statements[begin_at + 1]
+    assert lock == "BEGIN IMMEDIATE" or "FOR UPDATE" in lock
+    assert any("FROM saniya_doctors" in s for s in statements[:begin_at])
+
+
+def test_day_listing_etag_and_invalidation(sample_patient, sample_doctor):
+    """Test cached listings answer 304 and change when a booking lands."""
+    start = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    )
+
+    def book(offset_minutes: int, doctor_id: int = sample_doctor.id) -> None:
+        resp = client.post(
+            "/appointments",
+            json={
+                "patient_id": sample_patient.id,
+                "doctor_id": doctor_id,
+                "start_time": (start + timedelta(minutes=offset_minutes)).isoformat(),
+                "duration_minutes": 30,
+            },
+        )
+        assert resp.status_code == 201
+
+    book(0)
+    params = {"date": start.isoformat(), "doctor_id": sample_doctor.id}
+    first = client.get("/appointments", params=params)
+    etag = first.headers["ETag"]
+    assert len(first.json()) == 1
+
+    again = client.get("/appointments", params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag
+    assert 'desc="0 queries"' in again.headers["Server-Timing"]
+
+    other = client.post(
+        "/doctors", json={"full_name": "Dr. Other", "specialization": "General"}
+    ).json()
+    book(0, other["id"])
+    unchanged = client.get(
+        "/appointments", params=params, headers={"If-None-Match": etag}
+    )
+    assert unchanged.status_code == 304
+
+    book(60)
+    changed = client.get(
+        "/appointments", params=params, headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
+    whole_day = client.get("/appointments", params={"date": start.isoformat()})
+    assert len(whole_day.json()) == 3
+
+
+def test_import_does_no_database_io(tmp_path):
+    """Test importing the app neither creates the engine nor the database,
+    and importing the database layer does not read the settings (or .env)."""
+    database = tmp_path / "untouched.db"
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import src.config, src.database, src.models.appointment; "
+            "assert src.config.get_settings.cache_info().currsize == 0; "
+            "import src.main; "
+            "assert src.database.get_engine.cache_info().currsize == 0",
+        ],
+        cwd=Path(__file__).resolve().parents[1],
+        env=dict(os.environ, DATABASE_URL=f"sqlite:///{database}"),
+        check=True,
+    )
+    assert not database.exists()
+
+
+def test_invalidation_reaches_other_workers(tmp_path, sample_patient, sample_doctor):
+    """Test an invalidation published by one worker evicts in another."""
+    received = threading.Event()
+    other_worker = UnixSocketChannel(str(tmp_path))
+    other_worker.start(lambda message: received.set())
+    set_channel(UnixSocketChannel(str(tmp_path)))
+    try:
+        doctor_cache.set(sample_doctor.id, {"active": True})
+        invalidate("doctor", sample_doctor.id)
+        assert doctor_cache.get(sample_doctor.id) is None
+        assert received.wait(2)
+
+        # Messages from the other worker are applied here.
+        doctor_cache.set(sample_doctor.id, {"active": True})
+        other_worker.publish(
+            json.dumps({"topic": "doctor", "keys": [sample_doctor.id]}).encode()
+        )
+        for _ in range(200):
+            if doctor_cache.get(sample_doctor.id) is None:
+                break
+            threading.Event().wait(0.01)
+        assert doctor_cache.get(sample_doctor.id) is None
+
+        # So do its bookings, which availability (served from the schedule
+        # index) must see.
+        start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+            hour=9, minute=0, second=0, microsecond=0
+        )
+        with SessionLocal() as db:
+
+            def windows():
+                return schedule_index.free_windows(
+                    db, sample_doctor.id, start, start + timedelta(hours=2), 30
+                )
+
+            assert len(windows()) == 1
+            db.add(
+                Appointment(
+                    patient_id=sample_patient.id,
+                    doctor_id=sample_doctor.id,
+                    start_time=start + timedelta(minutes=30),
+                    duration_minutes=30,
+                )
+            )
+            db.commit()
+            other_worker.publish(
+                json.dumps(
+                    {
+                        "topic": "schedule",
+                        "keys": [[sample_doctor.id, start.date().isoformat()]],
+                    }
+                ).encode()
+            )
+            for _ in range(200):
+                if len(windows()) == 2:
+                    break
+                threading.Event().wait(0.01)
+            assert len(windows()) == 2
+    finally:
+        other_worker.close()
+        set_channel(LocalChannel())
+
+
+def test_local_bookings_keep_the_schedule_index(
+    tmp_path, db_session: Session, sample_patient, sample_doctor
+):
+    """Test a booking made in this worker updates the schedule index instead
+    of evicting the doctor, so the next booking reads no schedule first."""
+    set_channel(UnixSocketChannel(str(tmp_path)))
+    statements = []
+
+    def executed(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    def book(offset_minutes: int) -> None:
+        create_appointment(
+            db_session,
+            AppointmentCreate(
+                patient_id=sample_patient.id,
+                doctor_id=sample_doctor.id,
+                start_time=datetime.now(timezone.utc)
+                + timedelta(days=2, minutes=offset_minutes),
+                duration_minutes=30,
+            ),
+        )
+
+    try:
+        schedule_index.warm(db_session)
+        book(0)
+        event.listen(get_engine(), "before_cursor_execute", executed)
+        try:
+            for offset in (60, 120):
+                statements.clear()
+                book(offset)
+                lock = next(
+                    i
+                    for i, s in enumerate(statements)
+                    if s == "BEGIN IMMEDIATE" or "FOR UPDATE" in s
+                )
+                # Only the conflict check under the lock reads the schedule.
+                assert not [
+                    s for s in statements[:lock] if "FROM saniya_appointment" in s
+                ]
+        finally:
+            event.remove(get_engine(), "before_cursor_execute", executed)
+    finally:
+        set_channel(LocalChannel())
+
+    assert schedule_index.overlaps(
+        db_session,
+        sample_doctor.id,
+        datetime.now(timezone.utc) + timedelta(days=2, minutes=125),
+        15,
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_gets_its_own_connections(sample_doctor):
+    """Test a forked child does not reuse the parent's pooled connections."""
+    with SessionLocal() as db:
+        assert get_doctor(db, sample_doctor.id).id == sample_doctor.id
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            assert get_engine().pool.checkedin() == 0
+            with SessionLocal() as db:
+                code = 0 if get_doctor(db, sample_doctor.id) else 1
+        finally:
+            os._exit(code)  # pylint: disable=protected-access
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    with SessionLocal() as db:
+        assert get_doctor(db, sample_doctor.id).id == sample_doctor.id
+
+
+def test_utilization_reports(monkeypatch, db_session: Session, sample_patient):
+    """Test doctor and department utilization, with and without NumPy."""
+    cardio = create_doctor(
+        db_session, DoctorCreate(full_name="A", specialization="Cardio")
+    )
+    other = create_doctor(
+        db_session, DoctorCreate(full_name="B", specialization="Cardio")
+    )
+    derm = create_doctor(db_session, DoctorCreate(full_name="C", specialization="Derm"))
+    # A Monday 90 days back, so part of the range is read from the archive.
+    monday = (datetime.now(timezone.utc) - timedelta(days=90)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    monday -= timedelta(days=monday.weekday())
+    booked = [
+        (cardio, monday + timedelta(hours=9), 30),
+        (cardio, monday + timedelta(hours=10, minutes=45), 60),  # gap 75 min
+        (cardio, monday + timedelta(days=1, hours=23, minutes=30), 60),
+        (other, monday + timedelta(hours=10), 15),
+        (derm, monday + timedelta(days=7, hours=14), 120),
+    ]
+    for doctor, start, duration in booked:
+        db_session.add(
+            Appointment(
+                patient_id=sample_patient.id,
+                doctor_id=doctor.id,
+                start_time=start,
+                duration_minutes=duration,
+            )
+        )
+    db_session.commit()
+    archive_appointments(db_session, monday + timedelta(days=1))
+
+    params = {
+        "from": monday.date().isoformat(),
+        "to": (monday + timedelta(days=13)).date().isoformat(),
+    }
+    report = client.get(f"/doctors/{cardio.id}/utilization", params=params).json()
+    assert (report["appointments"], report["booked_minutes"]) == (3, 150)
+    assert report["gap_minutes"] == 75
+    assert report["busiest_day"] == monday.date().isoformat()
+    assert [b["booked_minutes"] for b in report["buckets"]] == [90, 60]
+    hourly = report["hourly_minutes"]
+    assert (hourly[9], hourly[10], hourly[11], hourly[23], hourly[0]) == (
+        30,
+        15,
+        45,
+        30,
+        30,
+    )
+    assert sum(hourly) == 150 and report["peak_hours"] == [11, 0, 9]
+
+    weekly = {**params, "period": "week"}
+    departments = client.get("/departments/utilization", params=weekly).json()
+    assert [(d["specialization"], d["doctors"]) for d in departments] == [
+        ("Cardio", 2),
+        ("Derm", 1),
+    ]
+    assert [b["booked_minutes"] for b in departments[0]["buckets"]] == [165]
+    assert (
+        departments[1]["buckets"][0]["start"]
+        == (monday + timedelta(days=7)).date().isoformat()
+    )
+
+    monkeypatch.setattr("src.services.utilization_service.numpy", None)
+    utilization_cache.clear()
+    assert client.get("/departments/utilization", params=weekly).json() == departments
+    url = f"/doctors/{cardio.id}/utilization"
+    assert client.get(url, params=params).json() == report
+
+    # A booking retires the cached reports that cover its doctor.
+    start = monday + timedelta(days=3, hours=8)
+    db_session.add(
+        Appointment(
+            patient_id=sample_patient.id,
+            doctor_id=derm.id,
+            start_time=start,
+            duration_minutes=30,
+        )
+    )
+    db_session.commit()
+    invalidate("utilization", derm.id)
+    departments = client.get("/departments/utilization", params=weekly).json()
+    assert departments[1]["booked_minutes"] == 150
+
+    bad = client.get(
+        f"/doctors/{cardio.id}/utilization",
+        params={"from": "2026-01-02", "to": "2026-01-01"},
+    )
+    assert bad.status_code == 400
+    assert client.get("/doctors/999/utilization", params=params).status_code == 404
+
+
+def test_patient_import_streams_chunks_and_reports_rejects(sample_patient):
+    """Test CSV/NDJSON imports check each chunk in one query and list rejects."""
+    csv_body = (
+        "first_name,last_name,email,phone\n"
+        "Bo,B,bo@x.com,201\n"
+        "Cy,C,not-an-email,202\n"
+        "Di,D,di@x.com,203\n"
+        "Ed,E,ed@x.com,1234567890\n"  # phone of sample_patient
+        "Fay,F,bo@x.com,204\n"  # email of an earlier row
+        "Gus,G,gus@x.com\n"
+        "Hal,H,hal@x.com,205\n"
+    )
+    lines = iter_lines(iter([csv_body[:50].encode(), csv_body[50:].encode()]))
+    with SessionLocal() as db, track() as stats:
+        report = import_patients(db, lines, "csv", chunk_size=3)
+    assert report["inserted"] == 3 and report["rejected"] == 4
+    assert [(e["line"], e["error"].split(":")[0]) for e in report["errors"]] == [
+        (3, "email"),
+        (5, "Phone already exists"),
+        (6, "Email already exists"),
+        (7, "Expected 4 fields, got 3"),
+    ]
+    # Two chunks of valid rows: one duplicate check and one insert each.
+    assert stats.statements == 4
+
+    client = TestClient(app)
+    ndjson_body = (
+        '{"first_name": "Ivy", "last_name": "I", "email": "ivy@x.com", "phone": "301"}\n'
+        "\n"
+        "{oops\n"
+        '{"first_name": "Hal", "last_name": "H", "email": "hal@x.com", "phone": "302"}\n'
+    )
+    response = client.post(
+        "/patients/import",
+        content=ndjson_body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "inserted": 1,
+        "rejected": 2,
+        "errors": [
+            {"line": 3, "error": "Invalid JSON"},
+            {"line": 4, "error": "Email already exists"},
+        ],
+        "errors_truncated": False,
+    }
+    response = client.post("/patients/import?format=csv", content="name\nBo\n")
+    assert response.status_code == 400
+
+
+def test_patient_search_ranks_prefix_matches_from_indexes(db_session: Session):
+    """Test name/email/phone search order and that every tier scans an index."""
+    for i, (first, last, phone) in enumerate(
+        [
+            ("Smith", "Adams", "(555) 010-0001"),
+            ("Ann", "Smithers", "555-010-0002"),
+            ("Bob", "smith", "555.010.0003"),
+            ("Ann", "Smith", "5550100004"),
+            ("Ann", "Jones", "447700900005"),
+        ]
+    ):
+        create_patient(
+            db_session,
+            PatientCreate(
+                first_name=first, last_name=last, email=f"p{i}@X.com", phone=phone
+            ),
+        )
+
+    def names(q: str, limit: int = 20) -> list[str]:
+        return [
+            f"{p['first_name']} {p['last_name']}"
+            for p in search_patients(db_session, q, limit)
+        ]
+
+    assert names("SMITH") == ["Ann Smith", "Bob smith", "Ann Smithers", "Smith Adams"]
+    assert names("smi", limit=2) == ["Ann Smith", "Bob smith"]
+    assert names("ann smith") == ["Ann Smith", "Ann Smithers"]
+    assert names("Smith, Ann") == ["Ann Smith", "Ann Smithers"]
+    assert names("p4@x") == ["Ann Jones"]
+    assert names("(555) 010") == [
+        "Smith Adams",
+        "Ann Smithers",
+        "Bob smith",
+        "Ann Smith",
+    ]
+    assert names("4477") == ["Ann Jones"]
+    assert names("zed") == [] and names(",") == []
+
+    for q in ("smith", "ann smith", "p4@x", "4477"):
+        for condition, order in _search_tiers(q):
+            statement = select(Patient.id).where(condition).order_by(*order)
+            sql = statement.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = " ".join(
+                str(row[-1])
+                for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+            )
+            assert "INDEX ix_saniya_patients_" in plan, plan
+            assert "TEMP B-TREE" not in plan, plan
+
+    client = TestClient(app)
+    response = client.get("/patients/search", params={"q": "smithers"})
+    assert response.status_code == 200
+    assert [p["last_name"] for p in response.json()] == ["Smithers"]
+    assert client.get("/patients/search", params={"q": " "}).status_code == 400
+
+
+def test_encounter_pages_use_one_query_whatever_their_size(
+    db_session: Session, sample_patient, sample_doctor
+):
+    """Test timelines join doctor/patient details in one statement per page."""
+    other_doctor = create_doctor(
+        db_session, DoctorCreate(full_name="Dr. Rao", specialization="Dermatology")
+    )
+    other_patient = create_patient(
+        db_session,
+        PatientCreate(first_name="Bo", last_name="B", email="bo@x.com", phone="2"),
+    )
+    past_day = (datetime.now(timezone.utc) - timedelta(days=90)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    future_day = past_day + timedelta(days=120)
+    visits = [
+        (sample_patient.id, sample_doctor.id, past_day, slot) for slot in range(3)
+    ]
+    visits += [
+        (sample_patient.id, other_doctor.id, future_day, 0),
+        (other_patient.id, sample_doctor.id, future_day, 1),
+    ]
+    for patient_id, doctor_id, day, slot in visits:
+        db_session.add(
+            Appointment(
+                patient_id=patient_id,
+                doctor_id=doctor_id,
+                start_time=day + timedelta(minutes=30 * slot),
+                duration_minutes=30,
+            )
+        )
+    db_session.commit()
+    assert archive_appointments(db_session) == 3
+    patient_id, doctor_id = sample_patient.id, sample_doctor.id
+
+    timeline, cursor = [], None
+    while True:
+        with track() as stats:
+            page, cursor = page_patient_encounters(db_session, patient_id, 2, cursor)
+        # One more on the first page: the 404 check misses patient_cache.
+        assert stats.statements == (2 if not timeline else 1)
+        timeline += page
+        if cursor is None:
+            break
+    assert [(e["doctor_name"], e["start_time"].hour) for e in timeline] == [
+        ("Dr. Rao", 9),
+        ("Dr. Swathi", 10),
+        ("Dr. Swathi", 9),
+        ("Dr. Swathi", 9),
+    ]
+
+    with track() as stats:
+        patients, cursor = page_doctor_patients(db_session, doctor_id, 10)
+    assert stats.statements == 2 and cursor is None
+    assert [(p["first_name"], p["appointments"]) for p in patients] == [
+        ("Bo", 1),
+        ("Aman", 3),
+    ]
+    assert patients[1]["first_appointment"].hour == 9
+    assert patients[1]["last_appointment"].hour == 10
+
+    with SessionLocal() as fresh:
+        appointment = fresh.scalars(select(Appointment)).first()
+        with pytest.raises(InvalidRequestError):
+            appointment.doctor  # pylint: disable=pointless-statement
+
+    client = TestClient(app)
+    response = client.get(f"/patients/{sample_patient.id}/encounters?limit=3")
+    assert len(response.json()) == 3 and "X-Next-Cursor" in response.headers
+    assert response.json()[0]["specialization"] == "Dermatology"
+    response = client.get(f"/doctors/{sample_doctor.id}/patients")
+    assert [p["id"] for p in response.json()] == [other_patient.id, sample_patient.id]
+    assert client.get("/patients/999/encounters").status_code == 404
+    assert client.get("/doctors/999/patients").status_code == 404
+
+
+def test_appointment_series_conflicts_and_lists_occurrences(
+    db_session: Session, sample_patient, sample_doctor
+):
+    """Test a series blocks its occurrences and is listed within the day."""
+    day = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    week = timedelta(weeks=1)
+    patient_id, doctor_id = sample_patient.id, sample_doctor.id
+    create_appointment(
+        db_session,
+        AppointmentCreate(
+            patient_id=patient_id,
+            doctor_id=doctor_id,
+            start_time=day + week + timedelta(hours=1),
+            duration_minutes=30,
+        ),
+    )
+    listing = {"date": (day + week).isoformat(), "doctor_id": doctor_id}
+    assert len(client.get("/appointments", params=listing).json()) == 1
+
+    def book(start_time, **rule):
+        body = {
+            "patient_id": patient_id,
+            "doctor_id": doctor_id,
+            "start_time": start_time.isoformat(),
+            "duration_minutes": 30,
+            **rule,
+        }
+        return client.post("/appointment-series", json=body)
+
+    resp = book(day, count=4)
+    assert resp.status_code == 201
+    series = resp.json()
+    assert datetime.fromisoformat(series["ends_at"]) == day + 3 * week + timedelta(
+        minutes=30
+    )
+    resp = client.get(f"/appointment-series/{series['id']}")
+    assert resp.json()["count"] == 4
+    assert client.get("/appointment-series/999").status_code == 404
+
+    # Conflicts with the stored appointment, then with the first series.
+    assert book(day + timedelta(hours=1), count=2).status_code == 409
+    assert (
+        book(day + timedelta(minutes=15), frequency="daily", count=20).status_code
+        == 409
+    )
+    assert book(day, frequency="daily", interval=2, count=400).status_code == 400
+    assert book(day, interval=10**9, count=2).status_code == 422
+    assert book(day + timedelta(days=1), frequency="daily", count=5).status_code == 201
+
+    slot = {"patient_id": patient_id, "doctor_id": doctor_id, "duration_minutes": 30}
+    late = (day + 2 * week + timedelta(minutes=15)).isoformat()
+    assert (
+        client.post("/appointments", json={**slot, "start_time": late}).status_code
+        == 409
+    )
+    assert has_conflict(db_session, doctor_id, day + 2 * week, 30)
+    assert not has_conflict(
+        db_session, doctor_id, day + 2 * week + timedelta(minutes=30), 30
+    )
+    assert not has_conflict(db_session, doctor_id, day + 4 * week, 30)
+
+    listed = client.get("/appointments", params=listing).json()
+    assert [(a["series_id"], a["id"] is None) for a in listed] == [
+        (series["id"], True),
+        (None, False),
+    ]
+    pages, cursor = [], None
+    while True:
+        params = {**listing, "limit": 1, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/appointments", params=params)
+        pages += resp.json()
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == listed
+    resp = client.get("/appointments", params={**listing, "format": "ndjson"})
+    assert [json.loads(line) for line in resp.text.splitlines()] == listed
+    appointments = list_appointments(db_session, day + week, doctor_id)
+    assert [a.series_id for a in appointments] == [series["id"], None]
+
+    resp = client.get(
+        f"/doctors/{doctor_id}/availability",
+        params={
+            "from": (day + week - timedelta(hours=1)).isoformat(),
+            "to": (day + week + timedelta(hours=2)).isoformat(),
+            "duration": 30,
+        },
+    )
+    assert [w["start_time"][11:16] for w in resp.json()["windows"]] == [
+        "08:00",
+        "09:30",
+        "10:30",
+    ]
+
+
+class ListSink:
+    """Audit sink keeping the batches it is given."""
+
+    def __init__(self, gate: threading.Event | None = None) -> None:
+        self.events = []
+        self.gate = gate
+
+    def write(self, events):
+        if self.gate is not None:
+            self.gate.wait()
+        self.events.extend(events)
+
+    def close(self):
+        pass
+
+
+def test_audit_events_are_written_behind(
+    monkeypatch, tmp_path, db_session: Session, sample_patient, sample_doctor
+):
+    """Test writes are audited off the request path, with backpressure."""
+    audit_log.flush(ListSink())  # events of the fixtures
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    appointment = create_appointment(
+        db_session,
+        AppointmentCreate(
+            patient_id=sample_patient.id,
+            doctor_id=sample_doctor.id,
+            start_time=start,
+            duration_minutes=30,
+        ),
+    )
+    appointment_id = appointment.id
+    deactivate_doctor(db_session, sample_doctor.id)
+    sink = ListSink()
+    assert audit_log.flush(sink) == 2
+    assert [(e["action"], e["entity_id"]) for e in sink.events] == [
+        ("appointment.book", appointment_id),
+        ("doctor.deactivate", sample_doctor.id),
+    ]
+    assert sink.events[0]["details"]["start_time"] == start.isoformat()
+
+    log = AuditLog(maxsize=4, batch_size=3)
+    log.start(DatabaseSink(SessionLocal), interval=0.01)
+    for patient_id in range(10):
+        log.record("patient.create", patient_id)
+    log.close()
+    assert log.stats() == {"queue_depth": 0, "written": 10, "dropped": 0, "failed": 0}
+    count = db_session.scalar(text("SELECT count(*) FROM saniya_audit_events"))
+    assert count == 10
+
+    # A stuck sink: the third event waits PUT_TIMEOUT_SECONDS, then is dropped.
+    monkeypatch.setattr(audit, "PUT_TIMEOUT_SECONDS", 0.2)
+    gate = threading.Event()
+    log = AuditLog(maxsize=1, batch_size=1)
+    log.start(ListSink(gate), interval=0.01)
+    for action in ("a", "b", "c"):
+        log.record(action)
+    gate.set()
+    log.close()
+    assert log.stats() == {"queue_depth": 0, "written": 2, "dropped": 1, "failed": 0}
+
+    # Files that are not this process's segments are skipped, not parsed.
+    (tmp_path / "audit-notes.ndjson").write_text("")
+    (tmp_path / "audit-1-000007.ndjson").write_text("")
+    files = SegmentFileSink(str(tmp_path), max_bytes=1)
+    files.write([{"action": "a"}])
+    files.write([{"action": "b"}, {"action": "c"}])
+    files.close()
+    segments = sorted(tmp_path.glob(f"audit-{os.getpid()}-*.ndjson"))
+    assert [path.name for path in segments] == [
+        f"audit-{os.getpid()}-000000.ndjson",
+        f"audit-{os.getpid()}-000001.ndjson",
+    ]
+    assert [len(path.read_text().splitlines()) for path in segments] == [1, 2]
+    # A restarted writer continues from its last segment.
+    files = SegmentFileSink(str(tmp_path), max_bytes=1)
+    files.write([{"action": "d"}])
+    files.close()
+    assert len(segments[1].read_text().splitlines()) == 3
+
+
+def test_todays_schedule_snapshot_reloads_changed_doctors(
+    db_session: Session, sample_patient, sample_doctor
+):
+    """Test the day snapshot serves today and reloads only changed doctors."""
+    other = create_doctor(
+        db_session, DoctorCreate(full_name="Dr. Lee", specialization="Neurology")
+    )
+    today = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    patient_id, doctor_id, other_id = sample_patient.id, sample_doctor.id, other.id
+    for doctor, hour in ((other_id, 8), (doctor_id, 10), (doctor_id, 9)):
+        db_session.add(
+            Appointment(
+                patient_id=patient_id,
+                doctor_id=doctor,
+                start_time=today + timedelta(hours=hour),
+                duration_minutes=30,
+            )
+        )
+    db_session.commit()
+
+    resp = client.get("/schedule/today")
+    assert [(a["doctor_id"], a["start_time"][11:13]) for a in resp.json()] == [
+        (doctor_id, "09"),
+        (doctor_id, "10"),
+        (other_id, "08"),
+    ]
+
+    series = AppointmentSeries(
+        patient_id=patient_id,
+        doctor_id=other_id,
+        start_time=today + timedelta(hours=12),
+        duration_minutes=45,
+        frequency="daily",
+        interval=1,
+        count=3,
+        ends_at=today + timedelta(days=2, hours=12, minutes=45),
+    )
+    db_session.add(series)
+    db_session.commit()
+    series_id = series.id
+    invalidate("schedule", (other_id, today.date()))
+    with track() as stats:
+        rows = schedule_snapshot.rows(db_session, doctor_id=other_id)
+    # The series and the appointments of the one stale doctor.
+    assert stats.statements == 2
+    assert [(a["id"] is None, a["series_id"]) for a in rows] == [
+        (False, None),
+        (True, series_id),
+    ]
+    assert rows[1]["start_time"] == today + timedelta(hours=12)
+    assert schedule_snapshot.stats() == {"rows": 4, "bytes": 4 * 26}
+    with track() as stats:
+        assert len(schedule_snapshot.rows(db_session)) == 4
+    assert stats.statements == 0
+
+
+def test_idempotency_key_replays_and_coalesces(monkeypatch, sample_doctor):
+    """Test retries with an Idempotency-Key replay the first response."""
+    patient = {
+        "first_name": "Ravi",
+        "last_name": "K",
+        "email": "ravi@example.com",
+        "phone": "9990001111",
+    }
+    first = client.post("/patients", json=patient, headers={"Idempotency-Key": "p1"})
+    retry = client.post("/patients", json=patient, headers={"Idempotency-Key": "p1"})
+    assert first.status_code == retry.status_code == 200
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert 'desc="0 queries"' in retry.headers["Server-Timing"]
+    other = {**patient, "email": "other@example.com"}
+    resp = client.post("/patients", json=other, headers={"Idempotency-Key": "p1"})
+    assert resp.status_code == 422
+    assert client.post("/patients", json=patient).status_code == 400
+
+    appointment = {
+        "patient_id": first.json()["id"],
+        "doctor_id": sample_doctor.id,
+        "start_time": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "duration_minutes": 30,
+    }
+    for _ in range(3):
+        resp = client.post(
+            "/appointments", json=appointment, headers={"Idempotency-Key": "a1"}
+        )
+        assert resp.status_code == 201 and resp.json()["id"] == 1
+
+    calls = []
+    create_patient_now = patient_service.create_patient
+
+    def slow_create_patient(db, data):
+        calls.append(data.email)
+        time.sleep(0.3)
+        return create_patient_now(db, data)
+
+    monkeypatch.setattr(patient_service, "create_patient", slow_create_patient)
+    third = {**patient, "email": "third@example.com", "phone": "9990002222"}
+    with ThreadPoolExecutor(2) as pool:
+        responses = list(
+            pool.map(
+                lambda _: client.post(
+                    "/patients", json=third, headers={"Idempotency-Key": "p2"}
+                ),
+                range(2),
+            )
+        )
+    assert calls == ["third@example.com"]
+    assert responses[0].content == responses[1].content
+    assert sorted("Idempotent-Replayed" in r.headers for r in responses) == [
+        False,
+        True,
+    ]
+
+    store = DatabaseStore(SessionLocal)
+    assert store.claim("d1", "f") is None
+    assert store.claim("d1", "f") == StoredResponse("f")
+    store.complete("d1", StoredResponse("f", 201, "application/json", b"{}"))
+    assert store.get("d1").body == b"{}"
+    store.release("d1")
+    assert store.get("d1") is None
+
+    # Bulk responses outgrow a 64 KB MySQL BLOB.
+    body = b"x" * (1 << 20)
+    store.claim("d2", "f")
+    store.complete("d2", StoredResponse("f", 201, "application/json", body))
+    assert store.get("d2").body == body
+    ddl = str(CreateTable(IdempotencyKey.__table__).compile(dialect=mysql.dialect()))
+    assert "body LONGBLOB" in ddl